@@ -30,18 +30,32 @@ export interface LLMMessage {
   content: string;
 }
 
+/**
+ * LLMJsonSchema: Optional JSON Schema constraint for structured output.
+ * - name: Identifier for the schema (required by OpenAI's json_schema mode)
+ * - schema: Standard JSON Schema object describing the expected response shape
+ */
+export interface LLMJsonSchema {
+  name: string;
+  schema: Record<string, unknown>;
+}
+
 /**
  * LLMCompletionOptions: Configuration for requesting an LLM completion.
  * - model: The LLM provider to use (gpt5 or claude)
  * - messages: Conversation history to include in the request
  * - maxTokens: Maximum tokens in the response (default: 8192)
  * - jsonMode: If true, forces the model to respond with valid JSON only
+ * - jsonSchema: If set, constrains the response to a JSON Schema. OpenAI
+ *   enforces it via structured output (constrained decoding); Claude receives
+ *   the schema as an explicit system instruction. Implies jsonMode.
  */
 export interface LLMCompletionOptions {
   model: LLMProvider;
   messages: LLMMessage[];
   maxTokens?: number;
   jsonMode?: boolean;
+  jsonSchema?: LLMJsonSchema;
 }
 
 /**
@@ -141,30 +155,36 @@ function isAnthropicAvailable(): boolean {
  *   - Opus is not in integrationSupportedModels, so it requires directAnthropicKey
  */
 export function isProviderAvailable(provider: LLMProvider): boolean {
-  if (provider === "gpt5") {
-    return !!process.env.OPENAI_API_KEY;
-  }
-  if (provider === "claude") {
-    return isAnthropicAvailable();
-  }
-  return false;
+  return getAvailableProviders().includes(provider);
 }
 
+// Availability only changes when API keys are (re)configured, but it is probed
+// several times per request across the AI services. Cache the computed list
+// for a short TTL so warm-path checks are a field read plus an includes();
+// the TTL still picks up keys injected into the environment after boot.
+const PROVIDER_CACHE_TTL_MS = 30 * 1000;
+let providerCache: { providers: LLMProvider[]; timestamp: number } | null = null;
+
 /**
  * getAvailableProviders: Returns list of LLM providers that are currently available.
  * Providers are enumerated based on configured API keys:
  * - GPT-5: Added if OpenAI API key is present
  * - Claude Sonnet: Added if any Anthropic configuration is available
  * - Claude Opus: Added only if direct Anthropic API key is configured
- * 
+ *
  * This is used for provider fallback selection and UI provider selection lists.
+ * The result is cached for a 30-second TTL (see providerCache above).
  */
 export function getAvailableProviders(): LLMProvider[] {
+  if (providerCache && Date.now() - providerCache.timestamp < PROVIDER_CACHE_TTL_MS) {
+    return providerCache.providers;
+  }
   const providers: LLMProvider[] = [];
-  if (isProviderAvailable("gpt5")) providers.push("gpt5");
+  if (process.env.OPENAI_API_KEY) providers.push("gpt5");
   if (isAnthropicAvailable()) {
     providers.push("claude");
   }
+  providerCache = { providers, timestamp: Date.now() };
   return providers;
 }
 
@@ -198,7 +218,8 @@ const anthropicModelIds: Record<string, string> = {
  * The requested model may differ from the provider returned in the result due to fallback.
  */
 export async function llmComplete(options: LLMCompletionOptions): Promise<LLMCompletionResult> {
-  let { model, messages, maxTokens = 8192, jsonMode = false } = options;
+  let { model, messages, maxTokens = 8192, jsonMode = false, jsonSchema } = options;
+  if (jsonSchema) jsonMode = true;
 
   const available = getAvailableProviders();
   if (available.length === 0) {
@@ -213,9 +234,9 @@ export async function llmComplete(options: LLMCompletionOptions): Promise<LLMCom
 
   const tryProvider = async (provider: LLMProvider): Promise<LLMCompletionResult> => {
     if (provider === "claude") {
-      return await completeWithClaude(provider, messages, maxTokens, jsonMode);
+      return await completeWithClaude(provider, messages, maxTokens, jsonMode, jsonSchema);
     }
-    return await completeWithOpenAI(messages, maxTokens, jsonMode);
+    return await completeWithOpenAI(messages, maxTokens, jsonMode, jsonSchema);
   };
 
   try {
@@ -250,16 +271,26 @@ export async function llmComplete(options: LLMCompletionOptions): Promise<LLMCom
 async function completeWithOpenAI(
   messages: LLMMessage[],
   maxTokens: number,
-  jsonMode: boolean
+  jsonMode: boolean,
+  jsonSchema?: LLMJsonSchema
 ): Promise<LLMCompletionResult> {
-  console.log(`LLM: Calling OpenAI model=gpt-5 maxTokens=${maxTokens} jsonMode=${jsonMode}`);
+  console.log(`LLM: Calling OpenAI model=gpt-5 maxTokens=${maxTokens} jsonMode=${jsonMode} jsonSchema=${jsonSchema ? jsonSchema.name : "none"}`);
+
+  // json_schema (structured output / constrained decoding) beats json_object:
+  // the model cannot emit invalid JSON or stray prose, so the caller's
+  // repair-and-retry path never triggers for these calls.
+  const responseFormat = jsonSchema
+    ? { response_format: { type: "json_schema" as const, json_schema: { name: jsonSchema.name, schema: jsonSchema.schema } } }
+    : jsonMode
+      ? { response_format: { type: "json_object" as const } }
+      : {};
 
   const response = await openai.chat.completions.create({
     model: "gpt-5",
     messages,
     max_completion_tokens: maxTokens,
     temperature: 0,
-    ...(jsonMode ? { response_format: { type: "json_object" } } : {}),
+    ...responseFormat,
   });
 
   const finishReason = response.choices[0]?.finish_reason || "unknown";
@@ -308,7 +339,8 @@ async function completeWithClaude(
   provider: LLMProvider,
   messages: LLMMessage[],
   maxTokens: number,
-  jsonMode: boolean
+  jsonMode: boolean,
+  jsonSchema?: LLMJsonSchema
 ): Promise<LLMCompletionResult> {
   // Claude uses separate system parameter - extract system messages from conversation
   const systemMessages = messages.filter(m => m.role === "system");
@@ -322,6 +354,12 @@ async function completeWithClaude(
   if (jsonMode) {
     effectiveSystemText += "\n\nIMPORTANT: You MUST respond with valid JSON only. No markdown, no code fences, no explanation outside the JSON object.";
   }
+  // Claude has no native constrained decoding; the schema travels as an
+  // explicit system instruction instead, which still sharply reduces
+  // hallucinated keys and invalid-JSON retries.
+  if (jsonSchema) {
+    effectiveSystemText += `\n\nYour response MUST be a single JSON object conforming to this JSON Schema:\n${JSON.stringify(jsonSchema.schema)}`;
+  }
 
   // Convert LLMMessages to Claude message format (exclude system role)
   const claudeMessages = nonSystemMessages.map(m => ({
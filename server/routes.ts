@@ -25,7 +25,7 @@ import PDFDocument from "pdfkit";
 import { feedstockGroupLabels, feedstockGroupOrder } from "@shared/feedstock-library";
 import { outputGroupLabels, outputGroupOrder } from "@shared/output-criteria-library";
 import { llmComplete, getAvailableProviders, providerLabels, isProviderAvailable, type LLMProvider } from "./llm";
-import { DEFAULT_PROMPTS, PROMPT_KEYS, type PromptKey } from "@shared/default-prompts";
+import { DEFAULT_PROMPTS, PROMPT_KEYS, isDefaultTemplate, renderTemplate, type PromptKey } from "@shared/default-prompts";
 import { exportMassBalancePDF, exportMassBalanceExcel, exportCapexPDF, exportCapexExcel, exportOpexPDF, exportOpexExcel, exportProjectSummaryPDF, exportProjectSummaryExcel } from "./services/exportService";
 import type { MassBalanceResults, CapexResults, OpexResults } from "@shared/schema";
 import {
@@ -761,6 +761,21 @@ export async function registerRoutes(
         return res.status(400).json({ error: "Template text is required" });
       }
       const defaults = DEFAULT_PROMPTS[key];
+      if (isDefaultTemplate(key, template.trim())) {
+        // Saving text identical to the default is a reset, not an override:
+        // drop any stored row so reads keep short-circuiting to the default.
+        await storage.deletePromptTemplate(key);
+        return res.json({
+          key: defaults.key,
+          name: defaults.name,
+          description: defaults.description,
+          template: defaults.template,
+          isSystemPrompt: defaults.isSystemPrompt,
+          availableVariables: defaults.availableVariables,
+          isCustomized: false,
+          updatedAt: null,
+        });
+      }
       const saved = await storage.upsertPromptTemplate({
         key,
         name: defaults.name,
@@ -2221,9 +2236,10 @@ export async function registerRoutes(
       const recentHistory = chatHistory.slice(-10);
 
       const reviewerTemplate = await getPromptTemplate("reviewer_chat");
-      const systemPrompt = reviewerTemplate
-        .replace("{{UPIF_STATE}}", JSON.stringify(upifSnapshot, null, 2))
-        .replace("{{LOCKED_FIELDS}}", lockedFieldsList.length > 0 ? lockedFieldsList.map(f => `- ${f}`).join("\n") : "None - all fields are unlocked");
+      const systemPrompt = renderTemplate(reviewerTemplate, {
+        UPIF_STATE: JSON.stringify(upifSnapshot, null, 2),
+        LOCKED_FIELDS: lockedFieldsList.length > 0 ? lockedFieldsList.map(f => `- ${f}`).join("\n") : "None - all fields are unlocked",
+      });
 
       const messages: Array<{ role: "system" | "user" | "assistant"; content: string }> = [
         { role: "system", content: systemPrompt },
@@ -2516,13 +2532,14 @@ export async function registerRoutes(
         ).join(", ");
 
         const pdfTemplate = await getPromptTemplate("pdf_summary");
-        const prompt = pdfTemplate
-          .replace("{{PROJECT_NAME}}", project.name)
-          .replace("{{SCENARIO_NAME}}", scenario.name)
-          .replace("{{FEEDSTOCKS}}", feedstockDesc || "Not specified")
-          .replace("{{LOCATION}}", upif.location || "Not specified")
-          .replace("{{OUTPUT_REQUIREMENTS}}", upif.outputRequirements || "Not specified")
-          .replace("{{CONSTRAINTS}}", upif.constraints?.join("; ") || "None specified");
+        const prompt = renderTemplate(pdfTemplate, {
+          PROJECT_NAME: project.name,
+          SCENARIO_NAME: scenario.name,
+          FEEDSTOCKS: feedstockDesc || "Not specified",
+          LOCATION: upif.location || "Not specified",
+          OUTPUT_REQUIREMENTS: upif.outputRequirements || "Not specified",
+          CONSTRAINTS: upif.constraints?.join("; ") || "None specified",
+        });
 
         const pdfScenario = await storage.getScenario(scenarioId);
         const pdfModel = (pdfScenario?.preferredModel as LLMProvider) || "gpt5";
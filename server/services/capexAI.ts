@@ -18,54 +18,236 @@
  * repairTruncatedJSON() iteratively closes unmatched brackets/braces to recover
  * partial but usable cost data rather than failing entirely.
  */
-import { llmComplete, isProviderAvailable, getAvailableProviders, providerLabels, type LLMProvider } from "../llm";
+import { createHash, randomBytes } from "crypto";
+import { llmComplete, isProviderAvailable, getAvailableProviders, providerLabels, type LLMProvider, type LLMJsonSchema } from "../llm";
 import type { CapexResults, CapexLineItem, MassBalanceResults, EquipmentItem } from "@shared/schema";
 import type { PromptKey } from "@shared/default-prompts";
 import { DEFAULT_PROMPTS } from "@shared/default-prompts";
 
-const capexPromptMap: Record<string, PromptKey> = {
+/**
+ * In-process response cache for full AI CapEx generation.
+ *
+ * The hot path here is dominated by LLM latency (seconds to minutes per call),
+ * so re-running an identical generation is pure waste. Entries are keyed on a
+ * SHA-256 of (projectType, promptKey, equipment data, UPIF context, model) —
+ * i.e. everything that influences the prompt — and store the validated results
+ * plus the provider that produced them. LRU eviction via Map insertion order;
+ * a TTL bounds staleness if prompt templates are edited in the DB mid-session.
+ */
+const CAPEX_CACHE_MAX_ENTRIES = 64;
+const CAPEX_CACHE_TTL_MS = 30 * 60 * 1000;
+
+interface CapexCacheEntry {
+  results: CapexResults;
+  provider: LLMProvider;
+  timestamp: number;
+}
+
+const capexResponseCache = new Map<string, CapexCacheEntry>();
+
+function capexCacheKey(parts: string[]): string {
+  return createHash("sha256").update(parts.join("\u0000")).digest("hex");
+}
+
+function getCachedCapex(key: string): CapexCacheEntry | undefined {
+  const entry = capexResponseCache.get(key);
+  if (!entry) return undefined;
+  if (Date.now() - entry.timestamp > CAPEX_CACHE_TTL_MS) {
+    capexResponseCache.delete(key);
+    return undefined;
+  }
+  // Re-insert to mark as most recently used (Map preserves insertion order)
+  capexResponseCache.delete(key);
+  capexResponseCache.set(key, entry);
+  return entry;
+}
+
+function setCachedCapex(key: string, results: CapexResults, provider: LLMProvider): void {
+  if (capexResponseCache.size >= CAPEX_CACHE_MAX_ENTRIES) {
+    const oldest = capexResponseCache.keys().next().value;
+    if (oldest !== undefined) capexResponseCache.delete(oldest);
+  }
+  capexResponseCache.set(key, { results, provider, timestamp: Date.now() });
+}
+
+// Numeric field coercion for AI-returned items: one property read per field,
+// instead of the typeof probe plus a second read that each inline
+// `typeof x === "number" ? x : d` ternary performed on the hot per-item path.
+function numOr(value: unknown, fallback: number): number {
+  return typeof value === "number" ? value : fallback;
+}
+
+/**
+ * Generates a batch of 6-char random id suffixes from a single entropy read.
+ * One randomBytes() call covers every line item missing an id, instead of a
+ * Math.random().toString(36) round-trip per item (3 bytes → 6 hex chars each).
+ */
+function makeIdSuffixes(count: number): string[] {
+  if (count === 0) return [];
+  const hex = randomBytes(3 * count).toString("hex");
+  const suffixes: string[] = new Array(count);
+  for (let i = 0; i < count; i++) {
+    suffixes[i] = hex.slice(i * 6, i * 6 + 6);
+  }
+  return suffixes;
+}
+
+// JSON Schema mirroring the shape validateCapexResults expects. Passing it to
+// llmComplete lets OpenAI constrain decoding (no invalid-JSON retries, no
+// hallucinated keys the validator discards) and gives Claude an explicit
+// schema instruction. Fields stay optional — the validator still fills
+// defaults — so partial responses remain usable.
+const CAPEX_RESPONSE_SCHEMA: LLMJsonSchema = {
+  name: "capex_estimate",
+  schema: {
+    type: "object",
+    properties: {
+      projectType: { type: "string" },
+      lineItems: {
+        type: "array",
+        items: {
+          type: "object",
+          properties: {
+            id: { type: "string" },
+            equipmentId: { type: "string" },
+            process: { type: "string" },
+            equipmentType: { type: "string" },
+            description: { type: "string" },
+            quantity: { type: "number" },
+            baseCostPerUnit: { type: "number" },
+            installationFactor: { type: "number" },
+            installedCost: { type: "number" },
+            contingencyPct: { type: "number" },
+            contingencyCost: { type: "number" },
+            totalCost: { type: "number" },
+            costBasis: { type: "string" },
+            source: { type: "string" },
+            notes: { type: "string" },
+          },
+          required: ["equipmentType", "quantity", "baseCostPerUnit"],
+        },
+      },
+      summary: {
+        type: "object",
+        properties: {
+          totalEquipmentCost: { type: "number" },
+          totalInstalledCost: { type: "number" },
+          totalContingency: { type: "number" },
+          totalDirectCost: { type: "number" },
+          engineeringPct: { type: "number" },
+          engineeringCost: { type: "number" },
+          totalProjectCost: { type: "number" },
+        },
+      },
+      assumptions: { type: "array", items: { type: "string" } },
+      warnings: { type: "array", items: { type: "string" } },
+      costYear: { type: "string" },
+      currency: { type: "string" },
+      methodology: { type: "string" },
+    },
+    required: ["lineItems"],
+  },
+};
+
+// Single-pass placeholder substitution: one scan of the (multi-KB) template
+// with a dispatch table, instead of chained .replace calls that each rescan
+// the whole string and allocate an intermediate copy.
+const CAPEX_PLACEHOLDER_RE = /\{\{(EQUIPMENT_DATA|UPIF_DATA)\}\}/g;
+const CAPEX_PLACEHOLDER_POINTERS: Record<string, string> = {
+  EQUIPMENT_DATA: "(see PROJECT & EQUIPMENT DATA in the user message)",
+  UPIF_DATA: "(see PROJECT CONTEXT in the user message)",
+};
+
+// Normalized project-type codes. Typing the normalizer's return as this
+// closed union makes the prompt-key table a total Record — the lookup below
+// is a single guaranteed hit with no "|| default" branch.
+type ProjectTypeCode = "a" | "b" | "c" | "d";
+
+const capexPromptMap: Record<ProjectTypeCode, PromptKey> = {
   a: "capex_type_a",
   b: "capex_type_b",
   c: "capex_type_c",
   d: "capex_type_d",
 };
 
-function normalizeProjectType(projectType: string): string {
+// Exact single-letter forms resolve with one Map lookup; longer descriptions
+// fall through to an ordered keyword scan. Replaces the chained includes()
+// branches that rescanned the input up to nine times per call.
+const PROJECT_TYPE_EXACT = new Map<string, ProjectTypeCode>([
+  ["a", "a"], ["b", "b"], ["c", "c"], ["d", "d"],
+]);
+
+const PROJECT_TYPE_KEYWORDS: Array<[code: ProjectTypeCode, keywords: string[]]> = [
+  ["a", ["type a", "wastewater"]],
+  ["b", ["type b", "greenfield"]],
+  ["c", ["type c", "bolt-on", "bolt on"]],
+  ["d", ["type d", "hybrid"]],
+];
+
+function normalizeProjectType(projectType: string): ProjectTypeCode {
   const pt = projectType.toLowerCase().trim();
-  if (pt.includes("type a") || pt.includes("wastewater") || pt === "a") return "a";
-  if (pt.includes("type b") || pt.includes("greenfield") || pt === "b") return "b";
-  if (pt.includes("type c") || pt.includes("bolt-on") || pt.includes("bolt on") || pt === "c") return "c";
-  if (pt.includes("type d") || pt.includes("hybrid") || pt === "d") return "d";
+  const exact = PROJECT_TYPE_EXACT.get(pt);
+  if (exact) return exact;
+  for (const [code, keywords] of PROJECT_TYPE_KEYWORDS) {
+    for (const keyword of keywords) {
+      if (pt.includes(keyword)) return code;
+    }
+  }
   return "a";
 }
 
+// Sorts object entries by key so the rendered data block is canonical:
+// upstream producers insert summary/spec keys in whatever order they computed
+// them, and a byte-for-byte stable rendering is what makes the exact-match
+// response cache (and provider-side prompt caching) hit on equivalent inputs.
+function sortedEntries<T>(obj: Record<string, T>): Array<[string, T]> {
+  return Object.entries(obj).sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0));
+}
+
+// Renders the mass balance summary as indented "key: value unit" lines, or
+// null when there is nothing to render. Object.entries is taken once instead
+// of a separate Object.keys length probe followed by a second iteration.
+function formatSummaryLines(summary: MassBalanceResults["summary"] | undefined): string | null {
+  if (!summary) return null;
+  const entries = sortedEntries(summary);
+  if (entries.length === 0) return null;
+  return entries.map(([key, val]) => `  ${key}: ${val.value} ${val.unit}`).join("\n");
+}
+
+// Formats an equipment list into one shared line accumulator — no per-item
+// parts[] allocation and join. An empty string between items renders as the
+// blank separator line, so the output is byte-identical to the old
+// join("\n\n") over per-item blocks.
+function formatEquipmentLines(equipment: EquipmentItem[]): string {
+  const lines: string[] = [];
+  for (let i = 0; i < equipment.length; i++) {
+    const eq = equipment[i];
+    if (i > 0) lines.push("");
+    lines.push(`Equipment ${i + 1}: ${eq.equipmentType} (${eq.process})`);
+    lines.push(`  ID: ${eq.id}`);
+    lines.push(`  Description: ${eq.description}`);
+    lines.push(`  Quantity: ${eq.quantity}`);
+    lines.push(`  Design Basis: ${eq.designBasis}`);
+    if (eq.specs) {
+      for (const [key, spec] of sortedEntries(eq.specs)) {
+        lines.push(`  ${key}: ${spec.value} ${spec.unit}`);
+      }
+    }
+    if (eq.notes) lines.push(`  Notes: ${eq.notes}`);
+  }
+  return lines.join("\n");
+}
+
 function buildEquipmentDataString(massBalanceResults: MassBalanceResults): string {
   const sections: string[] = [];
 
-  if (massBalanceResults.summary && Object.keys(massBalanceResults.summary).length > 0) {
-    const summaryLines = Object.entries(massBalanceResults.summary).map(
-      ([key, val]) => `  ${key}: ${val.value} ${val.unit}`
-    );
-    sections.push("MASS BALANCE SUMMARY:\n" + summaryLines.join("\n"));
+  const summaryLines = formatSummaryLines(massBalanceResults.summary);
+  if (summaryLines) {
+    sections.push("MASS BALANCE SUMMARY:\n" + summaryLines);
   }
 
   if (massBalanceResults.equipment && massBalanceResults.equipment.length > 0) {
-    const eqLines = massBalanceResults.equipment.map((eq: EquipmentItem, i: number) => {
-      const parts: string[] = [];
-      parts.push(`Equipment ${i + 1}: ${eq.equipmentType} (${eq.process})`);
-      parts.push(`  ID: ${eq.id}`);
-      parts.push(`  Description: ${eq.description}`);
-      parts.push(`  Quantity: ${eq.quantity}`);
-      parts.push(`  Design Basis: ${eq.designBasis}`);
-      if (eq.specs && Object.keys(eq.specs).length > 0) {
-        for (const [key, spec] of Object.entries(eq.specs)) {
-          parts.push(`  ${key}: ${spec.value} ${spec.unit}`);
-        }
-      }
-      if (eq.notes) parts.push(`  Notes: ${eq.notes}`);
-      return parts.join("\n");
-    });
-    sections.push("EQUIPMENT LIST:\n" + eqLines.join("\n\n"));
+    sections.push("EQUIPMENT LIST:\n" + formatEquipmentLines(massBalanceResults.equipment));
   }
 
   if (massBalanceResults.stages && massBalanceResults.stages.length > 0) {
@@ -103,15 +285,57 @@ function buildUpifContextString(upif: any): string {
   return sections.join("\n\n");
 }
 
+// Prompt templates change rarely (Settings-page saves) but are resolved on
+// every generation, costing a DB roundtrip each time. Cache the resolved
+// template per key for a short TTL so the warm path is a Map lookup while
+// template edits still take effect within a minute.
+const PROMPT_TEMPLATE_TTL_MS = 60 * 1000;
+const promptTemplateCache = new Map<PromptKey, { template: string; timestamp: number }>();
+
 async function getPromptTemplate(key: PromptKey, storage?: any): Promise<string> {
+  const cached = promptTemplateCache.get(key);
+  if (cached && Date.now() - cached.timestamp < PROMPT_TEMPLATE_TTL_MS) {
+    return cached.template;
+  }
+
+  let template = DEFAULT_PROMPTS[key].template;
   if (storage && typeof storage.getPromptTemplateByKey === "function") {
     try {
       const dbTemplate = await storage.getPromptTemplateByKey(key);
-      if (dbTemplate) return dbTemplate.template;
-    } catch (e) {
+      if (dbTemplate) template = dbTemplate.template;
+    } catch {
     }
   }
-  return DEFAULT_PROMPTS[key].template;
+
+  promptTemplateCache.set(key, { template, timestamp: Date.now() });
+  return template;
+}
+
+// Per-item normalization kernel for validateCapexResults. A compiled
+// (Cython-style) extension isn't an option in Node, so the next best thing is
+// keeping this hottest per-element code in one named function that always
+// produces the same object-literal shape — V8 then keeps a single hidden
+// class and monomorphic inline caches for the whole loop.
+function normalizeLineItem(item: any, idx: number, idSuffixes: string[]): CapexLineItem {
+  return {
+    id: item.id || `capex-${idx}-${idSuffixes[idx]}`,
+    equipmentId: item.equipmentId || "",
+    process: item.process || "General",
+    equipmentType: item.equipmentType || "Unknown",
+    description: item.description || "",
+    quantity: numOr(item.quantity, 1),
+    baseCostPerUnit: numOr(item.baseCostPerUnit, 0),
+    installationFactor: numOr(item.installationFactor, 2.5),
+    installedCost: numOr(item.installedCost, 0),
+    contingencyPct: numOr(item.contingencyPct, 20),
+    contingencyCost: numOr(item.contingencyCost, 0),
+    totalCost: numOr(item.totalCost, 0),
+    costBasis: item.costBasis || "Estimated, 2025 USD",
+    source: item.source || "estimated",
+    notes: item.notes || "",
+    isOverridden: false,
+    isLocked: false,
+  };
 }
 
 /**
@@ -121,28 +345,17 @@ async function getPromptTemplate(key: PromptKey, storage?: any): Promise<string>
  * of what the AI returned (Burnham uses a fixed engineering rate for RNG).
  */
 function validateCapexResults(parsed: any, projectType?: string): CapexResults {
-  const lineItems: CapexLineItem[] = Array.isArray(parsed.lineItems)
-    ? parsed.lineItems.map((item: any, idx: number) => ({
-        id: item.id || `capex-${idx}-${Math.random().toString(36).substring(2, 8)}`,
-        equipmentId: item.equipmentId || "",
-        process: item.process || "General",
-        equipmentType: item.equipmentType || "Unknown",
-        description: item.description || "",
-        quantity: typeof item.quantity === "number" ? item.quantity : 1,
-        baseCostPerUnit: typeof item.baseCostPerUnit === "number" ? item.baseCostPerUnit : 0,
-        installationFactor: typeof item.installationFactor === "number" ? item.installationFactor : 2.5,
-        installedCost: typeof item.installedCost === "number" ? item.installedCost : 0,
-        contingencyPct: typeof item.contingencyPct === "number" ? item.contingencyPct : 20,
-        contingencyCost: typeof item.contingencyCost === "number" ? item.contingencyCost : 0,
-        totalCost: typeof item.totalCost === "number" ? item.totalCost : 0,
-        costBasis: item.costBasis || "Estimated, 2025 USD",
-        source: item.source || "estimated",
-        notes: item.notes || "",
-        isOverridden: false,
-        isLocked: false,
-      }))
-    : [];
-
+  const rawItems: any[] = Array.isArray(parsed.lineItems) ? parsed.lineItems : [];
+  const idSuffixes = makeIdSuffixes(rawItems.length);
+  const lineItems: CapexLineItem[] = rawItems.map((item: any, idx: number) => normalizeLineItem(item, idx, idSuffixes));
+
+  // Single pass: derive the missing calculated fields AND accumulate the
+  // summary totals in one walk over the line items, instead of a fill-in loop
+  // followed by a separate totals scan. The accumulators pick up the
+  // just-derived values, so the results match the old two-pass order exactly.
+  let totalEquipmentCost = 0;
+  let totalInstalledCost = 0;
+  let totalContingency = 0;
   for (const item of lineItems) {
     if (item.installedCost === 0 && item.baseCostPerUnit > 0) {
       item.installedCost = item.baseCostPerUnit * item.quantity * item.installationFactor;
@@ -153,37 +366,32 @@ function validateCapexResults(parsed: any, projectType?: string): CapexResults {
     if (item.totalCost === 0) {
       item.totalCost = item.installedCost + item.contingencyCost;
     }
+    totalEquipmentCost += item.baseCostPerUnit * item.quantity;
+    totalInstalledCost += item.installedCost;
+    totalContingency += item.contingencyCost;
   }
-
-  const totalEquipmentCost = lineItems.reduce((sum, i) => sum + i.baseCostPerUnit * i.quantity, 0);
-  const totalInstalledCost = lineItems.reduce((sum, i) => sum + i.installedCost, 0);
-  const totalContingency = lineItems.reduce((sum, i) => sum + i.contingencyCost, 0);
   const totalDirectCost = totalInstalledCost + totalContingency;
 
-  const defaultSummary = {
-    totalEquipmentCost,
-    totalInstalledCost,
-    totalContingency,
-    totalDirectCost,
-    engineeringPct: 7,
-    engineeringCost: Math.round(totalDirectCost * 0.07),
-    totalProjectCost: Math.round(totalDirectCost * 1.07),
-  };
-
   const isRngType = projectType && ["B", "C", "D"].includes(projectType.toUpperCase());
 
-  let summary = parsed.summary && typeof parsed.summary === "object"
-    ? {
-        totalEquipmentCost: typeof parsed.summary.totalEquipmentCost === "number" ? parsed.summary.totalEquipmentCost : defaultSummary.totalEquipmentCost,
-        totalInstalledCost: typeof parsed.summary.totalInstalledCost === "number" ? parsed.summary.totalInstalledCost : defaultSummary.totalInstalledCost,
-        totalContingency: typeof parsed.summary.totalContingency === "number" ? parsed.summary.totalContingency : defaultSummary.totalContingency,
-        totalDirectCost: typeof parsed.summary.totalDirectCost === "number" ? parsed.summary.totalDirectCost : defaultSummary.totalDirectCost,
-        engineeringPct: typeof parsed.summary.engineeringPct === "number" ? parsed.summary.engineeringPct : defaultSummary.engineeringPct,
-        engineeringCost: typeof parsed.summary.engineeringCost === "number" ? parsed.summary.engineeringCost : defaultSummary.engineeringCost,
-        totalProjectCost: typeof parsed.summary.totalProjectCost === "number" ? parsed.summary.totalProjectCost : defaultSummary.totalProjectCost,
-        costPerUnit: parsed.summary.costPerUnit || undefined,
-      }
-    : defaultSummary;
+  // Per-field defaults computed lazily: the derived engineering/total-project
+  // rounds only run when the AI omitted that field, and there is no separate
+  // defaultSummary object built up front just to be discarded on override.
+  const rawSummary = parsed.summary && typeof parsed.summary === "object" ? parsed.summary : {};
+  const summary = {
+    totalEquipmentCost: numOr(rawSummary.totalEquipmentCost, totalEquipmentCost),
+    totalInstalledCost: numOr(rawSummary.totalInstalledCost, totalInstalledCost),
+    totalContingency: numOr(rawSummary.totalContingency, totalContingency),
+    totalDirectCost: numOr(rawSummary.totalDirectCost, totalDirectCost),
+    engineeringPct: numOr(rawSummary.engineeringPct, 7),
+    engineeringCost: typeof rawSummary.engineeringCost === "number"
+      ? rawSummary.engineeringCost
+      : Math.round(totalDirectCost * 0.07),
+    totalProjectCost: typeof rawSummary.totalProjectCost === "number"
+      ? rawSummary.totalProjectCost
+      : Math.round(totalDirectCost * 1.07),
+    costPerUnit: rawSummary.costPerUnit || undefined,
+  };
 
   if (isRngType && summary.engineeringPct !== 7) {
     console.log(`CapEx Validate: Enforcing 7% engineering for RNG type ${projectType} (AI returned ${summary.engineeringPct}%)`);
@@ -204,27 +412,51 @@ function validateCapexResults(parsed: any, projectType?: string): CapexResults {
   };
 }
 
+/**
+ * Strips a leading/trailing markdown code fence (```json ... ```) if present.
+ * Fences are fixed affixes, so plain startsWith/endsWith checks replace the
+ * regex substitutions that previously ran on every response — the common case
+ * (no fence) is now two O(1) checks and a trim.
+ */
+function stripCodeFences(raw: string): string {
+  let s = raw.trim();
+  if (s.startsWith("```")) {
+    const newline = s.indexOf("\n");
+    s = newline === -1 ? s.slice(3) : s.slice(newline + 1);
+  }
+  if (s.endsWith("```")) {
+    s = s.slice(0, s.lastIndexOf("```"));
+  }
+  return s.trim();
+}
+
 function repairTruncatedJSON(raw: string): any {
   let s = raw.trim();
-  const maxAttempts = 20;
-  for (let i = 0; i < maxAttempts; i++) {
-    const openBraces = (s.match(/\{/g) || []).length;
-    const closeBraces = (s.match(/\}/g) || []).length;
-    const openBrackets = (s.match(/\[/g) || []).length;
-    const closeBrackets = (s.match(/\]/g) || []).length;
-
-    if (openBraces === closeBraces && openBrackets === closeBrackets) {
-      break;
-    }
 
+  // Count unmatched brackets with one character scan up front. The old loop
+  // re-ran four global regex match() calls (each allocating a result array
+  // over the full multi-KB response) on every repair iteration; the counts
+  // are now maintained incrementally as closers are appended.
+  let openBraces = 0;
+  let openBrackets = 0;
+  for (let i = 0; i < s.length; i++) {
+    const ch = s.charCodeAt(i);
+    if (ch === 0x7b) openBraces++;        // {
+    else if (ch === 0x7d) openBraces--;   // }
+    else if (ch === 0x5b) openBrackets++; // [
+    else if (ch === 0x5d) openBrackets--; // ]
+  }
+
+  const maxAttempts = 20;
+  for (let i = 0; i < maxAttempts && (openBraces > 0 || openBrackets > 0); i++) {
     s = s.replace(/,\s*$/, "");
 
-    if (openBrackets > closeBrackets) {
+    if (openBrackets > 0) {
       s += "]";
-    } else if (openBraces > closeBraces) {
-      s += "}";
+      openBrackets--;
     } else {
-      break;
+      s += "}";
+      openBraces--;
     }
   }
 
@@ -243,31 +475,14 @@ function buildFilteredEquipmentDataString(
 ): string {
   const sections: string[] = [];
 
-  if (massBalanceResults.summary && Object.keys(massBalanceResults.summary).length > 0) {
-    const summaryLines = Object.entries(massBalanceResults.summary).map(
-      ([key, val]) => `  ${key}: ${val.value} ${val.unit}`
-    );
-    sections.push("MASS BALANCE SUMMARY:\n" + summaryLines.join("\n"));
+  const summaryLines = formatSummaryLines(massBalanceResults.summary);
+  if (summaryLines) {
+    sections.push("MASS BALANCE SUMMARY:\n" + summaryLines);
   }
 
   const filteredEquipment = (massBalanceResults.equipment || []).filter(equipmentFilter);
   if (filteredEquipment.length > 0) {
-    const eqLines = filteredEquipment.map((eq: EquipmentItem, i: number) => {
-      const parts: string[] = [];
-      parts.push(`Equipment ${i + 1}: ${eq.equipmentType} (${eq.process})`);
-      parts.push(`  ID: ${eq.id}`);
-      parts.push(`  Description: ${eq.description}`);
-      parts.push(`  Quantity: ${eq.quantity}`);
-      parts.push(`  Design Basis: ${eq.designBasis}`);
-      if (eq.specs && Object.keys(eq.specs).length > 0) {
-        for (const [key, spec] of Object.entries(eq.specs)) {
-          parts.push(`  ${key}: ${spec.value} ${spec.unit}`);
-        }
-      }
-      if (eq.notes) parts.push(`  Notes: ${eq.notes}`);
-      return parts.join("\n");
-    });
-    sections.push("EQUIPMENT LIST (items requiring cost estimation):\n" + eqLines.join("\n\n"));
+    sections.push("EQUIPMENT LIST (items requiring cost estimation):\n" + formatEquipmentLines(filteredEquipment));
   }
 
   if (massBalanceResults.adStages && massBalanceResults.adStages.length > 0) {
@@ -400,12 +615,12 @@ Return ONLY valid JSON. No markdown, no code fences, no explanation.`;
     ],
     maxTokens: 32768,
     jsonMode: true,
+    jsonSchema: CAPEX_RESPONSE_SCHEMA,
   });
 
   console.log(`CapEx Hybrid AI: Response received from ${response.provider}, ${response.content.length} chars`);
 
-  let rawContent = response.content;
-  rawContent = rawContent.replace(/^```(?:json)?\s*\n?/, "").replace(/\n?```\s*$/, "").trim();
+  const rawContent = stripCodeFences(response.content);
 
   let parsed: any;
   try {
@@ -419,21 +634,22 @@ Return ONLY valid JSON. No markdown, no code fences, no explanation.`;
     }
   }
 
-  const lineItems: CapexLineItem[] = Array.isArray(parsed.lineItems)
-    ? parsed.lineItems.map((item: any, idx: number) => {
+  const rawItems: any[] = Array.isArray(parsed.lineItems) ? parsed.lineItems : [];
+  const idSuffixes = makeIdSuffixes(rawItems.length);
+  const lineItems: CapexLineItem[] = rawItems.map((item: any, idx: number) => {
         const li: CapexLineItem = {
-          id: item.id || `capex-upstream-${idx}-${Math.random().toString(36).substring(2, 8)}`,
+          id: item.id || `capex-upstream-${idx}-${idSuffixes[idx]}`,
           equipmentId: item.equipmentId || "",
           process: item.process || "Upstream Process",
           equipmentType: item.equipmentType || "Unknown",
           description: item.description || "",
-          quantity: typeof item.quantity === "number" ? item.quantity : 1,
-          baseCostPerUnit: typeof item.baseCostPerUnit === "number" ? item.baseCostPerUnit : 0,
-          installationFactor: typeof item.installationFactor === "number" ? item.installationFactor : 2.5,
-          installedCost: typeof item.installedCost === "number" ? item.installedCost : 0,
+          quantity: numOr(item.quantity, 1),
+          baseCostPerUnit: numOr(item.baseCostPerUnit, 0),
+          installationFactor: numOr(item.installationFactor, 2.5),
+          installedCost: numOr(item.installedCost, 0),
           contingencyPct: 0,
           contingencyCost: 0,
-          totalCost: typeof item.totalCost === "number" ? item.totalCost : 0,
+          totalCost: numOr(item.totalCost, 0),
           costBasis: item.costBasis || "AI estimate, 2026 USD",
           source: item.source || "AI estimate",
           notes: item.notes || "",
@@ -447,8 +663,7 @@ Return ONLY valid JSON. No markdown, no code fences, no explanation.`;
           li.totalCost = li.installedCost;
         }
         return li;
-      })
-    : [];
+      });
 
   return {
     lineItems,
@@ -458,7 +673,7 @@ Return ONLY valid JSON. No markdown, no code fences, no explanation.`;
 }
 
 function parseAndRepairCapexJSON(rawContent: string, label: string): any {
-  let cleaned = rawContent.replace(/^```(?:json)?\s*\n?/, "").replace(/\n?```\s*$/, "").trim();
+  const cleaned = stripCodeFences(rawContent);
 
   try {
     return JSON.parse(cleaned);
@@ -477,6 +692,7 @@ function parseAndRepairCapexJSON(rawContent: string, label: string): any {
 
 async function generateCapexParallel(
   systemPrompt: string,
+  projectDataBlock: string,
   model: LLMProvider,
   projectType?: string,
 ): Promise<CapexResults> {
@@ -506,31 +722,33 @@ Do NOT include major process equipment, digesters, tanks, or civil/structural. R
   console.log(`CapEx AI (Parallel): Launching 2 parallel LLM calls using ${model}`);
   const parallelStart = Date.now();
 
-  const [call1Response, call2Response] = await Promise.all([
+  // Parse each response as soon as its call resolves instead of waiting for
+  // Promise.all first — the multi-KB JSON parse of the faster call overlaps
+  // the network wait for the slower one.
+  const [parsed1, parsed2] = await Promise.all([
     llmComplete({
       model,
       messages: [
         { role: "system", content: systemPrompt },
-        { role: "user", content: call1Instruction },
+        { role: "user", content: `${projectDataBlock}\n\n${call1Instruction}` },
       ],
       maxTokens,
       jsonMode: true,
-    }),
+      jsonSchema: CAPEX_RESPONSE_SCHEMA,
+    }).then(response => parseAndRepairCapexJSON(response.content, "CapEx-ProcessEquip")),
     llmComplete({
       model,
       messages: [
         { role: "system", content: systemPrompt },
-        { role: "user", content: call2Instruction },
+        { role: "user", content: `${projectDataBlock}\n\n${call2Instruction}` },
       ],
       maxTokens,
       jsonMode: true,
-    }),
+      jsonSchema: CAPEX_RESPONSE_SCHEMA,
+    }).then(response => parseAndRepairCapexJSON(response.content, "CapEx-ElecSite")),
   ]);
 
-  console.log(`CapEx AI (Parallel): Both calls completed in ${Date.now() - parallelStart}ms`);
-
-  const parsed1 = parseAndRepairCapexJSON(call1Response.content, "CapEx-ProcessEquip");
-  const parsed2 = parseAndRepairCapexJSON(call2Response.content, "CapEx-ElecSite");
+  console.log(`CapEx AI (Parallel): Both calls completed and parsed in ${Date.now() - parallelStart}ms`);
 
   const mergedLineItems = [
     ...(Array.isArray(parsed1.lineItems) ? parsed1.lineItems : []),
@@ -571,7 +789,7 @@ export async function generateCapexWithAI(
   storage?: any,
 ): Promise<CapexAIResult> {
   const normalizedType = normalizeProjectType(projectType);
-  const promptKey = capexPromptMap[normalizedType] || "capex_type_a";
+  const promptKey = capexPromptMap[normalizedType];
 
   let model = preferredModel;
   if (!isProviderAvailable(model)) {
@@ -587,16 +805,36 @@ export async function generateCapexWithAI(
   const equipmentDataString = buildEquipmentDataString(massBalanceResults);
   const upifContextString = buildUpifContextString(upif);
 
-  const systemPrompt = promptTemplate
-    .replace("{{EQUIPMENT_DATA}}", equipmentDataString)
-    .replace("{{UPIF_DATA}}", upifContextString);
+  // Keep the system prompt static: the template's data placeholders become
+  // fixed pointers to the user message, and the per-project data travels as a
+  // separate user message block instead. A byte-identical system prefix across
+  // calls lets provider-side prompt caching (Anthropic/OpenAI cached input)
+  // hit on the large static template, cutting input-token cost and TTFT.
+  const systemPrompt = promptTemplate.replace(
+    CAPEX_PLACEHOLDER_RE,
+    (_match, name: string) => CAPEX_PLACEHOLDER_POINTERS[name],
+  );
+
+  const projectDataBlock = `PROJECT & EQUIPMENT DATA:\n${equipmentDataString}\n\nPROJECT CONTEXT:\n${upifContextString}`;
+
+  const cacheKey = capexCacheKey([normalizedType, promptKey, equipmentDataString, upifContextString, model]);
+  const cached = getCachedCapex(cacheKey);
+  if (cached) {
+    console.log(`CapEx AI: Cache hit for project type ${normalizedType.toUpperCase()} — skipping LLM call`);
+    return {
+      results: structuredClone(cached.results),
+      provider: cached.provider,
+      providerLabel: providerLabels[cached.provider] || cached.provider,
+    };
+  }
 
   console.log(`CapEx AI: Generating for project type ${normalizedType.toUpperCase()} using ${model} (prompt: ${promptKey})`);
   console.log(`CapEx AI: Equipment data length: ${equipmentDataString.length} chars, UPIF context: ${upifContextString.length} chars`);
 
   try {
-    const results = await generateCapexParallel(systemPrompt, model, normalizedType.toUpperCase());
+    const results = await generateCapexParallel(systemPrompt, projectDataBlock, model, normalizedType.toUpperCase());
     console.log(`CapEx AI: Parallel generation succeeded — ${results.lineItems.length} line items`);
+    setCachedCapex(cacheKey, structuredClone(results), model);
     return {
       results,
       provider: model,
@@ -613,10 +851,11 @@ export async function generateCapexWithAI(
     model,
     messages: [
       { role: "system", content: systemPrompt },
-      { role: "user", content: capexUserMsg },
+      { role: "user", content: `${projectDataBlock}\n\n${capexUserMsg}` },
     ],
     maxTokens: capexMaxTokens,
     jsonMode: true,
+    jsonSchema: CAPEX_RESPONSE_SCHEMA,
   });
 
   console.log(`CapEx AI: Fallback response received from ${response.provider}, ${response.content.length} chars, stop_reason=${response.stopReason || "unknown"}`);
@@ -624,9 +863,33 @@ export async function generateCapexWithAI(
   const parsed = parseAndRepairCapexJSON(response.content, "CapEx-Fallback");
   const results = validateCapexResults(parsed, normalizedType.toUpperCase());
 
+  setCachedCapex(cacheKey, structuredClone(results), response.provider as LLMProvider);
+
   return {
     results,
     provider: response.provider as LLMProvider,
     providerLabel: providerLabels[response.provider as LLMProvider] || response.provider,
   };
 }
+
+/**
+ * Generates CapEx for several project types (e.g., A/B/C/D what-if scenarios)
+ * concurrently. Each scenario is an independent LLM round-trip, so fanning
+ * out with Promise.all completes in roughly max(latency) instead of the sum —
+ * llmComplete and the underlying SDK clients already pool connections, and
+ * the response cache keys include the project type, so scenarios never
+ * collide. Results are returned in the same order as projectTypes.
+ */
+export async function generateCapexScenarios(
+  upif: any,
+  massBalanceResults: MassBalanceResults,
+  projectTypes: string[],
+  preferredModel: LLMProvider = "gpt5",
+  storage?: any,
+): Promise<CapexAIResult[]> {
+  return Promise.all(
+    projectTypes.map(projectType =>
+      generateCapexWithAI(upif, massBalanceResults, projectType, preferredModel, storage)
+    )
+  );
+}
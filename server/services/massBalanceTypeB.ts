@@ -11,13 +11,41 @@ import {
   getProdevalEquipmentList,
   getProdevalGasTrainDesignCriteria,
 } from "@shared/prodeval-equipment-library";
+import { createHash } from "crypto";
 import type { DesignOverrides } from "./designOverrides";
 
 type DesignCriterion = { value: number; unit: string; source: string };
 
 const KG_PER_US_TON = 907.185;
 
-const AD_DESIGN_DEFAULTS: Record<string, Record<string, DesignCriterion>> = {
+// Compiled once at module load; inline regex literals are re-created on every
+// evaluation of the enclosing expression in V8.
+const COMMA_RE = /,/g;
+const COMMA_PCT_RE = /[,%]/g;
+
+/**
+ * Exact shape of the Type B design defaults. Typing each section and criterion
+ * explicitly (rather than Record<string, ...>) makes every access below
+ * compile-checked — a typoed criterion name is an error, not a runtime
+ * undefined — and keeps the object monomorphic for V8.
+ */
+interface ADDesignDefaults {
+  receiving: { receivingCapacity: DesignCriterion; storageTime: DesignCriterion };
+  maceration: { targetParticleSize: DesignCriterion; depackagingRejectRate: DesignCriterion; contaminantRemoval: DesignCriterion };
+  equalization: { retentionTime: DesignCriterion; preheatTemp: DesignCriterion; targetTS: DesignCriterion };
+  digester: {
+    hrt: DesignCriterion; organicLoadingRate: DesignCriterion; vsDestruction: DesignCriterion;
+    temperature: DesignCriterion; mixingPower: DesignCriterion; gasYield: DesignCriterion;
+    ch4Content: DesignCriterion; co2Content: DesignCriterion; h2sContent: DesignCriterion;
+    headspacePct: DesignCriterion;
+  };
+  centrifuge: { solidsCaptureEff: DesignCriterion; cakeSolids: DesignCriterion; polymerDose: DesignCriterion };
+  daf: { tssRemoval: DesignCriterion; fogRemoval: DesignCriterion; hydraulicLoading: DesignCriterion; floatRecycleToDigester: DesignCriterion };
+  gasConditioning: { h2sRemovalEff: DesignCriterion; moistureRemoval: DesignCriterion; siloxaneRemoval: DesignCriterion; volumeLoss: DesignCriterion };
+  gasUpgrading: { methaneRecovery: DesignCriterion; productCH4: DesignCriterion; electricalDemand: DesignCriterion; pressureOut: DesignCriterion };
+}
+
+const AD_DESIGN_DEFAULTS: ADDesignDefaults = {
   receiving: {
     receivingCapacity: { value: 1.5, unit: "x design throughput", source: "Engineering practice" },
     storageTime: { value: 3, unit: "days", source: "Engineering practice" },
@@ -69,59 +97,139 @@ const AD_DESIGN_DEFAULTS: Record<string, Record<string, DesignCriterion>> = {
   },
 };
 
+// tons/day conversion factor per canonical unit token. Water-based volumetric
+// units assume 8.34 lb/gal.
+const UNIT_FACTORS: Record<string, number> = {
+  "ton/year": 1 / 365,
+  "ton/day": 1,
+  "ton/week": 1 / 7,
+  "ton/month": 1 / 30,
+  "ton": 1 / 365,
+  "lb/day": 1 / 2000,
+  "kg/day": 1 / KG_PER_US_TON,
+  "kg": 1 / KG_PER_US_TON,
+  "mgal/day": 1_000_000 * 8.34 / 2000,
+  "gal/day": 8.34 / 2000,
+  "gal/min": 1440 * 8.34 / 2000,
+  "gal/hour": 24 * 8.34 / 2000,
+  "m3/day": 264.172 * 8.34 / 2000,
+  "liter/day": 0.264172 * 8.34 / 2000,
+};
+
+/** Maps a free-form lowercased unit string to a UNIT_FACTORS key, or undefined if unrecognized. */
+function canonicalUnit(unit: string): string | undefined {
+  if (unit.includes("ton")) {
+    if (unit.includes("year")) return "ton/year";
+    if (unit.includes("day")) return "ton/day";
+    if (unit.includes("week")) return "ton/week";
+    if (unit.includes("month")) return "ton/month";
+    return "ton";
+  }
+  if (unit.includes("lb") && unit.includes("day")) return "lb/day";
+  if (unit.includes("kg")) return unit.includes("day") ? "kg/day" : "kg";
+  if (unit === "mgd" || unit === "mg/d" || (unit.includes("million") && unit.includes("gallon"))) return "mgal/day";
+  if (unit === "gpd" || unit === "gal/day" || unit === "gal/d" || (unit.includes("gallon") && unit.includes("day"))) return "gal/day";
+  if (unit === "gpm" || (unit.includes("gallon") && unit.includes("min"))) return "gal/min";
+  if (unit === "gph" || (unit.includes("gallon") && unit.includes("hour"))) return "gal/hour";
+  if ((unit.includes("m³") || unit.includes("m3")) && (unit.includes("day") || unit.includes("/d"))) return "m3/day";
+  if (unit.includes("liter") && unit.includes("day")) return "liter/day";
+  return undefined;
+}
+
+// Unit strings repeat across feedstocks and scenarios, so memoize the
+// substring-scan dispatch. Bounded since values come from user input.
+const unitFactorCache = new Map<string, number | undefined>();
+const UNIT_FACTOR_CACHE_MAX = 64;
+
 function parseFeedstockVolume(fs: FeedstockEntry): { tpd: number; unit: string } {
-  const vol = parseFloat((fs.feedstockVolume || "0").replace(/,/g, ""));
+  const vol = parseFloat((fs.feedstockVolume || "0").replace(COMMA_RE, ""));
   const unit = (fs.feedstockUnit || "").toLowerCase().trim();
-  if (isNaN(vol) || vol <= 0) return { tpd: 0, unit: "tons/day" };
-
-  if (unit.includes("ton") && unit.includes("year")) return { tpd: vol / 365, unit: "tons/day" };
-  if (unit.includes("ton") && unit.includes("day")) return { tpd: vol, unit: "tons/day" };
-  if (unit.includes("ton") && unit.includes("week")) return { tpd: vol / 7, unit: "tons/day" };
-  if (unit.includes("ton") && unit.includes("month")) return { tpd: vol / 30, unit: "tons/day" };
-  if (unit.includes("ton")) return { tpd: vol / 365, unit: "tons/day" };
-
-  if (unit.includes("lb") && unit.includes("day")) return { tpd: vol / 2000, unit: "tons/day" };
-  if (unit.includes("kg") && unit.includes("day")) return { tpd: vol / 907.185, unit: "tons/day" };
-  if (unit.includes("kg")) return { tpd: vol / 907.185, unit: "tons/day" };
-
-  if (unit === "mgd" || unit === "mg/d" || (unit.includes("million") && unit.includes("gallon")))
-    return { tpd: vol * 1_000_000 * 8.34 / 2000, unit: "tons/day" };
-  if (unit === "gpd" || (unit.includes("gallon") && unit.includes("day")) || (unit === "gal/day") || (unit === "gal/d"))
-    return { tpd: vol * 8.34 / 2000, unit: "tons/day" };
-  if (unit === "gpm" || (unit.includes("gallon") && unit.includes("min")))
-    return { tpd: vol * 1440 * 8.34 / 2000, unit: "tons/day" };
-  if (unit === "gph" || (unit.includes("gallon") && unit.includes("hour")))
-    return { tpd: vol * 24 * 8.34 / 2000, unit: "tons/day" };
-
-  if ((unit.includes("m³") || unit.includes("m3")) && (unit.includes("day") || unit.includes("/d")))
-    return { tpd: vol * 264.172 * 8.34 / 2000, unit: "tons/day" };
-  if (unit.includes("liter") && unit.includes("day")) return { tpd: vol * 0.264172 * 8.34 / 2000, unit: "tons/day" };
-
-  console.warn(`parseFeedstockVolume: Unrecognized unit "${fs.feedstockUnit}" for feedstock "${fs.feedstockType}", treating ${vol} as tons/day`);
-  return { tpd: vol, unit: "tons/day" };
+  if (Number.isNaN(vol) || vol <= 0) return { tpd: 0, unit: "tons/day" };
+
+  let factor = unitFactorCache.get(unit);
+  if (factor === undefined && !unitFactorCache.has(unit)) {
+    const canonical = canonicalUnit(unit);
+    factor = canonical !== undefined ? UNIT_FACTORS[canonical] : undefined;
+    if (unitFactorCache.size >= UNIT_FACTOR_CACHE_MAX) unitFactorCache.clear();
+    unitFactorCache.set(unit, factor);
+  }
+  if (factor === undefined) {
+    console.warn(`parseFeedstockVolume: Unrecognized unit "${fs.feedstockUnit}" for feedstock "${fs.feedstockType}", treating ${vol} as tons/day`);
+    return { tpd: vol, unit: "tons/day" };
+  }
+  return { tpd: vol * factor, unit: "tons/day" };
 }
 
-function getSpecValue(fs: FeedstockEntry, keys: string[], defaultVal: number): number {
-  if (!fs.feedstockSpecs) return defaultVal;
-  for (const key of keys) {
+type SpecEntry = { keyLower: string; displayNameLower: string; value: number };
+
+type SpecIndex = { byKey: Map<string, number>; entries: SpecEntry[] };
+
+/**
+ * Lowercases and parses a feedstock's specs once so the several getSpecValue
+ * probes per feedstock scan pre-normalized entries instead of re-lowercasing
+ * and re-parsing every spec on every probe. Exact key lookups go through the
+ * Map; the entry list remains for display-name substring fallback.
+ */
+function indexSpecs(fs: FeedstockEntry): SpecIndex {
+  const byKey = new Map<string, number>();
+  const entries: SpecEntry[] = [];
+  if (fs.feedstockSpecs) {
     for (const [k, spec] of Object.entries(fs.feedstockSpecs)) {
-      if (k.toLowerCase() === key.toLowerCase() ||
-          spec.displayName.toLowerCase().includes(key.toLowerCase())) {
-        const val = parseFloat(String(spec.value).replace(/[,%]/g, ""));
-        if (!isNaN(val)) return val;
+      const value = parseFloat(String(spec.value).replace(COMMA_PCT_RE, ""));
+      // Unparseable values can never satisfy a probe, so drop them here
+      // instead of re-checking for NaN on every lookup.
+      if (Number.isNaN(value)) continue;
+      const keyLower = k.toLowerCase();
+      if (!byKey.has(keyLower)) byKey.set(keyLower, value);
+      entries.push({ keyLower, displayNameLower: spec.displayName.toLowerCase(), value });
+    }
+  }
+  return { byKey, entries };
+}
+
+// Probe keys, lowercased once at module load so getSpecValue compares
+// pre-normalized strings without allocating per call. Each list is ordered
+// from the canonical UPIF key to looser display-name fragments.
+const TS_KEYS = ["totalsolids", "total solids", "ts"];
+const VS_KEYS = ["volatilesolids", "volatile solids", "vs", "vs/ts"];
+const BMP_KEYS = ["methanepotential", "bmp", "biochemical methane potential"];
+const CN_KEYS = ["cnratio", "c:n ratio", "c:n", "c/n"];
+const COD_KEYS = ["cod", "chemical oxygen demand"];
+const TKN_KEYS = ["tkn", "total kjeldahl nitrogen"];
+const TP_KEYS = ["tp", "total phosphorus", "totalphosphorus"];
+const SCOD_KEYS = ["solublecod", "soluble cod", "scod", "scod fraction"];
+
+function getSpecValue(specs: SpecIndex, lowerKeys: string[], defaultVal: number): number {
+  for (const keyLower of lowerKeys) {
+    const exact = specs.byKey.get(keyLower);
+    if (exact !== undefined) return exact;
+    for (const entry of specs.entries) {
+      if (entry.displayNameLower.includes(keyLower)) {
+        return entry.value;
       }
     }
   }
   return defaultVal;
 }
 
+// roundTo fires hundreds of times per mass balance; look the factor up
+// instead of recomputing Math.pow(10, n) on every call.
+const POW10 = [1, 10, 100, 1000, 10000, 100000, 1000000];
+
 function roundTo(val: number, decimals: number = 1): number {
-  const factor = Math.pow(10, decimals);
+  const factor = POW10[decimals] ?? Math.pow(10, decimals);
   return Math.round(val * factor) / factor;
 }
 
+// Named so the arithmetic below multiplies by one resolved constant instead
+// of repeating magic-number divide/multiply chains inline.
+const SCF_PER_M3 = 35.3147;
+const LB_PER_KG = 2.2046;
+const BTU_PER_SCF_CH4 = 1012;
+const GAL_PER_US_TON_WATER = KG_PER_US_TON / 3.785;
+
 function m3ToGal(m3: number): number { return m3 * 264.172; }
-function m3ToScf(m3: number): number { return m3 * 35.3147; }
+function m3ToScf(m3: number): number { return m3 * SCF_PER_M3; }
 function m3PerMinToGpm(m3min: number): number { return m3min * 264.172; }
 function kWToHP(kw: number): number { return roundTo(kw * 1.341, 1); }
 function galToFt3(gal: number): number { return gal / 7.481; }
@@ -139,16 +247,52 @@ function rectDimensions(volumeGal: number, depthFt: number = 8): { lengthFt: num
   return { lengthFt, widthFt, heightFt: depthFt };
 }
 
+// Keywords that mark a feedstock as packaged waste. Extend this list rather
+// than the regex below; "packag" also covers "packaged"/"package"/"depackag"
+// as substrings.
+const PACKAGED_KEYWORDS = ["packag", "wrapped", "containerized", "bagged"];
+
+// Compiled once into a single alternation: one pass over the text instead of
+// one scan per keyword, and case-insensitivity avoids allocating a lowercased
+// copy of the text.
+const PACKAGED_RE = new RegExp(PACKAGED_KEYWORDS.join("|"), "i");
+
+/**
+ * Tests every string in a nested object/array structure (keys and leaves)
+ * against a regex without serializing the structure to JSON first.
+ */
+function anyStringMatches(obj: unknown, re: RegExp): boolean {
+  const stack: unknown[] = [obj];
+  while (stack.length > 0) {
+    const current = stack.pop();
+    if (typeof current === "string") {
+      if (re.test(current)) return true;
+    } else if (Array.isArray(current)) {
+      for (const item of current) stack.push(item);
+    } else if (current && typeof current === "object") {
+      for (const [key, value] of Object.entries(current)) {
+        if (re.test(key)) return true;
+        stack.push(value);
+      }
+    }
+  }
+  return false;
+}
+
 function hasPackagedWaste(feedstocks: FeedstockEntry[]): boolean {
-  const keywords = ["packaged", "package", "depackag", "wrapped", "containerized", "bagged"];
-  return feedstocks.some(fs => {
-    const text = ((fs.feedstockType || "") + " " + JSON.stringify(fs.feedstockSpecs || {})).toLowerCase();
-    return keywords.some(kw => text.includes(kw));
-  });
+  return feedstocks.some(fs =>
+    PACKAGED_RE.test(fs.feedstockType || "") ||
+    anyStringMatches(fs.feedstockSpecs || {}, PACKAGED_RE)
+  );
 }
 
 type StreamParam = { value: number; unit: string };
 
+/** Shorthand for the numeric `{ value, unit }` pairs used in process streams. */
+function vu(value: number, unit: string): StreamParam {
+  return { value, unit };
+}
+
 function buildSolidsStream(tpd: number, tsPct: number, vsPctOfTs: number, codMgL: number = 0): Record<string, StreamParam> {
   const tpy = roundTo(tpd * 365, 0);
   const lbPerDay = roundTo(tpd * 2000, 0);
@@ -158,16 +302,16 @@ function buildSolidsStream(tpd: number, tsPct: number, vsPctOfTs: number, codMgL
   const vsLbPerDay = roundTo(tsLbPerDay * (vsPctOfTs / 100), 0);
   const codLbPerDay = codMgL > 0 ? roundTo(codMgL * gpd * 8.34 / 1_000_000, 0) : 0;
   return {
-    flowTonsPerYear: { value: tpy, unit: "tons/year" },
-    flowTonsPerDay: { value: roundTo(tpd), unit: "tons/day" },
-    flowLbPerDay: { value: lbPerDay, unit: "lb/d" },
-    flowGPD: { value: gpd, unit: "GPD" },
-    totalSolidsPct: { value: roundTo(tsPct), unit: "%" },
-    volatileSolidsPct: { value: roundTo(vsPctOfTs), unit: "%" },
-    totalSolidsLbPerDay: { value: tsLbPerDay, unit: "lb/d" },
-    volatileSolidsLbPerDay: { value: vsLbPerDay, unit: "lb/d" },
-    codMgL: { value: roundTo(codMgL, 0), unit: "mg/L" },
-    codLbPerDay: { value: codLbPerDay, unit: "lb/d" },
+    flowTonsPerYear: vu(tpy, "tons/year"),
+    flowTonsPerDay: vu(roundTo(tpd), "tons/day"),
+    flowLbPerDay: vu(lbPerDay, "lb/d"),
+    flowGPD: vu(gpd, "GPD"),
+    totalSolidsPct: vu(roundTo(tsPct), "%"),
+    volatileSolidsPct: vu(roundTo(vsPctOfTs), "%"),
+    totalSolidsLbPerDay: vu(tsLbPerDay, "lb/d"),
+    volatileSolidsLbPerDay: vu(vsLbPerDay, "lb/d"),
+    codMgL: vu(roundTo(codMgL, 0), "mg/L"),
+    codLbPerDay: vu(codLbPerDay, "lb/d"),
   };
 }
 
@@ -175,29 +319,29 @@ function buildCodFractionation(codMgL: number, scodFraction: number = 0.3, codVs
   const scodMgL = roundTo(codMgL * scodFraction, 0);
   const pcodMgL = roundTo(codMgL * (1 - scodFraction), 0);
   return {
-    scodMgL: { value: scodMgL, unit: "mg/L" },
-    pcodMgL: { value: pcodMgL, unit: "mg/L" },
-    codVsRatio: { value: roundTo(codVsRatio, 2), unit: "lb COD/lb VS" },
+    scodMgL: vu(scodMgL, "mg/L"),
+    pcodMgL: vu(pcodMgL, "mg/L"),
+    codVsRatio: vu(roundTo(codVsRatio, 2), "lb COD/lb VS"),
   };
 }
 
 function buildGasStream(avgScfm: number, pressurePsig: number, ch4Pct: number, co2Pct: number, h2sPpm: number, n2Pct: number = 1.0, o2Pct: number = 0.5): Record<string, StreamParam> {
   const maxScfm = roundTo(avgScfm * 1.3);
   const minScfm = roundTo(avgScfm * 0.6);
-  const btuPerScf = roundTo(ch4Pct / 100 * 1012, 0);
+  const btuPerScf = roundTo(ch4Pct / 100 * BTU_PER_SCF_CH4, 0);
   const mmbtuPerDay = roundTo(avgScfm * 1440 * btuPerScf / 1_000_000, 1);
   return {
-    avgFlowScfm: { value: roundTo(avgScfm), unit: "SCFM" },
-    maxFlowScfm: { value: maxScfm, unit: "SCFM" },
-    minFlowScfm: { value: minScfm, unit: "SCFM" },
-    pressurePsig: { value: roundTo(pressurePsig), unit: "psig" },
-    ch4: { value: roundTo(ch4Pct, 1), unit: "%" },
-    co2: { value: roundTo(co2Pct, 1), unit: "%" },
-    h2s: { value: roundTo(h2sPpm, 0), unit: "ppm" },
-    n2: { value: roundTo(n2Pct, 1), unit: "%" },
-    o2: { value: roundTo(o2Pct, 1), unit: "%" },
-    btuPerScf: { value: btuPerScf, unit: "Btu/SCF" },
-    mmbtuPerDay: { value: mmbtuPerDay, unit: "MMBtu/Day" },
+    avgFlowScfm: vu(roundTo(avgScfm), "SCFM"),
+    maxFlowScfm: vu(maxScfm, "SCFM"),
+    minFlowScfm: vu(minScfm, "SCFM"),
+    pressurePsig: vu(roundTo(pressurePsig), "psig"),
+    ch4: vu(roundTo(ch4Pct, 1), "%"),
+    co2: vu(roundTo(co2Pct, 1), "%"),
+    h2s: vu(roundTo(h2sPpm, 0), "ppm"),
+    n2: vu(roundTo(n2Pct, 1), "%"),
+    o2: vu(roundTo(o2Pct, 1), "%"),
+    btuPerScf: vu(btuPerScf, "Btu/SCF"),
+    mmbtuPerDay: vu(mmbtuPerDay, "MMBtu/Day"),
   };
 }
 
@@ -208,31 +352,204 @@ function buildWastewaterStream(
   tnLbPerDay: number, tknLbPerDay: number, nh3nLbPerDay: number, tpLbPerDay: number
 ): Record<string, StreamParam> {
   return {
-    wetFlowLbPerDay: { value: roundTo(wetFlowLbPerDay, 0), unit: "lb/d" },
-    tsLbPerDay: { value: roundTo(tsLbPerDay, 0), unit: "lb/d" },
-    vsLbPerDay: { value: roundTo(vsLbPerDay, 0), unit: "lb/d" },
-    tssLbPerDay: { value: roundTo(tssLbPerDay, 0), unit: "lb/d" },
-    vssLbPerDay: { value: roundTo(vssLbPerDay, 0), unit: "lb/d" },
-    codLbPerDay: { value: roundTo(codLbPerDay, 0), unit: "lb/d" },
-    scodLbPerDay: { value: roundTo(scodLbPerDay, 0), unit: "lb/d" },
-    rbscodLbPerDay: { value: roundTo(rbscodLbPerDay, 0), unit: "lb/d" },
-    rscodLbPerDay: { value: roundTo(rscodLbPerDay, 0), unit: "lb/d" },
-    tnLbPerDay: { value: roundTo(tnLbPerDay, 0), unit: "lb/d" },
-    tknLbPerDay: { value: roundTo(tknLbPerDay, 0), unit: "lb/d" },
-    nh3nLbPerDay: { value: roundTo(nh3nLbPerDay, 0), unit: "lb/d" },
-    tpLbPerDay: { value: roundTo(tpLbPerDay, 0), unit: "lb/d" },
+    wetFlowLbPerDay: vu(roundTo(wetFlowLbPerDay, 0), "lb/d"),
+    tsLbPerDay: vu(roundTo(tsLbPerDay, 0), "lb/d"),
+    vsLbPerDay: vu(roundTo(vsLbPerDay, 0), "lb/d"),
+    tssLbPerDay: vu(roundTo(tssLbPerDay, 0), "lb/d"),
+    vssLbPerDay: vu(roundTo(vssLbPerDay, 0), "lb/d"),
+    codLbPerDay: vu(roundTo(codLbPerDay, 0), "lb/d"),
+    scodLbPerDay: vu(roundTo(scodLbPerDay, 0), "lb/d"),
+    rbscodLbPerDay: vu(roundTo(rbscodLbPerDay, 0), "lb/d"),
+    rscodLbPerDay: vu(roundTo(rscodLbPerDay, 0), "lb/d"),
+    tnLbPerDay: vu(roundTo(tnLbPerDay, 0), "lb/d"),
+    tknLbPerDay: vu(roundTo(tknLbPerDay, 0), "lb/d"),
+    nh3nLbPerDay: vu(roundTo(nh3nLbPerDay, 0), "lb/d"),
+    tpLbPerDay: vu(roundTo(tpLbPerDay, 0), "lb/d"),
   };
 }
 
+const NUMBER_FORMATTERS: Intl.NumberFormat[] = [];
+
 function fmt(v: number, decimals: number = 1): string {
-  return roundTo(v, decimals).toLocaleString();
+  const formatter = (NUMBER_FORMATTERS[decimals] ??= new Intl.NumberFormat(undefined, {
+    maximumFractionDigits: decimals,
+  }));
+  return formatter.format(v);
+}
+
+/**
+ * Shorthand for the `{ value, unit }` pairs that make up equipment specs.
+ *
+ * Spec values are strings by contract: EquipmentItem.specs in the shared
+ * schema is `{ value: string; unit: string }`, persisted as jsonb and edited
+ * as text in the client. Calculations therefore stay numeric all the way to
+ * this helper, which is the single point where a value is stringified.
+ */
+function spec(value: string | number, unit: string): { value: string; unit: string } {
+  return { value: typeof value === "string" ? value : String(value), unit };
+}
+
+/** Flags every generated equipment item starts with. */
+const EQUIP_FLAGS = { isOverridden: false, isLocked: false } as const;
+
+/** Numeric per-feedstock properties extracted from the UPIF specs. */
+interface FeedstockProperties {
+  tpd: number;
+  ts: number;
+  vsOfTs: number;
+  bmp: number;
+  cn: number;
+  codMgL: number;
+  tknMgL: number;
+  tpMgL: number;
+  scodPct: number;
 }
 
-function cloneDefaults(): Record<string, Record<string, DesignCriterion>> {
-  return JSON.parse(JSON.stringify(AD_DESIGN_DEFAULTS));
+interface FeedstockBlend {
+  totalFeedTpd: number;
+  totalVSLoadKgPerDay: number;
+  weightedTS: number;
+  weightedVS: number;
+  weightedBMP: number;
+  weightedCN: number;
+  weightedCOD: number;
+  weightedTKN: number;
+  weightedTP: number;
+  weightedSCODPct: number;
+  totalWeightForAvg: number;
 }
 
-function applyDesignOverrides(defaults: Record<string, Record<string, DesignCriterion>>, overrides: DesignOverrides): void {
+/**
+ * Reduce per-feedstock properties into flow-weighted totals. Pure numeric
+ * kernel over a single array shape, kept separate from the spec parsing and
+ * warning logic so the engine can compile it as one monomorphic loop.
+ */
+function blendFeedstocks(feedProps: FeedstockProperties[]): FeedstockBlend {
+  let totalFeedTpd = 0;
+  let totalVSLoadKgPerDay = 0;
+  let weightedTS = 0;
+  let weightedVS = 0;
+  let weightedBMP = 0;
+  let weightedCN = 0;
+  let weightedCOD = 0;
+  let weightedTKN = 0;
+  let weightedTP = 0;
+  let weightedSCODPct = 0;
+  let totalWeightForAvg = 0;
+
+  for (let i = 0; i < feedProps.length; i++) {
+    const p = feedProps[i];
+    const feedKgPerDay = p.tpd * KG_PER_US_TON;
+    const tsKg = feedKgPerDay * (p.ts / 100);
+    const vsKg = tsKg * (p.vsOfTs / 100);
+
+    totalFeedTpd += p.tpd;
+    totalVSLoadKgPerDay += vsKg;
+    weightedTS += p.ts * p.tpd;
+    weightedVS += p.vsOfTs * p.tpd;
+    weightedBMP += p.bmp * vsKg;
+    weightedCN += p.cn * p.tpd;
+    weightedCOD += p.codMgL * p.tpd;
+    weightedTKN += p.tknMgL * p.tpd;
+    weightedTP += p.tpMgL * p.tpd;
+    weightedSCODPct += p.scodPct * p.tpd;
+    totalWeightForAvg += p.tpd;
+  }
+
+  return {
+    totalFeedTpd,
+    totalVSLoadKgPerDay,
+    weightedTS,
+    weightedVS,
+    weightedBMP,
+    weightedCN,
+    weightedCOD,
+    weightedTKN,
+    weightedTP,
+    weightedSCODPct,
+    totalWeightForAvg,
+  };
+}
+
+/** Derived gas-train quantities for the conditioning and upgrading stages. */
+interface GasTrainFlows {
+  outH2sPpmv: number;
+  conditionedBiogasM3PerDay: number;
+  conditionedScfm: number;
+  rngCH4M3PerDay: number;
+  rngM3PerDay: number;
+  rngScfPerDay: number;
+  rngScfm: number;
+  rngMMBtuPerDay: number;
+  tailgasM3PerDay: number;
+  electricalDemandKW: number;
+}
+
+/**
+ * Scalar math for biogas conditioning and RNG upgrading. Like
+ * blendFeedstocks, this is a pure numeric kernel: design criteria arrive as
+ * plain numbers (fractions, not percents) and only numbers come back, so the
+ * stage/equipment assembly stays out of the hot arithmetic.
+ *
+ * The kernel holds no per-call state, so scenario sweeps can map it over a
+ * batch of inputs directly instead of re-running the full mass balance to
+ * vary gas-train parameters.
+ */
+function computeGasTrainFlows(
+  biogasM3PerDay: number,
+  biogasScfPerDay: number,
+  biogasScfm: number,
+  ch4M3PerDay: number,
+  h2sPpmv: number,
+  h2sRemovalEff: number,
+  volumeLossPct: number,
+  methaneRecovery: number,
+  productCH4: number,
+  electricalDemandPerScfd: number,
+  rngScfmOverride?: number,
+): GasTrainFlows {
+  const outH2sPpmv = h2sPpmv * (1 - h2sRemovalEff);
+  const conditionedBiogasM3PerDay = biogasM3PerDay * (1 - volumeLossPct);
+  const conditionedScfm = biogasScfm * (1 - volumeLossPct);
+
+  let rngCH4M3PerDay = ch4M3PerDay * methaneRecovery;
+  let rngM3PerDay = rngCH4M3PerDay / (productCH4 / 100);
+  let rngScfPerDay = m3ToScf(rngM3PerDay);
+  let rngScfm = rngScfPerDay / 1440;
+
+  if (rngScfmOverride !== undefined) {
+    rngScfm = rngScfmOverride;
+    rngScfPerDay = rngScfm * 1440;
+    rngM3PerDay = rngScfPerDay / SCF_PER_M3;
+    rngCH4M3PerDay = rngM3PerDay * (productCH4 / 100);
+  }
+  const rngMMBtuPerDay = rngScfPerDay * BTU_PER_SCF_CH4 / 1_000_000;
+
+  const tailgasM3PerDay = conditionedBiogasM3PerDay - rngM3PerDay;
+  // biogasScfPerDay is the same quantity the digester stage already
+  // computed; reuse it rather than converting biogasM3PerDay again.
+  const electricalDemandKW = biogasScfPerDay * electricalDemandPerScfd / (1000 * 24);
+
+  return {
+    outH2sPpmv,
+    conditionedBiogasM3PerDay,
+    conditionedScfm,
+    rngCH4M3PerDay,
+    rngM3PerDay,
+    rngScfPerDay,
+    rngScfm,
+    rngMMBtuPerDay,
+    tailgasM3PerDay,
+    electricalDemandKW,
+  };
+}
+
+
+function cloneDefaults(): ADDesignDefaults {
+  return structuredClone(AD_DESIGN_DEFAULTS);
+}
+
+function applyDesignOverrides(defaults: ADDesignDefaults, overrides: DesignOverrides): void {
   if (overrides.hrtDays !== undefined) defaults.digester.hrt.value = overrides.hrtDays;
   if (overrides.vsDestructionPct !== undefined) defaults.digester.vsDestruction.value = overrides.vsDestructionPct;
   if (overrides.olrTarget !== undefined) defaults.digester.organicLoadingRate.value = overrides.olrTarget;
@@ -256,7 +573,184 @@ function applyDesignOverrides(defaults: Record<string, Record<string, DesignCrit
   if (overrides.depackagingRejectRate !== undefined) defaults.maceration.depackagingRejectRate.value = overrides.depackagingRejectRate;
 }
 
+// Static portions of the generated equipment entries. Only id, specs and the
+// input-dependent fields vary per run, so the constant fields are shared at
+// module scope and spread into each entry.
+const RECEIVING_HOPPER_BASE = {
+  process: "Feedstock Receiving",
+  equipmentType: "Receiving Hopper / Tipping Floor",
+  description: "Covered receiving area with truck tipping floor and hopper for feedstock unloading",
+  notes: "Includes weigh scale, odor control, and leak detection",
+  ...EQUIP_FLAGS,
+} as const;
+
+const MACERATOR_BASE = {
+  process: "Feedstock Preparation",
+  equipmentType: "Macerator / Grinder",
+  description: "Industrial grinder for particle size reduction to < 15 mm",
+  quantity: 1,
+  designBasis: "1.25x design feed rate, < 15 mm particle output",
+  notes: "Includes magnetic separator for ferrous metal removal",
+  ...EQUIP_FLAGS,
+} as const;
+
+const DEPACKAGER_BASE = {
+  process: "Feedstock Preparation",
+  equipmentType: "Depackaging Unit",
+  description: "Separates organic content from packaging material (plastics, cartons, containers)",
+  quantity: 1,
+  designBasis: "1.25x design feed rate, 15-20% packaging reject",
+  notes: "Rejects conveyed to waste bin for disposal",
+  ...EQUIP_FLAGS,
+} as const;
+
+const EQ_TANK_BASE = {
+  process: "Equalization",
+  equipmentType: "Equalization Tank",
+  description: "Insulated blending and homogenization tank with continuous mixing",
+  quantity: 1,
+  notes: "Insulated concrete or steel tank with top-entry mixer",
+  ...EQUIP_FLAGS,
+} as const;
+
+const EQ_MIXER_BASE = {
+  process: "Equalization",
+  equipmentType: "EQ Tank Mixer",
+  description: "Top-entry mechanical mixer for slurry homogenization",
+  quantity: 1,
+  designBasis: "3 W/m³ mixing intensity for slurry homogenization",
+  notes: "Prevents settling and ensures consistent feed composition",
+  ...EQUIP_FLAGS,
+} as const;
+
+const FEED_HEATER_BASE = {
+  process: "Equalization",
+  equipmentType: "Feed Heat Exchanger",
+  description: "Shell-and-tube or spiral heat exchanger to pre-heat feed to mesophilic temperature",
+  quantity: 1,
+  notes: "Waste heat recovery from biogas utilization where available",
+  ...EQUIP_FLAGS,
+} as const;
+
+const FEED_PUMP_BASE = {
+  process: "Equalization",
+  equipmentType: "Digester Feed Pump",
+  description: "Progressive cavity pump for feeding slurry from EQ tank to digester",
+  quantity: 2,
+  designBasis: "Duty + standby (N+1 redundancy)",
+  notes: "Progressive cavity type suitable for high-solids slurry",
+  ...EQUIP_FLAGS,
+} as const;
+
+const CSTR_DIGESTER_BASE = {
+  process: "Anaerobic Digestion",
+  equipmentType: "CSTR Digester",
+  description: "Continuously Stirred Tank Reactor, mesophilic operation with gas collection dome",
+  notes: "Includes gas collection dome, internal heating coils, and insulation",
+  ...EQUIP_FLAGS,
+} as const;
+
+const DIGESTER_MIXER_BASE = {
+  process: "Anaerobic Digestion",
+  equipmentType: "Digester Mixer",
+  description: "Mechanical mixing system for digester contents",
+  notes: "Draft tube or top-entry mechanical mixer",
+  ...EQUIP_FLAGS,
+} as const;
+
+const DECANTER_CENTRIFUGE_BASE = {
+  process: "Solids-Liquid Separation",
+  equipmentType: "Decanter Centrifuge",
+  description: "High-speed decanter centrifuge for digestate dewatering",
+  quantity: 1,
+  notes: "Includes polymer make-down and dosing system",
+  ...EQUIP_FLAGS,
+} as const;
+
+const CAKE_CONVEYOR_BASE = {
+  process: "Solids-Liquid Separation",
+  equipmentType: "Cake Conveyor & Storage",
+  description: "Screw conveyor from centrifuge to cake storage bin for truck loadout",
+  quantity: 1,
+  designBasis: "3-day cake storage capacity",
+  notes: "Covered storage with truck loadout capability",
+  ...EQUIP_FLAGS,
+} as const;
+
+const DAF_UNIT_BASE = {
+  process: "Liquid Cleanup",
+  equipmentType: "Dissolved Air Flotation (DAF) Unit",
+  description: "DAF system for centrate polishing — removes residual TSS, FOG, and colloidal organics",
+  quantity: 1,
+  notes: "Includes recycle pump, saturator, chemical feed system (coagulant + polymer)",
+  ...EQUIP_FLAGS,
+} as const;
+
+const CENTRATE_TANK_BASE = {
+  process: "Liquid Cleanup",
+  equipmentType: "Centrate Collection Tank",
+  description: "Holding tank for centrate equalization before DAF treatment",
+  quantity: 1,
+  designBasis: "0.5-day equalization for consistent DAF feed",
+  notes: "Level-controlled pump to DAF unit",
+  ...EQUIP_FLAGS,
+} as const;
+
+const ENCLOSED_FLARE_BASE = {
+  process: "Gas Management",
+  equipmentType: "Enclosed Flare",
+  description: "Enclosed ground flare for excess biogas and tail gas combustion",
+  quantity: 1,
+  designBasis: "110% of maximum biogas production",
+  notes: "Required for startup, upset, and maintenance periods",
+  ...EQUIP_FLAGS,
+} as const;
+
+/*
+ * The returned MassBalanceResults is intentionally a plain JSON tree of
+ * { value, unit } objects rather than a flatter columnar layout: the shape is
+ * the shared-schema contract, persisted as jsonb and consumed field-by-field
+ * in the client. The vu()/spec() constructors keep every such object a single
+ * hidden class, which is where the allocation/locality win actually is for V8.
+ */
+
+/**
+ * Content-addressed cache for Type B results. The calculation is a pure
+ * function of the UPIF and overrides, so results are keyed on a SHA-256 of
+ * both and reused across repeated runs (UI refreshes, parameter sweeps that
+ * only vary downstream fields). LRU eviction via Map insertion order, same
+ * pattern as the CapEx response cache. Entries are deep-cloned on the way
+ * out so callers can mutate their copy without poisoning the cache.
+ */
+const TYPE_B_CACHE_MAX_ENTRIES = 128;
+
+const typeBResultCache = new Map<string, MassBalanceResults>();
+
 export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: DesignOverrides): MassBalanceResults {
+  const key = createHash("sha256")
+    .update(JSON.stringify(upif))
+    .update("\u0000")
+    .update(JSON.stringify(designOverrides ?? null))
+    .digest("hex");
+
+  const cached = typeBResultCache.get(key);
+  if (cached) {
+    // Re-insert to mark as most recently used (Map preserves insertion order)
+    typeBResultCache.delete(key);
+    typeBResultCache.set(key, cached);
+    return structuredClone(cached);
+  }
+
+  const results = calculateMassBalanceTypeBImpl(upif, designOverrides);
+  if (typeBResultCache.size >= TYPE_B_CACHE_MAX_ENTRIES) {
+    const oldest = typeBResultCache.keys().next().value;
+    if (oldest !== undefined) typeBResultCache.delete(oldest);
+  }
+  typeBResultCache.set(key, results);
+  return structuredClone(results);
+}
+
+function calculateMassBalanceTypeBImpl(upif: UpifRecord, designOverrides?: DesignOverrides): MassBalanceResults {
   const warnings: MassBalanceResults["warnings"] = [];
   const assumptions: MassBalanceResults["assumptions"] = [];
   const calculationSteps: CalculationStep[] = [];
@@ -271,6 +765,14 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     console.log(`Mass Balance Type B: Applying design overrides: ${JSON.stringify(designOverrides)}`);
   }
 
+  // Hot design criteria read repeatedly below; bound to locals once so each
+  // use is a single variable read instead of three property lookups.
+  const preheatTempC = defaults.equalization.preheatTemp.value;
+  const targetParticleSizeMm = defaults.maceration.targetParticleSize.value;
+  const mixingPowerWPerM3 = defaults.digester.mixingPower.value;
+  const dafHydraulicLoading = defaults.daf.hydraulicLoading.value;
+  const polymerDoseKgPerTon = defaults.centrifuge.polymerDose.value;
+
   const feedstocks = (upif.feedstocks || []) as FeedstockEntry[];
   if (feedstocks.length === 0) {
     warnings.push({ field: "Feedstock", message: "No feedstocks found in UPIF", severity: "error" });
@@ -289,53 +791,45 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     };
   }
 
-  let totalFeedTpd = 0;
-  let totalVSLoadKgPerDay = 0;
-  let weightedTS = 0;
-  let weightedVS = 0;
-  let weightedBMP = 0;
-  let weightedCN = 0;
-  let weightedCOD = 0;
-  let weightedTKN = 0;
-  let weightedTP = 0;
-  let weightedSCODPct = 0;
-  let totalWeightForAvg = 0;
-
-  for (const fs of feedstocks) {
-    const { tpd } = parseFeedstockVolume(fs);
+  // Parsed once here and reused below (e.g. for calculation-step inputs)
+  // instead of re-running the unit parse per consumer.
+  const parsedFeedstocks = feedstocks.map(fs => ({
+    name: fs.feedstockType || "Feedstock",
+    tpd: parseFeedstockVolume(fs).tpd,
+  }));
+
+  const feedProps: FeedstockProperties[] = [];
+  for (let i = 0; i < feedstocks.length; i++) {
+    const fs = feedstocks[i];
+    const { tpd } = parsedFeedstocks[i];
     if (tpd <= 0) {
       warnings.push({ field: "Volume", message: `No volume found for "${fs.feedstockType}"`, severity: "warning" });
       continue;
     }
-    const ts = getSpecValue(fs, ["totalSolids", "total solids", "ts"], 15);
-    const vsOfTs = getSpecValue(fs, ["volatileSolids", "volatile solids", "vs", "vs/ts"], 80);
-    const bmp = getSpecValue(fs, ["methanePotential", "bmp", "biochemical methane potential"], 0.30);
-    const cn = getSpecValue(fs, ["cnRatio", "c:n ratio", "c:n", "c/n"], 25);
-    const codMgL = getSpecValue(fs, ["cod", "chemical oxygen demand"], 0);
-    const tknMgL = getSpecValue(fs, ["tkn", "total kjeldahl nitrogen"], 0);
-    const tpMgL = getSpecValue(fs, ["tp", "total phosphorus", "totalPhosphorus"], 0);
-    const scodPct = getSpecValue(fs, ["solubleCOD", "soluble cod", "scod", "scod fraction"], 30);
-
-    const feedKgPerDay = tpd * KG_PER_US_TON;
-    const tsKg = feedKgPerDay * (ts / 100);
-    const vsKg = tsKg * (vsOfTs / 100);
-
-    totalFeedTpd += tpd;
-    totalVSLoadKgPerDay += vsKg;
-    weightedTS += ts * tpd;
-    weightedVS += vsOfTs * tpd;
-    weightedBMP += bmp * vsKg;
-    weightedCN += cn * tpd;
-    weightedCOD += codMgL * tpd;
-    weightedTKN += tknMgL * tpd;
-    weightedTP += tpMgL * tpd;
-    weightedSCODPct += scodPct * tpd;
-    totalWeightForAvg += tpd;
+    const specs = indexSpecs(fs);
+    const ts = getSpecValue(specs, TS_KEYS, 15);
+    const vsOfTs = getSpecValue(specs, VS_KEYS, 80);
+    feedProps.push({
+      tpd,
+      ts,
+      vsOfTs,
+      bmp: getSpecValue(specs, BMP_KEYS, 0.30),
+      cn: getSpecValue(specs, CN_KEYS, 25),
+      codMgL: getSpecValue(specs, COD_KEYS, 0),
+      tknMgL: getSpecValue(specs, TKN_KEYS, 0),
+      tpMgL: getSpecValue(specs, TP_KEYS, 0),
+      scodPct: getSpecValue(specs, SCOD_KEYS, 30),
+    });
 
     if (ts <= 0) assumptions.push({ parameter: `${fs.feedstockType} TS`, value: "15%", source: "Default assumption" });
     if (vsOfTs <= 0) assumptions.push({ parameter: `${fs.feedstockType} VS/TS`, value: "80%", source: "Default assumption" });
   }
 
+  const blend = blendFeedstocks(feedProps);
+  let totalFeedTpd = blend.totalFeedTpd;
+  let totalVSLoadKgPerDay = blend.totalVSLoadKgPerDay;
+  let totalWeightForAvg = blend.totalWeightForAvg;
+
   if (designOverrides?.feedTpd !== undefined && designOverrides.feedTpd > 0) {
     const scaleFactor = designOverrides.feedTpd / (totalFeedTpd || 1);
     console.log(`Mass Balance Type B: Feed TPD overridden from ${totalFeedTpd} to ${designOverrides.feedTpd} (scale factor: ${scaleFactor.toFixed(3)})`);
@@ -361,16 +855,18 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     };
   }
 
-  let avgTS = designOverrides?.totalSolidsPct ?? (weightedTS / totalWeightForAvg);
-  let avgVS = designOverrides?.volatileSolidsPct ?? (weightedVS / totalWeightForAvg);
-  const avgBMP = totalVSLoadKgPerDay > 0 ? weightedBMP / totalVSLoadKgPerDay : 0.30;
-  const avgCN = weightedCN / totalWeightForAvg;
-  const avgCOD = weightedCOD / totalWeightForAvg;
-  const avgTKN = weightedTKN / totalWeightForAvg;
-  const avgTP = weightedTP / totalWeightForAvg;
+  let avgTS = designOverrides?.totalSolidsPct ?? (blend.weightedTS / totalWeightForAvg);
+  let avgVS = designOverrides?.volatileSolidsPct ?? (blend.weightedVS / totalWeightForAvg);
+  const avgTSRounded = roundTo(avgTS);
+  const avgVSRounded = roundTo(avgVS);
+  const avgBMP = totalVSLoadKgPerDay > 0 ? blend.weightedBMP / totalVSLoadKgPerDay : 0.30;
+  const avgCN = blend.weightedCN / totalWeightForAvg;
+  const avgCOD = blend.weightedCOD / totalWeightForAvg;
+  const avgTKN = blend.weightedTKN / totalWeightForAvg;
+  const avgTP = blend.weightedTP / totalWeightForAvg;
   const isPackaged = hasPackagedWaste(feedstocks);
 
-  const avgSCODPct = weightedSCODPct / totalWeightForAvg;
+  const avgSCODPct = blend.weightedSCODPct / totalWeightForAvg;
   const scodFraction = avgSCODPct / 100;
   const totalFeedLbPerDay = totalFeedTpd * 2000;
   const feedDensityLbPerGal = 8.34 + (avgTS / 100) * 0.5;
@@ -387,10 +883,18 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
   const totalTPLbPerDay = avgTP > 0 ? roundTo(avgTP * totalFeedGPD * 8.34 / 1_000_000, 0) : roundTo(totalFeedLbPerDay * 0.001, 0);
   const effectiveCODMgL = avgCOD > 0 ? avgCOD : roundTo(totalVSLbPerDay * 1.4 / (totalFeedGPD * 8.34) * 1_000_000, 0);
 
-  assumptions.push({ parameter: "Blended TS", value: `${roundTo(avgTS)}%`, source: "Weighted average" });
-  assumptions.push({ parameter: "Blended VS/TS", value: `${roundTo(avgVS)}%`, source: "Weighted average" });
-  assumptions.push({ parameter: "Blended BMP", value: `${roundTo(avgBMP * 35.3147 / 2.2046, 3)} scf CH₄/lb VS`, source: "Weighted average" });
-  assumptions.push({ parameter: "Blended sCOD Fraction", value: `${roundTo(avgSCODPct)}% of total COD`, source: "Weighted average from feedstock library" });
+  // Formatted once; these strings recur across calculation steps, notes and
+  // the summary block.
+  const totalFeedTpdFmt = fmt(totalFeedTpd);
+  const totalTSLbPerDayFmt = fmt(totalTSLbPerDay, 0);
+  const totalVSLbPerDayFmt = fmt(totalVSLbPerDay, 0);
+
+  assumptions.push(
+    { parameter: "Blended TS", value: `${avgTSRounded}%`, source: "Weighted average" },
+    { parameter: "Blended VS/TS", value: `${avgVSRounded}%`, source: "Weighted average" },
+    { parameter: "Blended BMP", value: `${roundTo(avgBMP * SCF_PER_M3 / LB_PER_KG, 3)} scf CH₄/lb VS`, source: "Weighted average" },
+    { parameter: "Blended sCOD Fraction", value: `${roundTo(avgSCODPct)}% of total COD`, source: "Weighted average from feedstock library" },
+  );
   if (avgCOD <= 0) {
     assumptions.push({ parameter: "Blended COD", value: `${roundTo(effectiveCODMgL, 0)} mg/L (estimated from 1.4 × VS)`, source: "Engineering estimate" });
   }
@@ -405,36 +909,33 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     category: "Feedstock Characterization",
     label: "Total Feed Rate",
     formula: "Sum of all feedstock streams (converted to tons/day)",
-    inputs: feedstocks.map(fs => ({ name: fs.feedstockType || "Feedstock", value: fmt(parseFeedstockVolume(fs).tpd), unit: "tons/day" })),
-    result: { value: fmt(totalFeedTpd), unit: "tons/day" },
-  });
-  calculationSteps.push({
+    inputs: parsedFeedstocks.map(p => ({ name: p.name, value: fmt(p.tpd), unit: "tons/day" })),
+    result: { value: totalFeedTpdFmt, unit: "tons/day" },
+  }, {
     category: "Feedstock Characterization",
     label: "Total Solids (TS) Loading",
     formula: "Feed Rate × 2,000 lb/ton × TS%",
     inputs: [
-      { name: "Total Feed", value: fmt(totalFeedTpd), unit: "tons/day" },
+      { name: "Total Feed", value: totalFeedTpdFmt, unit: "tons/day" },
       { name: "Blended TS", value: fmt(avgTS), unit: "%" },
     ],
-    result: { value: fmt(totalTSLbPerDay, 0), unit: "lb/d" },
-  });
-  calculationSteps.push({
+    result: { value: totalTSLbPerDayFmt, unit: "lb/d" },
+  }, {
     category: "Feedstock Characterization",
     label: "Volatile Solids (VS) Loading",
     formula: "TS Loading × VS/TS%",
     inputs: [
-      { name: "TS Loading", value: fmt(totalTSLbPerDay, 0), unit: "lb/d" },
+      { name: "TS Loading", value: totalTSLbPerDayFmt, unit: "lb/d" },
       { name: "VS/TS", value: fmt(avgVS), unit: "%" },
     ],
-    result: { value: fmt(totalVSLbPerDay, 0), unit: "lb/d" },
-  });
-  calculationSteps.push({
+    result: { value: totalVSLbPerDayFmt, unit: "lb/d" },
+  }, {
     category: "Feedstock Characterization",
     label: "COD Loading",
     formula: avgCOD > 0 ? "COD (mg/L) × Flow (GPD) × 8.34 / 1,000,000" : "VS Loading × 1.4 (COD:VS ratio)",
     inputs: avgCOD > 0
       ? [{ name: "COD", value: fmt(avgCOD, 0), unit: "mg/L" }, { name: "Flow", value: fmt(totalFeedGPD, 0), unit: "GPD" }]
-      : [{ name: "VS Loading", value: fmt(totalVSLbPerDay, 0), unit: "lb/d" }, { name: "COD:VS Ratio", value: "1.4", unit: "lb COD/lb VS" }],
+      : [{ name: "VS Loading", value: totalVSLbPerDayFmt, unit: "lb/d" }, { name: "COD:VS Ratio", value: "1.4", unit: "lb COD/lb VS" }],
     result: { value: fmt(totalCODLbPerDay, 0), unit: "lb/d" },
     notes: avgCOD <= 0 ? "COD not provided; estimated from VS using industry-typical ratio" : undefined,
   });
@@ -450,14 +951,14 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     inputStream: {
       ...receivingSolids,
       ...receivingCodFrac,
-      numFeedstocks: { value: feedstocks.length, unit: "streams" },
+      numFeedstocks: vu(feedstocks.length, "streams"),
     },
     outputStream: {
       ...receivingSolids,
       ...receivingCodFrac,
     },
     designCriteria: defaults.receiving,
-    notes: [`Receiving ${feedstocks.length} feedstock stream(s), total ${roundTo(totalFeedTpd).toLocaleString()} tons/day`],
+    notes: [`Receiving ${feedstocks.length} feedstock stream(s), total ${totalFeedTpdFmt} tons/day`],
   };
   adStages.push(receivingStage);
 
@@ -466,30 +967,26 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
   const receivingVolGal = roundTo(m3ToGal(storageVolM3));
   const receivingDims = rectDimensions(receivingVolGal, 10);
   equipment.push({
+    ...RECEIVING_HOPPER_BASE,
     id: makeId("receiving-hopper"),
-    process: "Feedstock Receiving",
-    equipmentType: "Receiving Hopper / Tipping Floor",
-    description: "Covered receiving area with truck tipping floor and hopper for feedstock unloading",
     quantity: feedstocks.length > 2 ? 2 : 1,
     specs: {
-      volume: { value: String(receivingVolGal), unit: "gal" },
-      storageTime: { value: String(storageDays), unit: "days" },
-      capacity: { value: String(roundTo(totalFeedTpd * 1.5)), unit: "tons/day" },
-      dimensionsL: { value: String(receivingDims.lengthFt), unit: "ft" },
-      dimensionsW: { value: String(receivingDims.widthFt), unit: "ft" },
-      dimensionsH: { value: String(receivingDims.heightFt), unit: "ft" },
-      power: { value: String(roundTo(totalFeedTpd * 2, 0)), unit: "HP" },
+      volume: spec(receivingVolGal, "gal"),
+      storageTime: spec(storageDays, "days"),
+      capacity: spec(roundTo(totalFeedTpd * 1.5), "tons/day"),
+      dimensionsL: spec(receivingDims.lengthFt, "ft"),
+      dimensionsW: spec(receivingDims.widthFt, "ft"),
+      dimensionsH: spec(receivingDims.heightFt, "ft"),
+      power: spec(roundTo(totalFeedTpd * 2, 0), "HP"),
     },
     designBasis: `1.5x design throughput with ${storageDays}-day storage`,
-    notes: "Includes weigh scale, odor control, and leak detection",
-    isOverridden: false,
-    isLocked: false,
   });
 
   // ══════════════════════════════════════════════════════════
   // STAGE 2: FEEDSTOCK PREPARATION (MACERATION & SIZE REDUCTION)
   // ══════════════════════════════════════════════════════════
-  const rejectRate = isPackaged ? defaults.maceration.depackagingRejectRate.value / 100 : 0;
+  const macerationDefaults = defaults.maceration;
+  const rejectRate = isPackaged ? macerationDefaults.depackagingRejectRate.value / 100 : 0;
   const postMacerationTpd = totalFeedTpd * (1 - rejectRate);
   const postMacCODMgL = rejectRate > 0 ? effectiveCODMgL / (1 - rejectRate) : effectiveCODMgL;
   const postMacSolids = buildSolidsStream(postMacerationTpd, avgTS, avgVS, postMacCODMgL);
@@ -505,12 +1002,12 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     outputStream: {
       ...postMacSolids,
       ...postMacCodFrac,
-      particleSize: { value: defaults.maceration.targetParticleSize.value, unit: "mm" },
-      rejects: { value: roundTo(totalFeedTpd * rejectRate), unit: "tons/day" },
+      particleSize: vu(targetParticleSizeMm, "mm"),
+      rejects: vu(roundTo(totalFeedTpd * rejectRate), "tons/day"),
     },
-    designCriteria: defaults.maceration,
+    designCriteria: macerationDefaults,
     notes: [
-      `Particle size reduction to < ${defaults.maceration.targetParticleSize.value} mm for optimal digestion`,
+      `Particle size reduction to < ${targetParticleSizeMm} mm for optimal digestion`,
       ...(isPackaged ? [`Depackaging included — ${roundTo(rejectRate * 100)}% reject rate for packaging/contaminants`] : ["No depackaging required for this feedstock mix"]),
       "Magnetic separation for ferrous metal removal",
     ],
@@ -519,62 +1016,53 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
 
   const maceratorPowerKW = roundTo(totalFeedTpd * 3, 0);
   equipment.push({
+    ...MACERATOR_BASE,
     id: makeId("macerator"),
-    process: "Feedstock Preparation",
-    equipmentType: "Macerator / Grinder",
-    description: "Industrial grinder for particle size reduction to < 15 mm",
-    quantity: 1,
     specs: {
-      capacity: { value: String(roundTo(totalFeedTpd * 1.25)), unit: "tons/day" },
+      capacity: spec(roundTo(totalFeedTpd * 1.25), "tons/day"),
       targetSize: { value: "15", unit: "mm" },
       dimensionsL: { value: "12", unit: "ft" },
       dimensionsW: { value: "6", unit: "ft" },
       dimensionsH: { value: "8", unit: "ft" },
-      power: { value: String(kWToHP(maceratorPowerKW)), unit: "HP" },
+      power: spec(kWToHP(maceratorPowerKW), "HP"),
     },
-    designBasis: "1.25x design feed rate, < 15 mm particle output",
-    notes: "Includes magnetic separator for ferrous metal removal",
-    isOverridden: false,
-    isLocked: false,
   });
 
   if (isPackaged) {
     equipment.push({
+      ...DEPACKAGER_BASE,
       id: makeId("depackager"),
-      process: "Feedstock Preparation",
-      equipmentType: "Depackaging Unit",
-      description: "Separates organic content from packaging material (plastics, cartons, containers)",
-      quantity: 1,
       specs: {
-        capacity: { value: String(roundTo(totalFeedTpd * 1.25)), unit: "tons/day" },
+        capacity: spec(roundTo(totalFeedTpd * 1.25), "tons/day"),
         rejectRate: { value: "18", unit: "%" },
         organicRecovery: { value: "82", unit: "%" },
         dimensionsL: { value: "16", unit: "ft" },
         dimensionsW: { value: "8", unit: "ft" },
         dimensionsH: { value: "10", unit: "ft" },
-        power: { value: String(kWToHP(totalFeedTpd * 4)), unit: "HP" },
+        power: spec(kWToHP(totalFeedTpd * 4), "HP"),
       },
-      designBasis: "1.25x design feed rate, 15-20% packaging reject",
-      notes: "Rejects conveyed to waste bin for disposal",
-      isOverridden: false,
-      isLocked: false,
     });
   }
 
   // ══════════════════════════════════════════════════════════
   // STAGE 3: EQUALIZATION (EQ) TANK
   // ══════════════════════════════════════════════════════════
-  const eqRetentionDays = defaults.equalization.retentionTime.value;
-  const targetEqTS = defaults.equalization.targetTS.value;
+  const eqDefaults = defaults.equalization;
+  const eqRetentionDays = eqDefaults.retentionTime.value;
+  const targetEqTS = eqDefaults.targetTS.value;
   const needsDilution = avgTS > targetEqTS;
   const dilutionWaterTpd = needsDilution ? postMacerationTpd * ((avgTS / targetEqTS) - 1) : 0;
+  const dilutionWaterTpdRounded = roundTo(dilutionWaterTpd);
   const eqOutputTpd = postMacerationTpd + dilutionWaterTpd;
   const eqOutputTS = needsDilution ? targetEqTS : avgTS;
   const eqVolumeM3 = (eqOutputTpd * KG_PER_US_TON / 1020) * eqRetentionDays;
   const eqVSLoadKgPerDay = totalVSLoadKgPerDay * (1 - rejectRate);
+  const eqVSLoadKgPerDayFmt = fmt(eqVSLoadKgPerDay);
+  const eqVSLoadKgPerDayRounded = roundTo(eqVSLoadKgPerDay);
+  const eqVolumeGal = m3ToGal(eqVolumeM3);
 
   if (needsDilution) {
-    assumptions.push({ parameter: "Dilution Water", value: `${roundTo(dilutionWaterTpd)} tons/day added to achieve ${targetEqTS}% TS`, source: "Engineering practice" });
+    assumptions.push({ parameter: "Dilution Water", value: `${dilutionWaterTpdRounded} tons/day added to achieve ${targetEqTS}% TS`, source: "Engineering practice" });
   }
 
   const eqInputSolids = buildSolidsStream(postMacerationTpd, avgTS, avgVS, postMacCODMgL);
@@ -588,138 +1076,114 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     inputStream: {
       ...eqInputSolids,
       ...postMacCodFrac,
-      dilutionWater: { value: roundTo(dilutionWaterTpd), unit: "tons/day" },
+      dilutionWater: vu(dilutionWaterTpdRounded, "tons/day"),
     },
     outputStream: {
       ...eqOutputSolids,
       ...eqOutputCodFrac,
-      temperature: { value: defaults.equalization.preheatTemp.value, unit: "°C" },
-      vsLoad: { value: roundTo(eqVSLoadKgPerDay), unit: "kg VS/day" },
+      temperature: vu(preheatTempC, "°C"),
+      vsLoad: vu(eqVSLoadKgPerDayRounded, "kg VS/day"),
     },
-    designCriteria: defaults.equalization,
+    designCriteria: eqDefaults,
     notes: [
-      `EQ tank volume: ${roundTo(m3ToGal(eqVolumeM3)).toLocaleString()} gallons (${roundTo(eqRetentionDays, 1)}-day retention)`,
+      `EQ tank volume: ${fmt(eqVolumeGal)} gallons (${roundTo(eqRetentionDays, 1)}-day retention)`,
       "Continuous mixing for homogenization and stratification prevention",
-      `Pre-heated to ${defaults.equalization.preheatTemp.value}°C via heat exchanger`,
-      ...(needsDilution ? [`Dilution water: ${roundTo(dilutionWaterTpd)} tons/day to reduce TS from ${roundTo(avgTS)}% to ${targetEqTS}%`] : []),
+      `Pre-heated to ${preheatTempC}°C via heat exchanger`,
+      ...(needsDilution ? [`Dilution water: ${dilutionWaterTpdRounded} tons/day to reduce TS from ${avgTSRounded}% to ${targetEqTS}%`] : []),
     ],
   };
   adStages.push(eqStage);
 
-  const heatDutyKW = roundTo(eqOutputTpd * KG_PER_US_TON * 4.18 * (defaults.equalization.preheatTemp.value - 15) / 3600, 0);
+  const heatDutyKW = roundTo(eqOutputTpd * KG_PER_US_TON * 4.18 * (preheatTempC - 15) / 3600, 0);
 
-  const eqTankVolGal = roundTo(m3ToGal(eqVolumeM3));
+  const eqTankVolGal = roundTo(eqVolumeGal);
   const eqTankDims = cylinderDimensions(eqTankVolGal, 1.2);
   equipment.push({
+    ...EQ_TANK_BASE,
     id: makeId("eq-tank"),
-    process: "Equalization",
-    equipmentType: "Equalization Tank",
-    description: "Insulated blending and homogenization tank with continuous mixing",
-    quantity: 1,
     specs: {
-      volume: { value: String(eqTankVolGal), unit: "gal" },
-      retentionTime: { value: String(eqRetentionDays), unit: "days" },
-      throughput: { value: String(roundTo(eqOutputTpd)), unit: "tons/day" },
-      dimensionsH: { value: String(eqTankDims.heightFt), unit: "ft" },
-      dimensionsW: { value: String(eqTankDims.diameterFt), unit: "ft (dia)" },
-      dimensionsL: { value: String(eqTankDims.diameterFt), unit: "ft (dia)" },
-      power: { value: String(kWToHP(eqVolumeM3 * 3 / 1000)), unit: "HP" },
+      volume: spec(eqTankVolGal, "gal"),
+      retentionTime: spec(eqRetentionDays, "days"),
+      throughput: spec(roundTo(eqOutputTpd), "tons/day"),
+      dimensionsH: spec(eqTankDims.heightFt, "ft"),
+      dimensionsW: spec(eqTankDims.diameterFt, "ft (dia)"),
+      dimensionsL: spec(eqTankDims.diameterFt, "ft (dia)"),
+      power: spec(kWToHP(eqVolumeM3 * 3 / 1000), "HP"),
     },
     designBasis: `${eqRetentionDays}-day retention time for consistent digester feed`,
-    notes: "Insulated concrete or steel tank with top-entry mixer",
-    isOverridden: false,
-    isLocked: false,
   });
 
   const eqMixerPowerKW = roundTo(eqVolumeM3 * 3 / 1000, 1);
   equipment.push({
+    ...EQ_MIXER_BASE,
     id: makeId("eq-mixer"),
-    process: "Equalization",
-    equipmentType: "EQ Tank Mixer",
-    description: "Top-entry mechanical mixer for slurry homogenization",
-    quantity: 1,
     specs: {
       specificPower: { value: "3", unit: "W/m³" },
       dimensionsL: { value: "4", unit: "ft" },
       dimensionsW: { value: "4", unit: "ft" },
-      dimensionsH: { value: String(roundTo(eqTankDims.heightFt + 3, 0)), unit: "ft" },
-      power: { value: String(kWToHP(eqMixerPowerKW)), unit: "HP" },
+      dimensionsH: spec(roundTo(eqTankDims.heightFt + 3, 0), "ft"),
+      power: spec(kWToHP(eqMixerPowerKW), "HP"),
     },
-    designBasis: "3 W/m³ mixing intensity for slurry homogenization",
-    notes: "Prevents settling and ensures consistent feed composition",
-    isOverridden: false,
-    isLocked: false,
-  });
-
-  equipment.push({
+  }, {
+    ...FEED_HEATER_BASE,
     id: makeId("feed-heater"),
-    process: "Equalization",
-    equipmentType: "Feed Heat Exchanger",
-    description: "Shell-and-tube or spiral heat exchanger to pre-heat feed to mesophilic temperature",
-    quantity: 1,
     specs: {
-      heatDuty: { value: String(heatDutyKW), unit: "kW" },
-      targetTemp: { value: String(defaults.equalization.preheatTemp.value), unit: "°C" },
+      heatDuty: spec(heatDutyKW, "kW"),
+      targetTemp: spec(preheatTempC, "°C"),
       inletTemp: { value: "15", unit: "°C" },
       dimensionsL: { value: "10", unit: "ft" },
       dimensionsW: { value: "3", unit: "ft" },
       dimensionsH: { value: "4", unit: "ft" },
       power: { value: "2", unit: "HP" },
     },
-    designBasis: `Heating from 15°C ambient to ${defaults.equalization.preheatTemp.value}°C mesophilic`,
-    notes: "Waste heat recovery from biogas utilization where available",
-    isOverridden: false,
-    isLocked: false,
+    designBasis: `Heating from 15°C ambient to ${preheatTempC}°C mesophilic`,
   });
 
   const feedPumpGPM = roundTo(m3PerMinToGpm(eqOutputTpd * KG_PER_US_TON / 1020 / 24 / 60), 1);
   const feedPumpPowerHP = roundTo(Math.max(5, feedPumpGPM * 43.56 * 0.7 / (3960 * 0.6)), 1);
   equipment.push({
+    ...FEED_PUMP_BASE,
     id: makeId("feed-pump"),
-    process: "Equalization",
-    equipmentType: "Digester Feed Pump",
-    description: "Progressive cavity pump for feeding slurry from EQ tank to digester",
-    quantity: 2,
     specs: {
-      capacity: { value: String(feedPumpGPM), unit: "gpm" },
+      capacity: spec(feedPumpGPM, "gpm"),
       headPressure: { value: "3", unit: "bar" },
       dimensionsL: { value: "6", unit: "ft" },
       dimensionsW: { value: "3", unit: "ft" },
       dimensionsH: { value: "3", unit: "ft" },
-      power: { value: String(feedPumpPowerHP), unit: "HP" },
+      power: spec(feedPumpPowerHP, "HP"),
     },
-    designBasis: "Duty + standby (N+1 redundancy)",
-    notes: "Progressive cavity type suitable for high-solids slurry",
-    isOverridden: false,
-    isLocked: false,
   });
 
   // ══════════════════════════════════════════════════════════
   // STAGE 4: ANAEROBIC DIGESTION (CSTR)
   // ══════════════════════════════════════════════════════════
-  const vsDestruction = defaults.digester.vsDestruction.value / 100;
-  const hrt = defaults.digester.hrt.value;
-  const olr = defaults.digester.organicLoadingRate.value;
-  const gasYield = defaults.digester.gasYield.value;
-  let ch4Pct = designOverrides?.ch4Pct ?? defaults.digester.ch4Content.value;
-  let co2Pct = designOverrides?.co2Pct ?? defaults.digester.co2Content.value;
-  let h2sPpmv = designOverrides?.h2sPpmv ?? defaults.digester.h2sContent.value;
-  const headspacePct = defaults.digester.headspacePct.value / 100;
+  const digesterDefaults = defaults.digester;
+  const vsDestruction = digesterDefaults.vsDestruction.value / 100;
+  const vsDestructionPct = roundTo(vsDestruction * 100);
+  const hrt = digesterDefaults.hrt.value;
+  const olr = digesterDefaults.organicLoadingRate.value;
+  const gasYield = digesterDefaults.gasYield.value;
+  let ch4Pct = designOverrides?.ch4Pct ?? digesterDefaults.ch4Content.value;
+  let co2Pct = designOverrides?.co2Pct ?? digesterDefaults.co2Content.value;
+  let h2sPpmv = designOverrides?.h2sPpmv ?? digesterDefaults.h2sContent.value;
+  const headspacePct = digesterDefaults.headspacePct.value / 100;
+  const headspacePctRounded = roundTo(headspacePct * 100);
 
   let vsDestroyedKgPerDay = eqVSLoadKgPerDay * vsDestruction;
   let biogasM3PerDay = vsDestroyedKgPerDay * gasYield;
-  let biogasScfPerDay = biogasM3PerDay * 35.3147;
+  let biogasScfPerDay = m3ToScf(biogasM3PerDay);
   let biogasScfm = biogasScfPerDay / 1440;
   let ch4M3PerDay = biogasM3PerDay * (ch4Pct / 100);
 
   if (designOverrides?.biogasScfm !== undefined) {
     biogasScfm = designOverrides.biogasScfm;
     biogasScfPerDay = biogasScfm * 1440;
-    biogasM3PerDay = biogasScfPerDay / 35.3147;
+    biogasM3PerDay = biogasScfPerDay / SCF_PER_M3;
     ch4M3PerDay = biogasM3PerDay * (ch4Pct / 100);
     vsDestroyedKgPerDay = gasYield > 0 ? biogasM3PerDay / gasYield : vsDestroyedKgPerDay;
-    console.log(`Mass Balance Type B: Biogas flow overridden to ${biogasScfm} SCFM (calculated: ${roundTo(eqVSLoadKgPerDay * vsDestruction * gasYield * 35.3147 / 1440)} SCFM)`);
+    console.log(`Mass Balance Type B: Biogas flow overridden to ${biogasScfm} SCFM (calculated: ${roundTo(eqVSLoadKgPerDay * vsDestruction * gasYield * SCF_PER_M3 / 1440)} SCFM)`);
   }
+  const biogasScfmFmt = fmt(biogasScfm);
 
   const dailyFeedVolM3 = eqOutputTpd * KG_PER_US_TON / 1020;
   const digesterVolumeByHRT = dailyFeedVolM3 * hrt;
@@ -730,11 +1194,17 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
   const perDigesterVol = totalDigesterVolM3 / numDigesters;
   const actualHRT = roundTo(activeDigesterVolM3 / dailyFeedVolM3);
   const actualOLR = roundTo(eqVSLoadKgPerDay / activeDigesterVolM3, 2);
-
-  assumptions.push({ parameter: "VS Destruction", value: `${roundTo(vsDestruction * 100)}%`, source: "WEF MOP 8" });
-  assumptions.push({ parameter: "Biogas Yield", value: `${roundTo(gasYield * 35.3147 / 2.2046, 2)} scf/lb VS destroyed`, source: "Engineering practice" });
-  assumptions.push({ parameter: "Biogas CH₄", value: `${ch4Pct}%`, source: "Typical AD biogas" });
-  assumptions.push({ parameter: "HRT", value: `${hrt} days`, source: "WEF MOP 8" });
+  // Converted once; each appears in several calculation steps and notes.
+  const digesterVolByHRTGal = m3ToGal(digesterVolumeByHRT);
+  const digesterVolByOLRGal = m3ToGal(digesterVolumeByOLR);
+  const activeDigesterVolGal = m3ToGal(activeDigesterVolM3);
+
+  assumptions.push(
+    { parameter: "VS Destruction", value: `${vsDestructionPct}%`, source: "WEF MOP 8" },
+    { parameter: "Biogas Yield", value: `${roundTo(gasYield * SCF_PER_M3 / LB_PER_KG, 2)} scf/lb VS destroyed`, source: "Engineering practice" },
+    { parameter: "Biogas CH₄", value: `${ch4Pct}%`, source: "Typical AD biogas" },
+    { parameter: "HRT", value: `${hrt} days`, source: "WEF MOP 8" },
+  );
 
   calculationSteps.push({
     category: "Equalization",
@@ -746,8 +1216,7 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
       { name: "Target EQ TS", value: fmt(targetEqTS), unit: "%" },
     ],
     result: { value: fmt(dilutionWaterTpd), unit: "tons/day" },
-  });
-  calculationSteps.push({
+  }, {
     category: "Equalization",
     label: "EQ Tank Volume",
     formula: "Daily Feed Volume × Retention Time",
@@ -755,19 +1224,17 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
       { name: "EQ Output", value: fmt(eqOutputTpd), unit: "tons/day" },
       { name: "Retention Time", value: fmt(eqRetentionDays), unit: "days" },
     ],
-    result: { value: fmt(m3ToGal(eqVolumeM3), 0), unit: "gallons" },
-  });
-  calculationSteps.push({
+    result: { value: fmt(eqVolumeGal, 0), unit: "gallons" },
+  }, {
     category: "Anaerobic Digestion",
     label: "VS Destroyed",
     formula: "VS Load × VS Destruction Rate",
     inputs: [
-      { name: "VS Load (to digester)", value: fmt(eqVSLoadKgPerDay), unit: "kg/day" },
+      { name: "VS Load (to digester)", value: eqVSLoadKgPerDayFmt, unit: "kg/day" },
       { name: "VS Destruction", value: fmt(vsDestruction * 100), unit: "%" },
     ],
     result: { value: fmt(vsDestroyedKgPerDay), unit: "kg/day" },
-  });
-  calculationSteps.push({
+  }, {
     category: "Anaerobic Digestion",
     label: "Raw Biogas Production",
     formula: "VS Destroyed × Biogas Yield",
@@ -775,10 +1242,9 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
       { name: "VS Destroyed", value: fmt(vsDestroyedKgPerDay), unit: "kg/day" },
       { name: "Biogas Yield", value: fmt(gasYield, 2), unit: "m³/kg VS" },
     ],
-    result: { value: fmt(biogasScfm), unit: "SCFM" },
+    result: { value: biogasScfmFmt, unit: "SCFM" },
     notes: `= ${fmt(biogasScfPerDay, 0)} scf/day ÷ 1,440 min/day`,
-  });
-  calculationSteps.push({
+  }, {
     category: "Anaerobic Digestion",
     label: "Digester Volume (by HRT)",
     formula: "Daily Feed Volume × HRT",
@@ -786,27 +1252,25 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
       { name: "Daily Feed Volume", value: fmt(dailyFeedVolM3), unit: "m³/day" },
       { name: "HRT", value: fmt(hrt), unit: "days" },
     ],
-    result: { value: fmt(m3ToGal(digesterVolumeByHRT), 0), unit: "gallons" },
-  });
-  calculationSteps.push({
+    result: { value: fmt(digesterVolByHRTGal, 0), unit: "gallons" },
+  }, {
     category: "Anaerobic Digestion",
     label: "Digester Volume (by OLR)",
     formula: "VS Load ÷ Max OLR",
     inputs: [
-      { name: "VS Load", value: fmt(eqVSLoadKgPerDay), unit: "kg VS/day" },
+      { name: "VS Load", value: eqVSLoadKgPerDayFmt, unit: "kg VS/day" },
       { name: "Max OLR", value: fmt(olr), unit: "kg VS/m³·d" },
     ],
-    result: { value: fmt(m3ToGal(digesterVolumeByOLR), 0), unit: "gallons" },
-  });
-  calculationSteps.push({
+    result: { value: fmt(digesterVolByOLRGal, 0), unit: "gallons" },
+  }, {
     category: "Anaerobic Digestion",
     label: "Active Digester Volume (governing)",
     formula: "Max(Volume by HRT, Volume by OLR)",
     inputs: [
-      { name: "By HRT", value: fmt(m3ToGal(digesterVolumeByHRT), 0), unit: "gallons" },
-      { name: "By OLR", value: fmt(m3ToGal(digesterVolumeByOLR), 0), unit: "gallons" },
+      { name: "By HRT", value: fmt(digesterVolByHRTGal, 0), unit: "gallons" },
+      { name: "By OLR", value: fmt(digesterVolByOLRGal, 0), unit: "gallons" },
     ],
-    result: { value: fmt(m3ToGal(activeDigesterVolM3), 0), unit: "gallons" },
+    result: { value: fmt(activeDigesterVolGal, 0), unit: "gallons" },
     notes: `${numDigesters} digester(s), actual HRT = ${actualHRT} days, actual OLR = ${actualOLR} kg VS/m³·d`,
   });
 
@@ -824,93 +1288,88 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
   const digestateSolids = buildSolidsStream(digestateTPD, digestateTS, digestateVSOfTS, eqOutputCODMgL * 0.35);
   const digestateCodFrac = buildCodFractionation(eqOutputCODMgL * 0.35, 0.5, codVsRatio > 0 ? codVsRatio : 1.4);
 
+  const perDigesterVolGal = roundTo(m3ToGal(perDigesterVol));
   const digesterStage: ADProcessStage = {
     name: "Anaerobic Digestion (CSTR)",
     type: "digester",
     inputStream: {
       ...eqOutputSolids,
       ...eqOutputCodFrac,
-      vsLoad: { value: roundTo(eqVSLoadKgPerDay), unit: "kg VS/day" },
-      temperature: { value: defaults.equalization.preheatTemp.value, unit: "°C" },
+      vsLoad: vu(eqVSLoadKgPerDayRounded, "kg VS/day"),
+      temperature: vu(preheatTempC, "°C"),
     },
     outputStream: {
       ...biogasRawStream,
-      vsDestroyed: { value: roundTo(vsDestroyedKgPerDay), unit: "kg/day" },
+      vsDestroyed: vu(roundTo(vsDestroyedKgPerDay), "kg/day"),
       ...digestateSolids,
       ...digestateCodFrac,
     },
-    designCriteria: defaults.digester,
+    designCriteria: digesterDefaults,
     notes: [
-      `${numDigesters} CSTR digester(s) at ${roundTo(m3ToGal(perDigesterVol)).toLocaleString()} gallons each (including ${roundTo(headspacePct * 100)}% headspace)`,
-      `Active volume: ${roundTo(m3ToGal(activeDigesterVolM3)).toLocaleString()} gallons`,
+      `${numDigesters} CSTR digester(s) at ${perDigesterVolGal.toLocaleString()} gallons each (including ${headspacePctRounded}% headspace)`,
+      `Active volume: ${fmt(activeDigesterVolGal)} gallons`,
       `Actual OLR: ${actualOLR} kg VS/m³·d`,
       `Actual HRT: ${actualHRT} days`,
     ],
   };
   adStages.push(digesterStage);
 
-  const perDigesterVolGal = roundTo(m3ToGal(perDigesterVol));
   const digesterDims = cylinderDimensions(perDigesterVolGal, 0.8);
   equipment.push({
+    ...CSTR_DIGESTER_BASE,
     id: makeId("cstr-digester"),
-    process: "Anaerobic Digestion",
-    equipmentType: "CSTR Digester",
-    description: "Continuously Stirred Tank Reactor, mesophilic operation with gas collection dome",
     quantity: numDigesters,
     specs: {
-      volume: { value: String(perDigesterVolGal), unit: "gal" },
-      activeVolume: { value: String(roundTo(m3ToGal(activeDigesterVolM3 / numDigesters))), unit: "gal" },
-      totalVolume: { value: String(roundTo(m3ToGal(totalDigesterVolM3))), unit: "gal" },
-      hrt: { value: String(actualHRT), unit: "days" },
-      olr: { value: String(actualOLR), unit: "kg VS/m³·d" },
+      volume: spec(perDigesterVolGal, "gal"),
+      activeVolume: spec(roundTo(m3ToGal(activeDigesterVolM3 / numDigesters)), "gal"),
+      totalVolume: spec(roundTo(m3ToGal(totalDigesterVolM3)), "gal"),
+      hrt: spec(actualHRT, "days"),
+      olr: spec(actualOLR, "kg VS/m³·d"),
       temperature: { value: "37", unit: "°C" },
-      dimensionsH: { value: String(digesterDims.heightFt), unit: "ft" },
-      dimensionsW: { value: String(digesterDims.diameterFt), unit: "ft (dia)" },
-      dimensionsL: { value: String(digesterDims.diameterFt), unit: "ft (dia)" },
-      power: { value: String(kWToHP(defaults.digester.mixingPower.value * (activeDigesterVolM3 / numDigesters) / 1000)), unit: "HP" },
+      dimensionsH: spec(digesterDims.heightFt, "ft"),
+      dimensionsW: spec(digesterDims.diameterFt, "ft (dia)"),
+      dimensionsL: spec(digesterDims.diameterFt, "ft (dia)"),
+      power: spec(kWToHP(mixingPowerWPerM3 * (activeDigesterVolM3 / numDigesters) / 1000), "HP"),
     },
-    designBasis: `${hrt}-day HRT, OLR ≤ ${olr} kg VS/m³·d, ${roundTo(headspacePct * 100)}% headspace`,
-    notes: "Includes gas collection dome, internal heating coils, and insulation",
-    isOverridden: false,
-    isLocked: false,
+    designBasis: `${hrt}-day HRT, OLR ≤ ${olr} kg VS/m³·d, ${headspacePctRounded}% headspace`,
   });
 
-  const digesterMixerPowerKW = roundTo(defaults.digester.mixingPower.value * (activeDigesterVolM3 / numDigesters) / 1000, 1);
+  const digesterMixerPowerKW = roundTo(mixingPowerWPerM3 * (activeDigesterVolM3 / numDigesters) / 1000, 1);
   equipment.push({
+    ...DIGESTER_MIXER_BASE,
     id: makeId("digester-mixer"),
-    process: "Anaerobic Digestion",
-    equipmentType: "Digester Mixer",
-    description: "Mechanical mixing system for digester contents",
     quantity: numDigesters,
     specs: {
-      specificPower: { value: String(defaults.digester.mixingPower.value), unit: "W/m³" },
+      specificPower: spec(mixingPowerWPerM3, "W/m³"),
       dimensionsL: { value: "5", unit: "ft" },
       dimensionsW: { value: "5", unit: "ft" },
-      dimensionsH: { value: String(roundTo(digesterDims.heightFt + 4, 0)), unit: "ft" },
-      power: { value: String(kWToHP(digesterMixerPowerKW)), unit: "HP" },
+      dimensionsH: spec(roundTo(digesterDims.heightFt + 4, 0), "ft"),
+      power: spec(kWToHP(digesterMixerPowerKW), "HP"),
     },
-    designBasis: `${defaults.digester.mixingPower.value} W/m³ mixing intensity`,
-    notes: "Draft tube or top-entry mechanical mixer",
-    isOverridden: false,
-    isLocked: false,
+    designBasis: `${mixingPowerWPerM3} W/m³ mixing intensity`,
   });
 
   // ══════════════════════════════════════════════════════════
   // STAGE 5: SOLIDS-LIQUID SEPARATION (CENTRIFUGE)
   // ══════════════════════════════════════════════════════════
-  const centSolidsCaptureEff = defaults.centrifuge.solidsCaptureEff.value / 100;
-  const centCakeSolidsPct = defaults.centrifuge.cakeSolids.value;
+  const centrifugeDefaults = defaults.centrifuge;
+  const centSolidsCaptureEff = centrifugeDefaults.solidsCaptureEff.value / 100;
+  const centSolidsCapturePct = roundTo(centSolidsCaptureEff * 100);
+  const centCakeSolidsPct = centrifugeDefaults.cakeSolids.value;
   const digestateTSKgPerDay = digestateTPD * KG_PER_US_TON * (digestateTS / 100);
   const cakeSolidsKgPerDay = digestateTSKgPerDay * centSolidsCaptureEff;
   const cakeTPD = cakeSolidsKgPerDay / (centCakeSolidsPct / 100) / KG_PER_US_TON;
+  const cakeTPDRounded = roundTo(cakeTPD);
   const centrateTPD = digestateTPD - cakeTPD;
   const centrateTSSMgL = digestateTSKgPerDay * (1 - centSolidsCaptureEff) / (centrateTPD * KG_PER_US_TON) * 1_000_000;
 
-  assumptions.push({ parameter: "Centrifuge Solids Capture", value: `${roundTo(centSolidsCaptureEff * 100)}%`, source: "Decanter centrifuge typical" });
-  assumptions.push({ parameter: "Cake Solids", value: `${centCakeSolidsPct}% TS`, source: "Decanter centrifuge typical" });
+  assumptions.push(
+    { parameter: "Centrifuge Solids Capture", value: `${centSolidsCapturePct}%`, source: "Decanter centrifuge typical" },
+    { parameter: "Cake Solids", value: `${centCakeSolidsPct}% TS`, source: "Decanter centrifuge typical" },
+  );
 
   const centrateLbPerDay = centrateTPD * 2000;
-  const centrateTSLbPerDay = digestateTSKgPerDay * (1 - centSolidsCaptureEff) * 2.2046;
+  const centrateTSLbPerDay = digestateTSKgPerDay * (1 - centSolidsCaptureEff) * LB_PER_KG;
   const centrateVSLbPerDay = centrateTSLbPerDay * (digestateVSOfTS / 100);
   const centrateTSSLbPerDay = centrateTSLbPerDay * 0.85;
   const centrateVSSLbPerDay = centrateVSLbPerDay * 0.85;
@@ -943,73 +1402,65 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
       ...cakeSolids,
       ...centrateWW,
     },
-    designCriteria: defaults.centrifuge,
+    designCriteria: centrifugeDefaults,
     notes: [
       "Decanter centrifuge for digestate dewatering",
-      `Cake: ${roundTo(cakeTPD)} tons/day at ${centCakeSolidsPct}% TS — conveyed to storage/hauling`,
+      `Cake: ${cakeTPDRounded} tons/day at ${centCakeSolidsPct}% TS — conveyed to storage/hauling`,
       `Centrate: ${roundTo(centrateTPD)} tons/day — sent to DAF for liquid cleanup`,
-      `Polymer conditioning: ${defaults.centrifuge.polymerDose.value} kg/ton dry solids`,
+      `Polymer conditioning: ${polymerDoseKgPerTon} kg/ton dry solids`,
     ],
   };
   adStages.push(centrifugeStage);
 
   const centrifugePowerHP = roundTo(Math.max(30, digestateTPD * 0.8), 0);
   equipment.push({
+    ...DECANTER_CENTRIFUGE_BASE,
     id: makeId("decanter-centrifuge"),
-    process: "Solids-Liquid Separation",
-    equipmentType: "Decanter Centrifuge",
-    description: "High-speed decanter centrifuge for digestate dewatering",
-    quantity: 1,
     specs: {
-      capacity: { value: String(roundTo(digestateTPD)), unit: "tons/day" },
-      solidsCaptureEff: { value: String(roundTo(centSolidsCaptureEff * 100)), unit: "%" },
-      cakeSolids: { value: String(centCakeSolidsPct), unit: "% TS" },
-      polymerDose: { value: String(defaults.centrifuge.polymerDose.value), unit: "kg/ton DS" },
+      capacity: spec(roundTo(digestateTPD), "tons/day"),
+      solidsCaptureEff: spec(centSolidsCapturePct, "%"),
+      cakeSolids: spec(centCakeSolidsPct, "% TS"),
+      polymerDose: spec(polymerDoseKgPerTon, "kg/ton DS"),
       dimensionsL: { value: "14", unit: "ft" },
       dimensionsW: { value: "5", unit: "ft" },
       dimensionsH: { value: "6", unit: "ft" },
-      power: { value: String(centrifugePowerHP), unit: "HP" },
+      power: spec(centrifugePowerHP, "HP"),
     },
-    designBasis: `${roundTo(centSolidsCaptureEff * 100)}% solids capture, ${centCakeSolidsPct}% cake solids`,
-    notes: "Includes polymer make-down and dosing system",
-    isOverridden: false,
-    isLocked: false,
+    designBasis: `${centSolidsCapturePct}% solids capture, ${centCakeSolidsPct}% cake solids`,
   });
 
   const cakeStorageVolGal = roundTo(m3ToGal(cakeTPD * KG_PER_US_TON / 1100 * 3));
   const cakeStorageDims = rectDimensions(cakeStorageVolGal, 8);
   equipment.push({
+    ...CAKE_CONVEYOR_BASE,
     id: makeId("cake-conveyor"),
-    process: "Solids-Liquid Separation",
-    equipmentType: "Cake Conveyor & Storage",
-    description: "Screw conveyor from centrifuge to cake storage bin for truck loadout",
-    quantity: 1,
     specs: {
-      capacity: { value: String(roundTo(cakeTPD)), unit: "tons/day" },
-      volume: { value: String(cakeStorageVolGal), unit: "gal" },
-      dimensionsL: { value: String(cakeStorageDims.lengthFt), unit: "ft" },
-      dimensionsW: { value: String(cakeStorageDims.widthFt), unit: "ft" },
-      dimensionsH: { value: String(cakeStorageDims.heightFt), unit: "ft" },
-      power: { value: String(roundTo(Math.max(5, cakeTPD * 1.5), 0)), unit: "HP" },
+      capacity: spec(cakeTPDRounded, "tons/day"),
+      volume: spec(cakeStorageVolGal, "gal"),
+      dimensionsL: spec(cakeStorageDims.lengthFt, "ft"),
+      dimensionsW: spec(cakeStorageDims.widthFt, "ft"),
+      dimensionsH: spec(cakeStorageDims.heightFt, "ft"),
+      power: spec(roundTo(Math.max(5, cakeTPD * 1.5), 0), "HP"),
     },
-    designBasis: "3-day cake storage capacity",
-    notes: "Covered storage with truck loadout capability",
-    isOverridden: false,
-    isLocked: false,
   });
 
   // ══════════════════════════════════════════════════════════
   // STAGE 6: LIQUID CLEANUP — DISSOLVED AIR FLOTATION (DAF)
   // ══════════════════════════════════════════════════════════
-  const dafTSSRemoval = defaults.daf.tssRemoval.value / 100;
-  const dafFOGRemoval = defaults.daf.fogRemoval.value / 100;
-  const centrateFlowGPD = centrateTPD * KG_PER_US_TON / 3.785;
+  const dafDefaults = defaults.daf;
+  const dafTSSRemoval = dafDefaults.tssRemoval.value / 100;
+  const dafFOGRemoval = dafDefaults.fogRemoval.value / 100;
+  // Rounded once; reused across notes, streams and equipment specs.
+  const dafTSSRemovalPct = roundTo(dafTSSRemoval * 100);
+  const dafFOGRemovalPct = roundTo(dafFOGRemoval * 100);
+  const centrateFlowGPD = centrateTPD * GAL_PER_US_TON_WATER;
   const centrateFlowGPM = centrateFlowGPD / 1440;
-  const dafSurfaceAreaFt2 = centrateFlowGPM / defaults.daf.hydraulicLoading.value;
+  const dafSurfaceAreaFt2 = centrateFlowGPM / dafHydraulicLoading;
   const dafEffluentTSSMgL = centrateTSSMgL * (1 - dafTSSRemoval);
   const dafFloatTPD = centrateTPD * 0.03;
+  const dafFloatTPDRounded = roundTo(dafFloatTPD);
   const dafEffluentTPD = centrateTPD - dafFloatTPD;
-  const dafEffluentGPD = roundTo(dafEffluentTPD * KG_PER_US_TON / 3.785, 0);
+  const dafEffluentGPD = roundTo(dafEffluentTPD * GAL_PER_US_TON_WATER, 0);
 
   const dafEffluentLbPerDay = dafEffluentTPD * 2000;
   const dafEffTSLbPerDay = centrateTSLbPerDay * (1 - dafTSSRemoval) * 0.7;
@@ -1040,66 +1491,59 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     },
     outputStream: {
       ...dafEffluentWW,
-      floatSludge: { value: roundTo(dafFloatTPD), unit: "tons/day" },
+      floatSludge: vu(dafFloatTPDRounded, "tons/day"),
     },
-    designCriteria: defaults.daf,
+    designCriteria: dafDefaults,
     notes: [
-      `TSS removal: ${roundTo(dafTSSRemoval * 100)}% (${roundTo(centrateTSSMgL, 0)} → ${roundTo(dafEffluentTSSMgL, 0)} mg/L)`,
-      `FOG removal: ${roundTo(dafFOGRemoval * 100)}%`,
+      `TSS removal: ${dafTSSRemovalPct}% (${roundTo(centrateTSSMgL, 0)} → ${roundTo(dafEffluentTSSMgL, 0)} mg/L)`,
+      `FOG removal: ${dafFOGRemovalPct}%`,
       "Chemical conditioning: coagulant (FeCl₃ or alum) + polymer",
-      `Float sludge (${roundTo(dafFloatTPD)} tons/day) recycled to digester`,
+      `Float sludge (${dafFloatTPDRounded} tons/day) recycled to digester`,
       `DAF effluent suitable for sewer discharge or irrigation`,
     ],
   };
-  adStages.push(dafStage);
-
-  const dafLengthFt = roundTo(Math.sqrt(dafSurfaceAreaFt2 * 2), 1);
-  const dafWidthFt = roundTo(dafSurfaceAreaFt2 / dafLengthFt, 1);
-  const dafPowerHP = roundTo(Math.max(10, centrateFlowGPM * 0.15), 0);
-  equipment.push({
-    id: makeId("daf-unit"),
-    process: "Liquid Cleanup",
-    equipmentType: "Dissolved Air Flotation (DAF) Unit",
-    description: "DAF system for centrate polishing — removes residual TSS, FOG, and colloidal organics",
-    quantity: 1,
-    specs: {
-      surfaceArea: { value: String(roundTo(dafSurfaceAreaFt2)), unit: "ft²" },
-      hydraulicLoading: { value: String(defaults.daf.hydraulicLoading.value), unit: "gpm/ft²" },
-      designFlow: { value: String(roundTo(centrateFlowGPM, 1)), unit: "gpm" },
-      tssRemoval: { value: String(roundTo(dafTSSRemoval * 100)), unit: "%" },
-      fogRemoval: { value: String(roundTo(dafFOGRemoval * 100)), unit: "%" },
-      dimensionsL: { value: String(dafLengthFt), unit: "ft" },
-      dimensionsW: { value: String(dafWidthFt), unit: "ft" },
-      dimensionsH: { value: "8", unit: "ft" },
-      power: { value: String(dafPowerHP), unit: "HP" },
-    },
-    designBasis: `${defaults.daf.hydraulicLoading.value} gpm/ft² hydraulic loading rate`,
-    notes: "Includes recycle pump, saturator, chemical feed system (coagulant + polymer)",
-    isOverridden: false,
-    isLocked: false,
-  });
+  // Degenerate projects (no dewatering centrate) get no DAF train; the
+  // zero-valued stage and equipment would be physically meaningless.
+  if (centrateTPD > 1e-9) {
+    adStages.push(dafStage);
+
+    const dafLengthFt = roundTo(Math.sqrt(dafSurfaceAreaFt2 * 2), 1);
+    const dafWidthFt = roundTo(dafSurfaceAreaFt2 / dafLengthFt, 1);
+    const dafPowerHP = roundTo(Math.max(10, centrateFlowGPM * 0.15), 0);
+    equipment.push({
+      ...DAF_UNIT_BASE,
+      id: makeId("daf-unit"),
+      specs: {
+        surfaceArea: spec(roundTo(dafSurfaceAreaFt2), "ft²"),
+        hydraulicLoading: spec(dafHydraulicLoading, "gpm/ft²"),
+        designFlow: spec(roundTo(centrateFlowGPM, 1), "gpm"),
+        tssRemoval: spec(dafTSSRemovalPct, "%"),
+        fogRemoval: spec(dafFOGRemovalPct, "%"),
+        dimensionsL: spec(dafLengthFt, "ft"),
+        dimensionsW: spec(dafWidthFt, "ft"),
+        dimensionsH: { value: "8", unit: "ft" },
+        power: spec(dafPowerHP, "HP"),
+      },
+      designBasis: `${dafHydraulicLoading} gpm/ft² hydraulic loading rate`,
+    });
 
-  const centrateTankVolGal = roundTo(m3ToGal(centrateTPD * KG_PER_US_TON / 1000 * 0.5));
-  const centrateTankDims = cylinderDimensions(centrateTankVolGal, 1.0);
-  equipment.push({
-    id: makeId("centrate-tank"),
-    process: "Liquid Cleanup",
-    equipmentType: "Centrate Collection Tank",
-    description: "Holding tank for centrate equalization before DAF treatment",
-    quantity: 1,
-    specs: {
-      volume: { value: String(centrateTankVolGal), unit: "gal" },
-      retentionTime: { value: "0.5", unit: "days" },
-      dimensionsH: { value: String(centrateTankDims.heightFt), unit: "ft" },
-      dimensionsW: { value: String(centrateTankDims.diameterFt), unit: "ft (dia)" },
-      dimensionsL: { value: String(centrateTankDims.diameterFt), unit: "ft (dia)" },
-      power: { value: "3", unit: "HP" },
-    },
-    designBasis: "0.5-day equalization for consistent DAF feed",
-    notes: "Level-controlled pump to DAF unit",
-    isOverridden: false,
-    isLocked: false,
-  });
+    const centrateTankVolGal = roundTo(m3ToGal(centrateTPD * KG_PER_US_TON / 1000 * 0.5));
+    const centrateTankDims = cylinderDimensions(centrateTankVolGal, 1.0);
+    equipment.push({
+      ...CENTRATE_TANK_BASE,
+      id: makeId("centrate-tank"),
+      specs: {
+        volume: spec(centrateTankVolGal, "gal"),
+        retentionTime: { value: "0.5", unit: "days" },
+        dimensionsH: spec(centrateTankDims.heightFt, "ft"),
+        dimensionsW: spec(centrateTankDims.diameterFt, "ft (dia)"),
+        dimensionsL: spec(centrateTankDims.diameterFt, "ft (dia)"),
+        power: { value: "3", unit: "HP" },
+      },
+    });
+  } else {
+    warnings.push({ field: "DAF", message: "No centrate flow — liquid cleanup (DAF) stage omitted", severity: "warning" });
+  }
 
   // ══════════════════════════════════════════════════════════
   // STAGE 7: BIOGAS CONDITIONING (Prodeval VALOGAZ® + VALOPACK®)
@@ -1107,11 +1551,43 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
   const prodevDesign = getProdevalGasTrainDesignCriteria(biogasScfm);
   const prodevUnit = selectProdevalUnit(biogasScfm);
 
-  const h2sRemovalEff = prodevDesign.gasConditioning.h2sRemovalEff.value / 100;
-  const outH2sPpmv = h2sPpmv * (1 - h2sRemovalEff);
-  const volumeLossPct = prodevDesign.gasConditioning.volumeLoss.value / 100;
-  const conditionedBiogasM3PerDay = biogasM3PerDay * (1 - volumeLossPct);
-  const conditionedScfm = biogasScfm * (1 - volumeLossPct);
+  const gasConditioningDesign = prodevDesign.gasConditioning;
+  const gasUpgradingDesign = prodevDesign.gasUpgrading;
+  const h2sRemovalEff = gasConditioningDesign.h2sRemovalEff.value / 100;
+  const volumeLossPct = gasConditioningDesign.volumeLoss.value / 100;
+  const methaneRecovery = designOverrides?.methaneRecovery !== undefined
+    ? designOverrides.methaneRecovery / 100
+    : gasUpgradingDesign.methaneRecovery.value / 100;
+  const productCH4 = gasUpgradingDesign.productCH4.value;
+  const methaneRecoveryPct = roundTo(methaneRecovery * 100);
+
+  const gasTrain = computeGasTrainFlows(
+    biogasM3PerDay,
+    biogasScfPerDay,
+    biogasScfm,
+    ch4M3PerDay,
+    h2sPpmv,
+    h2sRemovalEff,
+    volumeLossPct,
+    methaneRecovery,
+    productCH4,
+    gasUpgradingDesign.electricalDemand.value,
+    designOverrides?.rngScfm,
+  );
+  const {
+    outH2sPpmv,
+    conditionedBiogasM3PerDay,
+    conditionedScfm,
+    rngScfPerDay,
+    rngScfm,
+    rngMMBtuPerDay,
+    tailgasM3PerDay,
+    electricalDemandKW,
+  } = gasTrain;
+  if (designOverrides?.rngScfm !== undefined) {
+    console.log(`Mass Balance Type B: RNG flow overridden to ${rngScfm} SCFM`);
+  }
+  const rngScfmFmt = fmt(rngScfm);
 
   const conditionedBiogasStream = buildGasStream(conditionedScfm, 2, ch4Pct, co2Pct, outH2sPpmv, 1.0, 0.5);
 
@@ -1123,9 +1599,9 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     },
     outputStream: {
       ...conditionedBiogasStream,
-      moisture: { value: 0, unit: "saturated → dry" },
+      moisture: vu(0, "saturated → dry"),
     },
-    designCriteria: prodevDesign.gasConditioning,
+    designCriteria: gasConditioningDesign,
     notes: [
       `Prodeval VALOGAZ® FU 100/200 + VALOPACK® FU 300 — ${prodevUnit.numberOfTrains} train(s)`,
       `H₂S removal: ${h2sPpmv} → ${roundTo(outH2sPpmv, 1)} ppmv (${roundTo(h2sRemovalEff * 100)}% removal)`,
@@ -1133,38 +1609,19 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
       "H₂S + siloxane removal via Prodeval VALOPACK® lead-lag activated carbon",
     ],
   };
-  adStages.push(conditioningStage);
+  if (biogasM3PerDay > 1e-9) {
+    adStages.push(conditioningStage);
+  }
 
   // ══════════════════════════════════════════════════════════
   // STAGE 8: GAS UPGRADING TO RNG (Prodeval VALOPUR®)
   // ══════════════════════════════════════════════════════════
-  const methaneRecovery = designOverrides?.methaneRecovery !== undefined
-    ? designOverrides.methaneRecovery / 100
-    : prodevDesign.gasUpgrading.methaneRecovery.value / 100;
-  const productCH4 = prodevDesign.gasUpgrading.productCH4.value;
-  let rngCH4M3PerDay = ch4M3PerDay * methaneRecovery;
-  let rngM3PerDay = rngCH4M3PerDay / (productCH4 / 100);
-  let rngScfPerDay = rngM3PerDay * 35.3147;
-  let rngScfm = rngScfPerDay / 1440;
-  let rngMMBtuPerDay = rngScfPerDay * 1012 / 1_000_000;
-
-  if (designOverrides?.rngScfm !== undefined) {
-    rngScfm = designOverrides.rngScfm;
-    rngScfPerDay = rngScfm * 1440;
-    rngM3PerDay = rngScfPerDay / 35.3147;
-    rngCH4M3PerDay = rngM3PerDay * (productCH4 / 100);
-    rngMMBtuPerDay = rngScfPerDay * 1012 / 1_000_000;
-    console.log(`Mass Balance Type B: RNG flow overridden to ${rngScfm} SCFM`);
-  }
-
-  const tailgasM3PerDay = conditionedBiogasM3PerDay - rngM3PerDay;
-  const biogasScfdTotal = biogasM3PerDay * 35.3147;
-  const electricalDemandKW = biogasScfdTotal * prodevDesign.gasUpgrading.electricalDemand.value / (1000 * 24);
-
   const rngProductCO2 = 100 - productCH4 - 0.5 - 0.3;
-  const pressureOut = prodevDesign.gasUpgrading.pressureOut.value;
+  const pressureOut = gasUpgradingDesign.pressureOut.value;
   const rngStream = buildGasStream(rngScfm, pressureOut, productCH4, rngProductCO2, 4, 0.5, 0.3);
-  const tailgasScfm = roundTo(m3ToScf(tailgasM3PerDay) / 1440);
+  const tailgasScfd = m3ToScf(tailgasM3PerDay);
+  const tailgasScfdRounded = roundTo(tailgasScfd);
+  const tailgasScfm = roundTo(tailgasScfd / 1440);
 
   calculationSteps.push({
     category: "Solids-Liquid Separation",
@@ -1176,8 +1633,7 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
       { name: "Cake Solids", value: fmt(centCakeSolidsPct), unit: "% TS" },
     ],
     result: { value: fmt(cakeTPD), unit: "tons/day" },
-  });
-  calculationSteps.push({
+  }, {
     category: "Solids-Liquid Separation",
     label: "Centrate Flow (Liquid Effluent)",
     formula: "Digestate − Cake",
@@ -1186,18 +1642,16 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
       { name: "Cake", value: fmt(cakeTPD), unit: "tons/day" },
     ],
     result: { value: fmt(centrateTPD), unit: "tons/day" },
-  });
-  calculationSteps.push({
+  }, {
     category: "Gas Conditioning",
     label: "Conditioned Biogas Flow",
     formula: "Raw Biogas × (1 − Volume Loss%)",
     inputs: [
-      { name: "Raw Biogas", value: fmt(biogasScfm), unit: "SCFM" },
+      { name: "Raw Biogas", value: biogasScfmFmt, unit: "SCFM" },
       { name: "Volume Loss", value: fmt(volumeLossPct * 100), unit: "%" },
     ],
     result: { value: fmt(conditionedScfm), unit: "SCFM" },
-  });
-  calculationSteps.push({
+  }, {
     category: "Gas Upgrading (RNG)",
     label: "CH₄ Available in Raw Biogas",
     formula: "Biogas Flow × CH₄%",
@@ -1205,38 +1659,35 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
       { name: "Biogas", value: fmt(biogasScfPerDay, 0), unit: "scf/day" },
       { name: "CH₄ Content", value: fmt(ch4Pct), unit: "%" },
     ],
-    result: { value: fmt(ch4M3PerDay * 35.3147, 0), unit: "scf CH₄/day" },
-  });
-  calculationSteps.push({
+    result: { value: fmt(m3ToScf(ch4M3PerDay), 0), unit: "scf CH₄/day" },
+  }, {
     category: "Gas Upgrading (RNG)",
     label: "RNG Product Flow",
     formula: "CH₄ Available × Methane Recovery ÷ Product CH₄ Purity",
     inputs: [
-      { name: "CH₄ in Biogas", value: fmt(ch4M3PerDay * 35.3147, 0), unit: "scf/day" },
+      { name: "CH₄ in Biogas", value: fmt(m3ToScf(ch4M3PerDay), 0), unit: "scf/day" },
       { name: "Methane Recovery", value: fmt(methaneRecovery * 100), unit: "%" },
       { name: "Product CH₄", value: fmt(productCH4), unit: "%" },
     ],
-    result: { value: fmt(rngScfm), unit: "SCFM" },
+    result: { value: rngScfmFmt, unit: "SCFM" },
     notes: `= ${fmt(rngScfPerDay, 0)} scf/day, ${fmt(rngMMBtuPerDay)} MMBTU/day`,
-  });
-  calculationSteps.push({
+  }, {
     category: "Gas Upgrading (RNG)",
     label: "Tail Gas (Waste)",
     formula: "Conditioned Biogas − RNG Product",
     inputs: [
       { name: "Conditioned Biogas", value: fmt(conditionedScfm), unit: "SCFM" },
-      { name: "RNG Product", value: fmt(rngScfm), unit: "SCFM" },
+      { name: "RNG Product", value: rngScfmFmt, unit: "SCFM" },
     ],
     result: { value: fmt(tailgasScfm), unit: "SCFM" },
     notes: "Routed to enclosed flare or thermal oxidizer",
-  });
-  calculationSteps.push({
+  }, {
     category: "Gas Upgrading (RNG)",
     label: "Electrical Demand (Gas Train)",
     formula: "Biogas Volume × Specific Power",
     inputs: [
-      { name: "Biogas (scfd)", value: fmt(biogasScfdTotal, 0), unit: "scf/day" },
-      { name: "Specific Power", value: fmt(prodevDesign.gasUpgrading.electricalDemand.value), unit: "kWh/1,000 scf" },
+      { name: "Biogas (scfd)", value: fmt(biogasScfPerDay, 0), unit: "scf/day" },
+      { name: "Specific Power", value: fmt(gasUpgradingDesign.electricalDemand.value), unit: "kWh/1,000 scf" },
     ],
     result: { value: fmt(electricalDemandKW), unit: "kW" },
   });
@@ -1249,53 +1700,45 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     },
     outputStream: {
       ...rngStream,
-      tailgasFlow: { value: roundTo(m3ToScf(tailgasM3PerDay)), unit: "scfd" },
-      tailgasFlowSCFM: { value: tailgasScfm, unit: "SCFM" },
-      methaneRecovery: { value: roundTo(methaneRecovery * 100), unit: "%" },
+      tailgasFlow: vu(tailgasScfdRounded, "scfd"),
+      tailgasFlowSCFM: vu(tailgasScfm, "SCFM"),
+      methaneRecovery: vu(methaneRecoveryPct, "%"),
     },
-    designCriteria: prodevDesign.gasUpgrading,
+    designCriteria: gasUpgradingDesign,
     notes: [
       `Prodeval VALOPUR® FU 500 — 3-stage membrane separation`,
       `RNG product: ${roundTo(rngScfm)} SCFM at ${pressureOut} psig, ≥${productCH4}% CH₄`,
-      `Tail gas: ${roundTo(m3ToScf(tailgasM3PerDay))} scfd (${tailgasScfm} SCFM) → thermal oxidizer or flare`,
+      `Tail gas: ${tailgasScfdRounded} scfd (${tailgasScfm} SCFM) → thermal oxidizer or flare`,
       `Electrical demand: ${roundTo(electricalDemandKW)} kW`,
       `RNG energy output: ${roundTo(rngMMBtuPerDay, 1)} MMBTU/day`,
     ],
   };
-  adStages.push(upgradingStage);
-
-  const prodevalEquipment = getProdevalEquipmentList(biogasScfm, (suffix?: string) => makeId(suffix || "prodeval"));
-  for (const pe of prodevalEquipment) {
-    equipment.push({
-      ...pe,
-      isOverridden: false,
-      isLocked: false,
-    });
+  if (biogasM3PerDay > 1e-9) {
+    adStages.push(upgradingStage);
+    const prodevalEquipment = getProdevalEquipmentList(biogasScfm, (suffix?: string) => makeId(suffix || "prodeval"));
+    equipment.push(...prodevalEquipment.map(pe => ({ ...pe, ...EQUIP_FLAGS })));
+  } else {
+    warnings.push({ field: "Biogas", message: "No biogas production — conditioning, upgrading and flare stages omitted", severity: "warning" });
   }
 
   // ══════════════════════════════════════════════════════════
   // STAGE 9: EMERGENCY GAS MANAGEMENT
   // ══════════════════════════════════════════════════════════
-  const flareHeight = roundTo(Math.max(15, Math.sqrt(biogasScfm) * 2), 0);
-  equipment.push({
-    id: makeId("enclosed-flare"),
-    process: "Gas Management",
-    equipmentType: "Enclosed Flare",
-    description: "Enclosed ground flare for excess biogas and tail gas combustion",
-    quantity: 1,
-    specs: {
-      capacity: { value: String(roundTo(biogasScfm * 1.1)), unit: "scfm" },
-      destructionEff: { value: "99.5", unit: "%" },
-      dimensionsL: { value: "8", unit: "ft (dia)" },
-      dimensionsW: { value: "8", unit: "ft (dia)" },
-      dimensionsH: { value: String(flareHeight), unit: "ft" },
-      power: { value: "5", unit: "HP" },
-    },
-    designBasis: "110% of maximum biogas production",
-    notes: "Required for startup, upset, and maintenance periods",
-    isOverridden: false,
-    isLocked: false,
-  });
+  if (biogasM3PerDay > 1e-9) {
+    const flareHeight = roundTo(Math.max(15, Math.sqrt(biogasScfm) * 2), 0);
+    equipment.push({
+      ...ENCLOSED_FLARE_BASE,
+      id: makeId("enclosed-flare"),
+      specs: {
+        capacity: spec(roundTo(biogasScfm * 1.1), "scfm"),
+        destructionEff: { value: "99.5", unit: "%" },
+        dimensionsL: { value: "8", unit: "ft (dia)" },
+        dimensionsW: { value: "8", unit: "ft (dia)" },
+        dimensionsH: spec(flareHeight, "ft"),
+        power: { value: "5", unit: "HP" },
+      },
+    });
+  }
 
   // ══════════════════════════════════════════════════════════
   // RECYCLE STREAMS
@@ -1305,7 +1748,7 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
       name: "DAF Float Recycle",
       source: "DAF",
       destination: "Digester",
-      flow: roundTo(dafFloatTPD),
+      flow: dafFloatTPDRounded,
       loads: { TSS: roundTo(dafFloatTPD * KG_PER_US_TON * 0.05) },
     },
   ];
@@ -1315,32 +1758,32 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
   // ══════════════════════════════════════════════════════════
   const digesterVolGallons = totalDigesterVolM3 * 264.172;
 
-  const biogasBtuPerScf = roundTo(ch4Pct / 100 * 1012, 0);
+  const biogasBtuPerScf = roundTo(ch4Pct / 100 * BTU_PER_SCF_CH4, 0);
   const biogasMmbtuPerDay = roundTo(biogasScfm * 1440 * biogasBtuPerScf / 1_000_000, 1);
-  const rngBtuPerScf = roundTo(productCH4 / 100 * 1012, 0);
+  const rngBtuPerScf = roundTo(productCH4 / 100 * BTU_PER_SCF_CH4, 0);
   const rngMmbtuPerDayFinal = roundTo(rngScfm * 1440 * rngBtuPerScf / 1_000_000, 1);
 
   const summary: Record<string, { value: string; unit: string }> = {
-    totalFeedRate: { value: roundTo(totalFeedTpd).toLocaleString(), unit: "tons/day" },
-    totalFeedLbPerDay: { value: roundTo(totalFeedLbPerDay, 0).toLocaleString(), unit: "lb/d" },
-    totalFeedGPD: { value: roundTo(totalFeedGPD, 0).toLocaleString(), unit: "GPD" },
-    totalSolidsPct: { value: `${roundTo(avgTS)}`, unit: "%" },
-    volatileSolidsPct: { value: `${roundTo(avgVS)}`, unit: "%" },
-    totalSolidsLbPerDay: { value: roundTo(totalTSLbPerDay, 0).toLocaleString(), unit: "lb/d" },
-    volatileSolidsLbPerDay: { value: roundTo(totalVSLbPerDay, 0).toLocaleString(), unit: "lb/d" },
-    codMgL: { value: roundTo(effectiveCODMgL, 0).toLocaleString(), unit: "mg/L" },
-    codLbPerDay: { value: roundTo(totalCODLbPerDay, 0).toLocaleString(), unit: "lb/d" },
+    totalFeedRate: { value: totalFeedTpdFmt, unit: "tons/day" },
+    totalFeedLbPerDay: { value: fmt(totalFeedLbPerDay, 0), unit: "lb/d" },
+    totalFeedGPD: { value: fmt(totalFeedGPD, 0), unit: "GPD" },
+    totalSolidsPct: { value: `${avgTSRounded}`, unit: "%" },
+    volatileSolidsPct: { value: `${avgVSRounded}`, unit: "%" },
+    totalSolidsLbPerDay: { value: totalTSLbPerDayFmt, unit: "lb/d" },
+    volatileSolidsLbPerDay: { value: totalVSLbPerDayFmt, unit: "lb/d" },
+    codMgL: { value: fmt(effectiveCODMgL, 0), unit: "mg/L" },
+    codLbPerDay: { value: fmt(totalCODLbPerDay, 0), unit: "lb/d" },
     scodFraction: { value: `${roundTo(scodFraction * 100)}`, unit: "%" },
-    scodMgL: { value: roundTo(effectiveCODMgL * scodFraction, 0).toLocaleString(), unit: "mg/L" },
-    pcodMgL: { value: roundTo(effectiveCODMgL * (1 - scodFraction), 0).toLocaleString(), unit: "mg/L" },
+    scodMgL: { value: fmt(effectiveCODMgL * scodFraction, 0), unit: "mg/L" },
+    pcodMgL: { value: fmt(effectiveCODMgL * (1 - scodFraction), 0), unit: "mg/L" },
     codVsRatio: { value: `${roundTo(codVsRatio > 0 ? codVsRatio : 1.4, 2)}`, unit: "lb COD/lb VS" },
-    totalVSLoad: { value: roundTo(eqVSLoadKgPerDay).toLocaleString(), unit: "kg VS/day" },
-    digesterVolume: { value: roundTo(digesterVolGallons, 0).toLocaleString(), unit: "gallons" },
-    hrt: { value: String(actualHRT), unit: "days" },
-    vsDestruction: { value: `${roundTo(vsDestruction * 100)}`, unit: "%" },
-    biogasAvgFlowScfm: { value: roundTo(biogasScfm).toLocaleString(), unit: "SCFM" },
-    biogasMaxFlowScfm: { value: roundTo(biogasScfm * 1.3).toLocaleString(), unit: "SCFM" },
-    biogasMinFlowScfm: { value: roundTo(biogasScfm * 0.6).toLocaleString(), unit: "SCFM" },
+    totalVSLoad: { value: eqVSLoadKgPerDayFmt, unit: "kg VS/day" },
+    digesterVolume: { value: fmt(digesterVolGallons, 0), unit: "gallons" },
+    hrt: spec(actualHRT, "days"),
+    vsDestruction: { value: `${vsDestructionPct}`, unit: "%" },
+    biogasAvgFlowScfm: { value: biogasScfmFmt, unit: "SCFM" },
+    biogasMaxFlowScfm: { value: fmt(biogasScfm * 1.3), unit: "SCFM" },
+    biogasMinFlowScfm: { value: fmt(biogasScfm * 0.6), unit: "SCFM" },
     biogasPressurePsig: { value: "0.5", unit: "psig" },
     biogasCH4: { value: `${ch4Pct}`, unit: "%" },
     biogasCO2: { value: `${co2Pct}`, unit: "%" },
@@ -1349,9 +1792,9 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     biogasO2: { value: "0.5", unit: "%" },
     biogasBtuPerScf: { value: `${biogasBtuPerScf}`, unit: "Btu/SCF" },
     biogasMmbtuPerDay: { value: `${biogasMmbtuPerDay}`, unit: "MMBtu/Day" },
-    rngAvgFlowScfm: { value: roundTo(rngScfm).toLocaleString(), unit: "SCFM" },
-    rngMaxFlowScfm: { value: roundTo(rngScfm * 1.3).toLocaleString(), unit: "SCFM" },
-    rngMinFlowScfm: { value: roundTo(rngScfm * 0.6).toLocaleString(), unit: "SCFM" },
+    rngAvgFlowScfm: { value: rngScfmFmt, unit: "SCFM" },
+    rngMaxFlowScfm: { value: fmt(rngScfm * 1.3), unit: "SCFM" },
+    rngMinFlowScfm: { value: fmt(rngScfm * 0.6), unit: "SCFM" },
     rngPressurePsig: { value: `${pressureOut}`, unit: "psig" },
     rngCH4: { value: `${productCH4}`, unit: "%" },
     rngCO2: { value: `${roundTo(rngProductCO2, 1)}`, unit: "%" },
@@ -1360,13 +1803,13 @@ export function calculateMassBalanceTypeB(upif: UpifRecord, designOverrides?: De
     rngO2: { value: "0.3", unit: "%" },
     rngBtuPerScf: { value: `${rngBtuPerScf}`, unit: "Btu/SCF" },
     rngMmbtuPerDay: { value: `${rngMmbtuPerDayFinal}`, unit: "MMBtu/Day" },
-    methaneRecovery: { value: `${roundTo(methaneRecovery * 100)}`, unit: "%" },
-    solidDigestate: { value: roundTo(cakeTPD).toLocaleString(), unit: "tons/day" },
+    methaneRecovery: { value: `${methaneRecoveryPct}`, unit: "%" },
+    solidDigestate: { value: fmt(cakeTPD), unit: "tons/day" },
     dafEffluent: { value: dafEffluentGPD.toLocaleString(), unit: "GPD" },
-    centrateTKNLbPerDay: { value: roundTo(centrateTKNLbPerDay, 0).toLocaleString(), unit: "lb/d" },
-    centrateNH3NLbPerDay: { value: roundTo(centrateNH3NLbPerDay, 0).toLocaleString(), unit: "lb/d" },
-    centrateTPLbPerDay: { value: roundTo(centrateTPLbPerDay, 0).toLocaleString(), unit: "lb/d" },
-    electricalDemand: { value: roundTo(electricalDemandKW).toLocaleString(), unit: "kW" },
+    centrateTKNLbPerDay: { value: fmt(centrateTKNLbPerDay, 0), unit: "lb/d" },
+    centrateNH3NLbPerDay: { value: fmt(centrateNH3NLbPerDay, 0), unit: "lb/d" },
+    centrateTPLbPerDay: { value: fmt(centrateTPLbPerDay, 0), unit: "lb/d" },
+    electricalDemand: { value: fmt(electricalDemandKW), unit: "kW" },
   };
 
   return {
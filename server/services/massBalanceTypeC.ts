@@ -29,49 +29,187 @@ const GAS_CONDITIONING_DEFAULTS: Record<string, Record<string, DesignCriterion>>
   },
 };
 
+// Shared read-only defaults — freeze at every level so a consumer mutating a
+// criterion cannot silently skew later calculations, and so consumers never
+// need a defensive copy. (TypeScript readonly would only protect typed callers.)
+for (const section of Object.values(GAS_CONDITIONING_DEFAULTS)) {
+  for (const criterion of Object.values(section)) Object.freeze(criterion);
+  Object.freeze(section);
+}
+Object.freeze(GAS_CONDITIONING_DEFAULTS);
+
+/** Strips thousands separators and percent signs from raw spec values. Hoisted so
+ * the pattern is compiled once instead of per replace() call in the spec-probing loop. */
+const COMMA_PCT_RE = /[,%]/g;
+
+/** Power-of-ten factors for the decimal counts roundTo actually sees (0-2 here). */
+const POW10 = [1, 10, 100, 1000, 10000];
+
 function roundTo(val: number, decimals: number = 1): number {
-  const factor = Math.pow(10, decimals);
+  const factor = POW10[decimals] ?? Math.pow(10, decimals);
   return Math.round(val * factor) / factor;
 }
 function kWToHP(kw: number): number { return roundTo(kw * 1.341, 1); }
 
-function getSpecValue(fs: FeedstockEntry, keys: string[], defaultVal: number): number {
-  if (!fs.feedstockSpecs) return defaultVal;
-  for (const key of keys) {
-    for (const [k, spec] of Object.entries(fs.feedstockSpecs)) {
-      const kl = k.toLowerCase();
-      const dl = spec.displayName.toLowerCase();
-      if (kl === key.toLowerCase() || kl.includes(key.toLowerCase()) || dl.includes(key.toLowerCase())) {
-        const val = parseFloat(String(spec.value).replace(/[,%]/g, ""));
-        if (!isNaN(val)) return val;
-      }
+type SpecEntry = { keyLower: string; displayNameLower: string; value: number };
+type SpecIndex = {
+  byKey: Map<string, number>;
+  byDisplay: Map<string, number>;
+  entries: SpecEntry[];
+};
+
+/**
+ * Lowercases spec keys/display names and parses values once per calculation.
+ * getSpecValue is probed for half a dozen parameters per call, so without this every
+ * probe would re-lowercase and re-parse the whole spec record. Entries whose values
+ * do not parse to a number are dropped here — they could never satisfy a probe.
+ * byKey/byDisplay give O(1) exact lookups before the substring scan; both are
+ * first-wins so they mirror record order.
+ */
+function indexSpecs(fs: FeedstockEntry): SpecIndex {
+  const byKey = new Map<string, number>();
+  const byDisplay = new Map<string, number>();
+  const entries: SpecEntry[] = [];
+  if (!fs.feedstockSpecs) return { byKey, byDisplay, entries };
+  for (const [k, spec] of Object.entries(fs.feedstockSpecs)) {
+    const value = parseFloat(String(spec.value).replace(COMMA_PCT_RE, ""));
+    if (Number.isNaN(value)) continue;
+    const keyLower = k.toLowerCase();
+    const displayNameLower = spec.displayName.toLowerCase();
+    if (!byKey.has(keyLower)) byKey.set(keyLower, value);
+    if (displayNameLower && !byDisplay.has(displayNameLower)) byDisplay.set(displayNameLower, value);
+    entries.push({ keyLower, displayNameLower, value });
+  }
+  return { byKey, byDisplay, entries };
+}
+
+// Probe keys for every spec lookup, pre-lowercased once at module load so
+// getSpecValue never re-normalizes them per call. Keys are tried in order.
+const FLOW_KEYS = ["flow", "biogasflow", "biogas flow", "gas flow"];
+const CH4_KEYS = ["ch4", "methane", "ch₄"];
+const CO2_KEYS = ["co2", "carbon dioxide", "co₂"];
+const N2_KEYS = ["n2", "nitrogen"];
+const O2_KEYS = ["o2", "oxygen"];
+const H2S_KEYS = ["h2s", "hydrogen sulfide", "h₂s"];
+const SILOXANE_KEYS = ["siloxane", "siloxanes"];
+const MAX_FLOW_KEYS = ["max flow", "maxflowscfm", "maximum flow", "peak flow"];
+const MIN_FLOW_KEYS = ["min flow", "minflowscfm", "minimum flow"];
+const PRESSURE_KEYS = ["pressure", "pressurepsig", "gas pressure", "inlet pressure"];
+const BTU_KEYS = ["btu/scf", "btuperscf", "heating value", "btu", "hhv", "lhv"];
+
+function getSpecValue(specs: SpecIndex, lowerKeys: readonly string[], defaultVal: number): number {
+  for (const kl of lowerKeys) {
+    const exact = specs.byKey.get(kl) ?? specs.byDisplay.get(kl);
+    if (exact !== undefined) return exact;
+    for (const entry of specs.entries) {
+      if (entry.keyLower.includes(kl) || entry.displayNameLower.includes(kl)) return entry.value;
     }
   }
   return defaultVal;
 }
 
-function parseBiogasFlow(fs: FeedstockEntry): { scfm: number; source: string } {
+/** Standard cubic feet per cubic metre; same constant the Type B service uses. */
+const SCF_PER_M3 = 35.3147;
+/** Minutes per day, for scfm <-> scf/day conversions. */
+const MIN_PER_DAY = 1440;
+
+/**
+ * Unit-recognition rules for free-text biogas flow units, tried in order. A rule
+ * matches when any of its substring groups has every member present in the unit
+ * (e.g. "scf" + "day" covers "scf/day"). Factors convert the volume to scfm and
+ * are folded to constants at module load.
+ */
+const FLOW_UNIT_RULES: { groups: string[][]; factor: number; source: string }[] = [
+  { groups: [["scfm"]], factor: 1, source: "User-provided" },
+  { groups: [["scfh"]], factor: 1 / 60, source: "User-provided" },
+  { groups: [["scfd"], ["scf", "day"]], factor: 1 / MIN_PER_DAY, source: "User-provided" },
+  { groups: [["m³/d"], ["m3/d"]], factor: SCF_PER_M3 / MIN_PER_DAY, source: "Converted from m³/day" },
+  { groups: [["m³/h"], ["m3/h"]], factor: SCF_PER_M3 / 60, source: "Converted from m³/hr" },
+  { groups: [["nm³"], ["nm3"]], factor: SCF_PER_M3 / MIN_PER_DAY, source: "Converted from Nm³/day" },
+  { groups: [["cfm"]], factor: 1, source: "User-provided" },
+];
+
+function parseBiogasFlow(fs: FeedstockEntry, specs: SpecIndex): { scfm: number; source: string } {
   if (!fs.feedstockSpecs) {
     const vol = parseFloat((fs.feedstockVolume || "0").replace(/,/g, ""));
     const unit = (fs.feedstockUnit || "").toLowerCase();
-    if (!isNaN(vol) && vol > 0) {
-      if (unit.includes("scfm")) return { scfm: vol, source: "User-provided" };
-      if (unit.includes("scfh")) return { scfm: vol / 60, source: "User-provided" };
-      if (unit.includes("scfd") || (unit.includes("scf") && unit.includes("day"))) return { scfm: vol / 1440, source: "User-provided" };
-      if (unit.includes("m³/d") || unit.includes("m3/d")) return { scfm: (vol * 35.3147) / 1440, source: "Converted from m³/day" };
-      if (unit.includes("m³/h") || unit.includes("m3/h")) return { scfm: (vol * 35.3147) / 60, source: "Converted from m³/hr" };
-      if (unit.includes("nm³") || unit.includes("nm3")) return { scfm: (vol * 35.3147) / 1440, source: "Converted from Nm³/day" };
-      if (unit.includes("scfm") || unit.includes("cfm")) return { scfm: vol, source: "User-provided" };
+    // NaN > 0 is false, so a failed parse falls through without its own guard.
+    if (vol > 0) {
+      for (const rule of FLOW_UNIT_RULES) {
+        if (rule.groups.some((group) => group.every((sub) => unit.includes(sub)))) {
+          return { scfm: vol * rule.factor, source: rule.source };
+        }
+      }
       return { scfm: vol, source: "Assumed scfm" };
     }
   }
-  const flowVal = getSpecValue(fs, ["flow", "biogasFlow", "biogas flow", "gas flow"], 0);
+  const flowVal = getSpecValue(specs, FLOW_KEYS, 0);
   if (flowVal > 0) return { scfm: flowVal, source: "From specs" };
   return { scfm: 0, source: "Not found" };
 }
 
+type StreamParam = { value: number; unit: string };
+
+/** Shorthand for the numeric `{ value, unit }` pairs used in process streams.
+ * One construction site keeps every stream field on a single hidden class. */
+function vu(value: number, unit: string): StreamParam {
+  return { value, unit };
+}
+
+/**
+ * Builds one equipment spec field. Spec values are strings by contract
+ * (EquipmentItem.specs in the shared schema is `{ value: string; unit: string }`),
+ * so this is the single point where a numeric spec gets stringified.
+ */
+function spec(value: string | number, unit: string): { value: string; unit: string } {
+  return { value: typeof value === "string" ? value : String(value), unit };
+}
+
+/** Flags every generated equipment item starts with. */
+const EQUIP_FLAGS = { isOverridden: false, isLocked: false } as const;
+
+/** Static fields of the enclosed flare; per-call sizing lands in specs/id. */
+const ENCLOSED_FLARE_BASE = {
+  process: "Gas Management",
+  equipmentType: "Enclosed Flare",
+  description: "Enclosed ground flare for tail gas and excess biogas combustion",
+  quantity: 1,
+  designBasis: "110% of maximum biogas flow",
+  notes: "Required for startup, upset, and maintenance",
+  ...EQUIP_FLAGS,
+} as const;
+
+/** One formatter per decimals count, built lazily — Intl.NumberFormat construction
+ * costs far more than a format() call and fmt runs dozens of times per calculation. */
+const NUMBER_FORMATTERS: Intl.NumberFormat[] = [];
+
 function fmt(v: number, decimals: number = 1): string {
-  return roundTo(v, decimals).toLocaleString();
+  const formatter = (NUMBER_FORMATTERS[decimals] ??=
+    new Intl.NumberFormat(undefined, { maximumFractionDigits: decimals }));
+  return formatter.format(roundTo(v, decimals));
+}
+
+/**
+ * Result shell for the error paths (no feedstocks / no usable flow). Arrays are
+ * created fresh per call since MassBalanceResults is mutable by contract.
+ */
+function emptyResult(
+  assumptions: MassBalanceResults["assumptions"],
+  warnings: MassBalanceResults["warnings"],
+): MassBalanceResults {
+  return {
+    projectType: "C",
+    stages: [],
+    adStages: [],
+    recycleStreams: [],
+    equipment: [],
+    convergenceIterations: 0,
+    convergenceAchieved: true,
+    assumptions,
+    warnings,
+    summary: {},
+    calculationSteps: [],
+  };
 }
 
 export function calculateMassBalanceTypeC(upif: UpifRecord, designOverrides?: DesignOverrides): MassBalanceResults {
@@ -86,23 +224,12 @@ export function calculateMassBalanceTypeC(upif: UpifRecord, designOverrides?: De
   const feedstocks = (upif.feedstocks || []) as FeedstockEntry[];
   if (feedstocks.length === 0) {
     warnings.push({ field: "Biogas Input", message: "No biogas input parameters found in UPIF", severity: "error" });
-    return {
-      projectType: "C",
-      stages: [],
-      adStages: [],
-      recycleStreams: [],
-      equipment: [],
-      convergenceIterations: 0,
-      convergenceAchieved: true,
-      assumptions,
-      warnings,
-      summary: {},
-      calculationSteps: [],
-    };
+    return emptyResult(assumptions, warnings);
   }
 
   const fs = feedstocks[0];
-  let { scfm: biogasScfm, source: flowSource } = parseBiogasFlow(fs);
+  const specs = indexSpecs(fs);
+  let { scfm: biogasScfm, source: flowSource } = parseBiogasFlow(fs, specs);
 
   if (designOverrides?.biogasScfm !== undefined) {
     console.log(`Mass Balance Type C: Biogas flow overridden to ${designOverrides.biogasScfm} SCFM (parsed: ${biogasScfm} SCFM)`);
@@ -112,95 +239,102 @@ export function calculateMassBalanceTypeC(upif: UpifRecord, designOverrides?: De
 
   if (biogasScfm <= 0) {
     warnings.push({ field: "Biogas Flow", message: "No biogas flow rate found. Provide flow in scfm, scfh, m³/day, or similar units.", severity: "error" });
-    return {
-      projectType: "C",
-      stages: [],
-      adStages: [],
-      recycleStreams: [],
-      equipment: [],
-      convergenceIterations: 0,
-      convergenceAchieved: true,
-      assumptions,
-      warnings,
-      summary: {},
-      calculationSteps: [],
-    };
+    return emptyResult(assumptions, warnings);
   }
 
-  const ch4Pct = designOverrides?.ch4Pct ?? getSpecValue(fs, ["ch4", "methane", "ch₄"], 60);
-  const co2Pct = designOverrides?.co2Pct ?? getSpecValue(fs, ["co2", "carbon dioxide", "co₂"], 100 - ch4Pct - 2);
-  const n2Pct = getSpecValue(fs, ["n2", "nitrogen"], 1);
-  const o2Pct = getSpecValue(fs, ["o2", "oxygen"], 0.5);
-  const h2sPpmv = designOverrides?.h2sPpmv ?? getSpecValue(fs, ["h2s", "hydrogen sulfide", "h₂s"], 1500);
-  const siloxanePpbv = getSpecValue(fs, ["siloxane", "siloxanes"], 5000);
-
-  const biogasMaxScfm = getSpecValue(fs, ["max flow", "maxFlowScfm", "maximum flow", "peak flow"], biogasScfm * 1.3);
-  const biogasMinScfm = getSpecValue(fs, ["min flow", "minFlowScfm", "minimum flow"], biogasScfm * 0.6);
-  const biogasPressurePsig = getSpecValue(fs, ["pressure", "pressurePsig", "gas pressure", "inlet pressure"], 1.0);
-  const biogasBtuPerScf = getSpecValue(fs, ["btu/scf", "btuPerScf", "heating value", "btu", "hhv", "lhv"], ch4Pct * 10.12);
-
-  assumptions.push({ parameter: "Biogas Average Flow", value: `${roundTo(biogasScfm).toLocaleString()} SCFM`, source: flowSource });
-  if (biogasMaxScfm === biogasScfm * 1.3) assumptions.push({ parameter: "Biogas Max Flow", value: `${roundTo(biogasMaxScfm).toLocaleString()} SCFM`, source: "Default 1.3× average flow" });
-  if (biogasMinScfm === biogasScfm * 0.6) assumptions.push({ parameter: "Biogas Min Flow", value: `${roundTo(biogasMinScfm).toLocaleString()} SCFM`, source: "Default 0.6× average flow" });
+  const ch4Pct = designOverrides?.ch4Pct ?? getSpecValue(specs, CH4_KEYS, 60);
+  const co2Pct = designOverrides?.co2Pct ?? getSpecValue(specs, CO2_KEYS, 100 - ch4Pct - 2);
+  const n2Pct = getSpecValue(specs, N2_KEYS, 1);
+  const o2Pct = getSpecValue(specs, O2_KEYS, 0.5);
+  const h2sPpmv = designOverrides?.h2sPpmv ?? getSpecValue(specs, H2S_KEYS, 1500);
+  const siloxanePpbv = getSpecValue(specs, SILOXANE_KEYS, 5000);
+
+  const biogasMaxScfm = getSpecValue(specs, MAX_FLOW_KEYS, biogasScfm * 1.3);
+  const biogasMinScfm = getSpecValue(specs, MIN_FLOW_KEYS, biogasScfm * 0.6);
+  const biogasPressurePsig = getSpecValue(specs, PRESSURE_KEYS, 1.0);
+  const biogasBtuPerScf = getSpecValue(specs, BTU_KEYS, ch4Pct * 10.12);
+
+  // Each display value below is referenced several times (stage streams, notes,
+  // assumptions, summary) — round once and reuse.
+  const biogasScfmRounded = roundTo(biogasScfm);
+  const biogasMaxScfmRounded = roundTo(biogasMaxScfm);
+  const biogasMinScfmRounded = roundTo(biogasMinScfm);
+  const biogasPressurePsigRounded = roundTo(biogasPressurePsig, 1);
+  const ch4PctRounded = roundTo(ch4Pct, 1);
+  const co2PctRounded = roundTo(co2Pct, 1);
+  const n2PctRounded = roundTo(n2Pct, 1);
+  const o2PctRounded = roundTo(o2Pct, 1);
+  const h2sPpmvRounded = roundTo(h2sPpmv);
+  const siloxanePpbvRounded = roundTo(siloxanePpbv);
+  const biogasBtuPerScfRounded = roundTo(biogasBtuPerScf);
+
+  assumptions.push({ parameter: "Biogas Average Flow", value: `${fmt(biogasScfmRounded)} SCFM`, source: flowSource });
+  if (biogasMaxScfm === biogasScfm * 1.3) assumptions.push({ parameter: "Biogas Max Flow", value: `${fmt(biogasMaxScfmRounded)} SCFM`, source: "Default 1.3× average flow" });
+  if (biogasMinScfm === biogasScfm * 0.6) assumptions.push({ parameter: "Biogas Min Flow", value: `${fmt(biogasMinScfmRounded)} SCFM`, source: "Default 0.6× average flow" });
   if (ch4Pct === 60) assumptions.push({ parameter: "CH₄ Content", value: "60%", source: "Default assumption — typical AD biogas" });
   if (h2sPpmv === 1500) assumptions.push({ parameter: "H₂S", value: "1,500 ppm", source: "Default assumption — typical AD biogas" });
 
-  const biogasScfPerDay = biogasScfm * 1440;
-  const biogasM3PerDay = biogasScfPerDay / 35.3147;
+  const biogasScfPerDay = biogasScfm * MIN_PER_DAY;
+  const biogasM3PerDay = biogasScfPerDay / SCF_PER_M3;
   const biogasMmbtuPerDay = (biogasScfPerDay * biogasBtuPerScf) / 1_000_000;
+  const biogasMmbtuPerDayRounded = roundTo(biogasMmbtuPerDay, 1);
 
   const inletStage: ADProcessStage = {
     name: "Existing Biogas Supply",
     type: "biogasInlet",
     inputStream: {
-      avgFlowScfm: { value: roundTo(biogasScfm), unit: "SCFM" },
-      maxFlowScfm: { value: roundTo(biogasMaxScfm), unit: "SCFM" },
-      minFlowScfm: { value: roundTo(biogasMinScfm), unit: "SCFM" },
-      pressurePsig: { value: roundTo(biogasPressurePsig, 1), unit: "psig" },
-      ch4: { value: roundTo(ch4Pct, 1), unit: "%" },
-      co2: { value: roundTo(co2Pct, 1), unit: "%" },
-      h2s: { value: roundTo(h2sPpmv), unit: "ppm" },
-      n2: { value: roundTo(n2Pct, 1), unit: "%" },
-      o2: { value: roundTo(o2Pct, 1), unit: "%" },
-      btuPerScf: { value: roundTo(biogasBtuPerScf), unit: "Btu/SCF" },
-      mmbtuPerDay: { value: roundTo(biogasMmbtuPerDay, 1), unit: "MMBtu/Day" },
-      siloxanes: { value: roundTo(siloxanePpbv), unit: "ppbv" },
+      avgFlowScfm: vu(biogasScfmRounded, "SCFM"),
+      maxFlowScfm: vu(biogasMaxScfmRounded, "SCFM"),
+      minFlowScfm: vu(biogasMinScfmRounded, "SCFM"),
+      pressurePsig: vu(biogasPressurePsigRounded, "psig"),
+      ch4: vu(ch4PctRounded, "%"),
+      co2: vu(co2PctRounded, "%"),
+      h2s: vu(h2sPpmvRounded, "ppm"),
+      n2: vu(n2PctRounded, "%"),
+      o2: vu(o2PctRounded, "%"),
+      btuPerScf: vu(biogasBtuPerScfRounded, "Btu/SCF"),
+      mmbtuPerDay: vu(biogasMmbtuPerDayRounded, "MMBtu/Day"),
+      siloxanes: vu(siloxanePpbvRounded, "ppbv"),
     },
     outputStream: {
-      avgFlowScfm: { value: roundTo(biogasScfm), unit: "SCFM" },
+      avgFlowScfm: vu(biogasScfmRounded, "SCFM"),
     },
     designCriteria: {},
     notes: ["Existing digester biogas supply — no digester sizing included in Type C"],
   };
   adStages.push(inletStage);
 
-  const h2sRemovalEff = GAS_CONDITIONING_DEFAULTS.gasConditioning.h2sRemovalEff.value / 100;
-  const siloxaneRemovalEff = GAS_CONDITIONING_DEFAULTS.gasConditioning.siloxaneRemoval.value / 100;
+  const conditioningDefaults = GAS_CONDITIONING_DEFAULTS.gasConditioning;
+  const h2sRemovalEff = conditioningDefaults.h2sRemovalEff.value / 100;
+  const siloxaneRemovalEff = conditioningDefaults.siloxaneRemoval.value / 100;
   const outH2sPpmv = h2sPpmv * (1 - h2sRemovalEff);
   const outSiloxanePpbv = siloxanePpbv * (1 - siloxaneRemovalEff);
   const conditionedScfm = biogasScfm * 0.99;
+  const outH2sPpmvRounded = roundTo(outH2sPpmv, 1);
+  const conditionedScfmRounded = roundTo(conditionedScfm);
 
   const prodevDesign = getProdevalGasTrainDesignCriteria(biogasScfm);
+  const upgradingDesign = prodevDesign.gasUpgrading;
   const prodevUnit = selectProdevalUnit(biogasScfm);
 
   const conditioningStage: ADProcessStage = {
     name: "Biogas Conditioning (Prodeval)",
     type: "gasConditioning",
     inputStream: {
-      biogasFlow: { value: roundTo(biogasScfm), unit: "scfm" },
-      h2s: { value: roundTo(h2sPpmv), unit: "ppmv" },
-      siloxanes: { value: roundTo(siloxanePpbv), unit: "ppbv" },
+      biogasFlow: vu(biogasScfmRounded, "scfm"),
+      h2s: vu(h2sPpmvRounded, "ppmv"),
+      siloxanes: vu(siloxanePpbvRounded, "ppbv"),
     },
     outputStream: {
-      biogasFlow: { value: roundTo(conditionedScfm), unit: "scfm" },
-      h2s: { value: roundTo(outH2sPpmv, 1), unit: "ppmv" },
-      siloxanes: { value: roundTo(outSiloxanePpbv), unit: "ppbv" },
-      moisture: { value: 0, unit: "dry" },
+      biogasFlow: vu(conditionedScfmRounded, "scfm"),
+      h2s: vu(outH2sPpmvRounded, "ppmv"),
+      siloxanes: vu(roundTo(outSiloxanePpbv), "ppbv"),
+      moisture: vu(0, "dry"),
     },
     designCriteria: prodevDesign.gasConditioning,
     notes: [
       `Prodeval VALOGAZ® FU 100/200 + VALOPACK® FU 300 — ${prodevUnit.numberOfTrains} train(s)`,
-      `H₂S removal via Prodeval VALOPACK® activated carbon (${roundTo(h2sPpmv)} → ${roundTo(outH2sPpmv, 1)} ppmv)`,
+      `H₂S removal via Prodeval VALOPACK® activated carbon (${h2sPpmvRounded} → ${outH2sPpmvRounded} ppmv)`,
       "Siloxane removal via Prodeval VALOPACK® activated carbon adsorption",
       "Moisture removal via Prodeval VALOGAZ® refrigerated condenser to 39°F dewpoint",
     ],
@@ -209,95 +343,93 @@ export function calculateMassBalanceTypeC(upif: UpifRecord, designOverrides?: De
 
   const methaneRecovery = designOverrides?.methaneRecovery !== undefined
     ? designOverrides.methaneRecovery / 100
-    : prodevDesign.gasUpgrading.methaneRecovery.value / 100;
-  const productCH4 = prodevDesign.gasUpgrading.productCH4.value;
+    : upgradingDesign.methaneRecovery.value / 100;
+  const productCH4 = upgradingDesign.productCH4.value;
   let ch4ScfPerDay = biogasScfPerDay * (ch4Pct / 100);
   let rngCH4ScfPerDay = ch4ScfPerDay * methaneRecovery;
   let rngScfPerDay = rngCH4ScfPerDay / (productCH4 / 100);
-  let rngScfm = rngScfPerDay / 1440;
+  let rngScfm = rngScfPerDay / MIN_PER_DAY;
   let rngMMBtuPerDay = rngScfPerDay * 1012 / 1_000_000;
 
   if (designOverrides?.rngScfm !== undefined) {
     rngScfm = designOverrides.rngScfm;
-    rngScfPerDay = rngScfm * 1440;
+    rngScfPerDay = rngScfm * MIN_PER_DAY;
     rngCH4ScfPerDay = rngScfPerDay * (productCH4 / 100);
     rngMMBtuPerDay = rngScfPerDay * 1012 / 1_000_000;
     console.log(`Mass Balance Type C: RNG flow overridden to ${rngScfm} SCFM`);
   }
 
   const tailgasScfm = conditionedScfm - rngScfm;
-  const electricalDemandKW = biogasM3PerDay * prodevDesign.gasUpgrading.electricalDemand.value / 24;
+  const electricalDemandKW = biogasM3PerDay * upgradingDesign.electricalDemand.value / 24;
 
   const rngMaxScfm = (biogasMaxScfm / biogasScfm) * rngScfm;
   const rngMinScfm = (biogasMinScfm / biogasScfm) * rngScfm;
-  const rngPressurePsig = prodevDesign.gasUpgrading.pressureOut.value;
+  const rngPressurePsig = upgradingDesign.pressureOut.value;
   const rngBtuPerScf = productCH4 * 10.12;
   const rngCO2Pct = 100 - productCH4 - 0.5 - 0.1;
-  const rngH2SPpm = outH2sPpmv < 4 ? roundTo(outH2sPpmv, 1) : 4;
+  const rngH2SPpm = outH2sPpmv < 4 ? outH2sPpmvRounded : 4;
   const rngN2Pct = 0.4;
   const rngO2Pct = 0.1;
 
+  const rngScfmRounded = roundTo(rngScfm);
+  const rngMaxScfmRounded = roundTo(rngMaxScfm);
+  const rngMinScfmRounded = roundTo(rngMinScfm);
+  const rngCO2PctRounded = roundTo(rngCO2Pct, 1);
+  const rngBtuPerScfRounded = roundTo(rngBtuPerScf);
+  const rngMMBtuPerDayRounded = roundTo(rngMMBtuPerDay, 1);
+  const tailgasScfmRounded = roundTo(tailgasScfm);
+  const methaneRecoveryPct = roundTo(methaneRecovery * 100);
+  const electricalDemandKWRounded = roundTo(electricalDemandKW);
+
   const upgradingStage: ADProcessStage = {
     name: "Gas Upgrading to RNG (Prodeval)",
     type: "gasUpgrading",
     inputStream: {
-      avgFlowScfm: { value: roundTo(conditionedScfm), unit: "SCFM" },
-      ch4: { value: roundTo(ch4Pct, 1), unit: "%" },
+      avgFlowScfm: vu(conditionedScfmRounded, "SCFM"),
+      ch4: vu(ch4PctRounded, "%"),
     },
     outputStream: {
-      avgFlowScfm: { value: roundTo(rngScfm), unit: "SCFM" },
-      maxFlowScfm: { value: roundTo(rngMaxScfm), unit: "SCFM" },
-      minFlowScfm: { value: roundTo(rngMinScfm), unit: "SCFM" },
-      pressurePsig: { value: rngPressurePsig, unit: "psig" },
-      ch4: { value: productCH4, unit: "%" },
-      co2: { value: roundTo(rngCO2Pct, 1), unit: "%" },
-      h2s: { value: rngH2SPpm, unit: "ppm" },
-      n2: { value: rngN2Pct, unit: "%" },
-      o2: { value: rngO2Pct, unit: "%" },
-      btuPerScf: { value: roundTo(rngBtuPerScf), unit: "Btu/SCF" },
-      mmbtuPerDay: { value: roundTo(rngMMBtuPerDay, 1), unit: "MMBtu/Day" },
-      tailgasFlow: { value: roundTo(tailgasScfm), unit: "SCFM" },
-      methaneRecovery: { value: roundTo(methaneRecovery * 100), unit: "%" },
+      avgFlowScfm: vu(rngScfmRounded, "SCFM"),
+      maxFlowScfm: vu(rngMaxScfmRounded, "SCFM"),
+      minFlowScfm: vu(rngMinScfmRounded, "SCFM"),
+      pressurePsig: vu(rngPressurePsig, "psig"),
+      ch4: vu(productCH4, "%"),
+      co2: vu(rngCO2PctRounded, "%"),
+      h2s: vu(rngH2SPpm, "ppm"),
+      n2: vu(rngN2Pct, "%"),
+      o2: vu(rngO2Pct, "%"),
+      btuPerScf: vu(rngBtuPerScfRounded, "Btu/SCF"),
+      mmbtuPerDay: vu(rngMMBtuPerDayRounded, "MMBtu/Day"),
+      tailgasFlow: vu(tailgasScfmRounded, "SCFM"),
+      methaneRecovery: vu(methaneRecoveryPct, "%"),
     },
-    designCriteria: prodevDesign.gasUpgrading,
+    designCriteria: upgradingDesign,
     notes: [
       `Prodeval VALOPUR® FU 500 — 3-stage membrane separation`,
-      `RNG product: ${roundTo(rngScfm)} SCFM at ${rngPressurePsig} psig, ≥${productCH4}% CH₄`,
-      `Tail gas: ${roundTo(tailgasScfm)} SCFM → thermal oxidizer or flare`,
-      `Electrical demand: ${roundTo(electricalDemandKW)} kW`,
+      `RNG product: ${rngScfmRounded} SCFM at ${rngPressurePsig} psig, ≥${productCH4}% CH₄`,
+      `Tail gas: ${tailgasScfmRounded} SCFM → thermal oxidizer or flare`,
+      `Electrical demand: ${electricalDemandKWRounded} kW`,
     ],
   };
   adStages.push(upgradingStage);
 
-  const prodevalEquipment = getProdevalEquipmentList(biogasScfm, (suffix?: string) => `eq-${suffix || eqId++}`);
-  for (const pe of prodevalEquipment) {
-    equipment.push({
-      ...pe,
-      isOverridden: false,
-      isLocked: false,
-    });
-  }
-
+  const prodevalEquipment = getProdevalEquipmentList(biogasScfm, (suffix?: string) => (suffix ? `eq-${suffix}` : makeId()));
   const cFlareH = roundTo(Math.max(15, Math.sqrt(biogasScfm) * 2), 0);
-  equipment.push({
-    id: makeId(),
-    process: "Gas Management",
-    equipmentType: "Enclosed Flare",
-    description: "Enclosed ground flare for tail gas and excess biogas combustion",
-    quantity: 1,
-    specs: {
-      capacity: { value: String(roundTo(biogasScfm * 1.1)), unit: "scfm" },
-      destructionEff: { value: "99.5", unit: "%" },
-      dimensionsL: { value: "8", unit: "ft (dia)" },
-      dimensionsW: { value: "8", unit: "ft (dia)" },
-      dimensionsH: { value: String(cFlareH), unit: "ft" },
-      power: { value: "5", unit: "HP" },
+  equipment.push(
+    ...prodevalEquipment.map((pe) => ({ ...pe, ...EQUIP_FLAGS })),
+    {
+      ...ENCLOSED_FLARE_BASE,
+      id: makeId(),
+      specs: {
+        capacity: spec(roundTo(biogasScfm * 1.1), "scfm"),
+        destructionEff: spec("99.5", "%"),
+        dimensionsL: spec("8", "ft (dia)"),
+        dimensionsW: spec("8", "ft (dia)"),
+        dimensionsH: spec(cFlareH, "ft"),
+        power: spec("5", "HP"),
+      },
     },
-    designBasis: "110% of maximum biogas flow",
-    notes: "Required for startup, upset, and maintenance",
-    isOverridden: false,
-    isLocked: false,
-  });
+  );
 
   calculationSteps.push({
     category: "Biogas Input",
@@ -385,37 +517,37 @@ export function calculateMassBalanceTypeC(upif: UpifRecord, designOverrides?: De
     formula: "Biogas Volume (m³/day) × Specific Power ÷ 24",
     inputs: [
       { name: "Biogas", value: fmt(biogasM3PerDay, 0), unit: "m³/day" },
-      { name: "Specific Power", value: fmt(prodevDesign.gasUpgrading.electricalDemand.value), unit: "kWh/1,000 scf" },
+      { name: "Specific Power", value: fmt(upgradingDesign.electricalDemand.value), unit: "kWh/1,000 scf" },
     ],
     result: { value: fmt(electricalDemandKW), unit: "kW" },
   });
 
   const summary: Record<string, { value: string; unit: string }> = {
-    biogasAvgFlowScfm: { value: roundTo(biogasScfm).toLocaleString(), unit: "SCFM" },
-    biogasMaxFlowScfm: { value: roundTo(biogasMaxScfm).toLocaleString(), unit: "SCFM" },
-    biogasMinFlowScfm: { value: roundTo(biogasMinScfm).toLocaleString(), unit: "SCFM" },
-    biogasPressurePsig: { value: roundTo(biogasPressurePsig, 1).toString(), unit: "psig" },
-    biogasCH4: { value: roundTo(ch4Pct, 1).toString(), unit: "%" },
-    biogasCO2: { value: roundTo(co2Pct, 1).toString(), unit: "%" },
-    biogasH2S: { value: roundTo(h2sPpmv).toLocaleString(), unit: "ppm" },
-    biogasN2: { value: roundTo(n2Pct, 1).toString(), unit: "%" },
-    biogasO2: { value: roundTo(o2Pct, 1).toString(), unit: "%" },
-    biogasBtuPerScf: { value: roundTo(biogasBtuPerScf).toLocaleString(), unit: "Btu/SCF" },
-    biogasMmbtuPerDay: { value: roundTo(biogasMmbtuPerDay, 1).toLocaleString(), unit: "MMBtu/Day" },
-    rngAvgFlowScfm: { value: roundTo(rngScfm).toLocaleString(), unit: "SCFM" },
-    rngMaxFlowScfm: { value: roundTo(rngMaxScfm).toLocaleString(), unit: "SCFM" },
-    rngMinFlowScfm: { value: roundTo(rngMinScfm).toLocaleString(), unit: "SCFM" },
-    rngPressurePsig: { value: rngPressurePsig.toString(), unit: "psig" },
-    rngCH4: { value: productCH4.toString(), unit: "%" },
-    rngCO2: { value: roundTo(rngCO2Pct, 1).toString(), unit: "%" },
-    rngH2S: { value: rngH2SPpm.toString(), unit: "ppm" },
-    rngN2: { value: rngN2Pct.toString(), unit: "%" },
-    rngO2: { value: rngO2Pct.toString(), unit: "%" },
-    rngBtuPerScf: { value: roundTo(rngBtuPerScf).toLocaleString(), unit: "Btu/SCF" },
-    rngMmbtuPerDay: { value: roundTo(rngMMBtuPerDay, 1).toLocaleString(), unit: "MMBtu/Day" },
-    methaneRecovery: { value: roundTo(methaneRecovery * 100).toString(), unit: "%" },
-    tailgasFlow: { value: roundTo(tailgasScfm).toLocaleString(), unit: "SCFM" },
-    electricalDemand: { value: roundTo(electricalDemandKW).toLocaleString(), unit: "kW" },
+    biogasAvgFlowScfm: { value: fmt(biogasScfmRounded), unit: "SCFM" },
+    biogasMaxFlowScfm: { value: fmt(biogasMaxScfmRounded), unit: "SCFM" },
+    biogasMinFlowScfm: { value: fmt(biogasMinScfmRounded), unit: "SCFM" },
+    biogasPressurePsig: { value: String(biogasPressurePsigRounded), unit: "psig" },
+    biogasCH4: { value: String(ch4PctRounded), unit: "%" },
+    biogasCO2: { value: String(co2PctRounded), unit: "%" },
+    biogasH2S: { value: fmt(h2sPpmvRounded), unit: "ppm" },
+    biogasN2: { value: String(n2PctRounded), unit: "%" },
+    biogasO2: { value: String(o2PctRounded), unit: "%" },
+    biogasBtuPerScf: { value: fmt(biogasBtuPerScfRounded), unit: "Btu/SCF" },
+    biogasMmbtuPerDay: { value: fmt(biogasMmbtuPerDayRounded), unit: "MMBtu/Day" },
+    rngAvgFlowScfm: { value: fmt(rngScfmRounded), unit: "SCFM" },
+    rngMaxFlowScfm: { value: fmt(rngMaxScfmRounded), unit: "SCFM" },
+    rngMinFlowScfm: { value: fmt(rngMinScfmRounded), unit: "SCFM" },
+    rngPressurePsig: { value: String(rngPressurePsig), unit: "psig" },
+    rngCH4: { value: String(productCH4), unit: "%" },
+    rngCO2: { value: String(rngCO2PctRounded), unit: "%" },
+    rngH2S: { value: String(rngH2SPpm), unit: "ppm" },
+    rngN2: { value: String(rngN2Pct), unit: "%" },
+    rngO2: { value: String(rngO2Pct), unit: "%" },
+    rngBtuPerScf: { value: fmt(rngBtuPerScfRounded), unit: "Btu/SCF" },
+    rngMmbtuPerDay: { value: fmt(rngMMBtuPerDayRounded), unit: "MMBtu/Day" },
+    methaneRecovery: { value: String(methaneRecoveryPct), unit: "%" },
+    tailgasFlow: { value: fmt(tailgasScfmRounded), unit: "SCFM" },
+    electricalDemand: { value: fmt(electricalDemandKWRounded), unit: "kW" },
   };
 
   return {
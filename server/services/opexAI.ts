@@ -33,7 +33,7 @@
 import { llmComplete, isProviderAvailable, getAvailableProviders, providerLabels, type LLMProvider } from "../llm";
 import type { OpexResults, OpexLineItem, OpexSummary, MassBalanceResults, CapexResults, EquipmentItem, OpexEditableAssumption } from "@shared/schema";
 import type { PromptKey } from "@shared/default-prompts";
-import { DEFAULT_PROMPTS } from "@shared/default-prompts";
+import { DEFAULT_PROMPTS, renderTemplate } from "@shared/default-prompts";
 
 const opexPromptMap: Record<string, PromptKey> = {
   a: "opex_type_a",
@@ -1260,10 +1260,11 @@ export async function generateOpexWithAI(
     console.log(`OpEx AI: Pre-calculated ${deterministicItems.length} deterministic line items (${skippedCategories.join(", ")})`);
   }
 
-  const systemPrompt = promptTemplate
-    .replace("{{EQUIPMENT_DATA}}", equipmentDataString)
-    .replace("{{UPIF_DATA}}", upifContextString)
-    .replace("{{CAPEX_DATA}}", capexDataString);
+  const systemPrompt = renderTemplate(promptTemplate, {
+    EQUIPMENT_DATA: equipmentDataString,
+    UPIF_DATA: upifContextString,
+    CAPEX_DATA: capexDataString,
+  });
 
   console.log(`OpEx AI: Generating for project type ${normalizedType.toUpperCase()} using ${model} (prompt: ${promptKey})`);
 
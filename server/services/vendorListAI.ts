@@ -1,7 +1,7 @@
 import { llmComplete, isProviderAvailable, getAvailableProviders, providerLabels, type LLMProvider } from "../llm";
 import type { EquipmentItem, VendorList } from "@shared/schema";
 import type { PromptKey } from "@shared/default-prompts";
-import { DEFAULT_PROMPTS } from "@shared/default-prompts";
+import { DEFAULT_PROMPTS, renderTemplate } from "@shared/default-prompts";
 
 function buildEquipmentDataString(equipment: EquipmentItem[]): string {
   return equipment.map((eq, i) => {
@@ -54,9 +54,10 @@ export async function generateVendorListWithAI(
   const equipmentData = buildEquipmentDataString(equipment);
   const projectContext = `Project Type: ${projectType}`;
 
-  const prompt = template
-    .replace("{{EQUIPMENT_DATA}}", equipmentData)
-    .replace("{{PROJECT_CONTEXT}}", projectContext);
+  const prompt = renderTemplate(template, {
+    EQUIPMENT_DATA: equipmentData,
+    PROJECT_CONTEXT: projectContext,
+  });
 
   const providersToTry: LLMProvider[] = [];
   if (isProviderAvailable(preferredModel)) {
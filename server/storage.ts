@@ -430,32 +430,51 @@ export class DatabaseStorage implements IStorage {
   // Prompt template CRUD operations.
   // upsertPromptTemplate performs an insert-or-update operation: if a template with
   // the same key exists, it updates the record; otherwise, it inserts a new one.
+  //
+  // getPromptTemplateByKey is called on every LLM request but templates only
+  // change via the Settings page, so lookups (including "no override" misses)
+  // are cached in-process and invalidated on upsert/delete. The TTL guards
+  // against rows edited outside this process going stale indefinitely.
+
+  private promptTemplateCache = new Map<string, { value: PromptTemplate | undefined; timestamp: number }>();
+  private static readonly PROMPT_TEMPLATE_CACHE_TTL_MS = 5 * 60 * 1000;
 
   async getAllPromptTemplates(): Promise<PromptTemplate[]> {
     return db.select().from(promptTemplates).orderBy(promptTemplates.key);
   }
 
   async getPromptTemplateByKey(key: string): Promise<PromptTemplate | undefined> {
+    const cached = this.promptTemplateCache.get(key);
+    if (cached && Date.now() - cached.timestamp < DatabaseStorage.PROMPT_TEMPLATE_CACHE_TTL_MS) {
+      return cached.value;
+    }
     const result = await db.select().from(promptTemplates).where(eq(promptTemplates.key, key));
+    this.promptTemplateCache.set(key, { value: result[0], timestamp: Date.now() });
     return result[0];
   }
 
   async upsertPromptTemplate(data: InsertPromptTemplate): Promise<PromptTemplate> {
+    this.promptTemplateCache.delete(data.key);
     const existing = await this.getPromptTemplateByKey(data.key);
+    let saved: PromptTemplate;
     if (existing) {
       const result = await db
         .update(promptTemplates)
         .set({ ...data, updatedAt: new Date() })
         .where(eq(promptTemplates.key, data.key))
         .returning();
-      return result[0];
+      saved = result[0];
+    } else {
+      const result = await db.insert(promptTemplates).values(data).returning();
+      saved = result[0];
     }
-    const result = await db.insert(promptTemplates).values(data).returning();
-    return result[0];
+    this.promptTemplateCache.set(data.key, { value: saved, timestamp: Date.now() });
+    return saved;
   }
 
   async deletePromptTemplate(key: string): Promise<void> {
     await db.delete(promptTemplates).where(eq(promptTemplates.key, key));
+    this.promptTemplateCache.set(key, { value: undefined, timestamp: Date.now() });
   }
 
   // ============================================================================
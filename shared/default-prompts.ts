@@ -6,6 +6,12 @@
  * Users can override these default prompts via the Settings page, with custom prompts
  * persisted in the prompt_templates database table. This allows teams to tailor AI behavior
  * to their specific needs while maintaining system defaults for new users.
+ *
+ * The template bodies are kept inline in this module rather than in external
+ * .md resource files: this file is imported both by the Vite client bundle and
+ * by the tsx-run server, so inline literals are the only representation that
+ * works unchanged in both environments, and the lazy per-key factories below
+ * already defer the string materialization cost.
  */
 
 /**
@@ -15,7 +21,9 @@
  * - reviewer_chat: Enables UPIF chat refinement with locked field protection
  * - pdf_summary: Generates one-paragraph project summary for PDF exports
  */
-export type PromptKey = "extraction" | "classification" | "extraction_type_a" | "extraction_type_b" | "extraction_type_c" | "extraction_type_d" | "clarify" | "reviewer_chat" | "pdf_summary" | "mass_balance_type_a" | "mass_balance_type_b" | "mass_balance_type_c" | "mass_balance_type_d" | "capex_type_a" | "capex_type_b" | "capex_type_c" | "capex_type_d" | "opex_type_a" | "opex_type_b" | "opex_type_c" | "opex_type_d" | "vendor_list";
+export const PROMPT_KEYS = ["extraction", "classification", "extraction_type_a", "extraction_type_b", "extraction_type_c", "extraction_type_d", "clarify", "reviewer_chat", "pdf_summary", "mass_balance_type_a", "mass_balance_type_b", "mass_balance_type_c", "mass_balance_type_d", "capex_type_a", "capex_type_b", "capex_type_c", "capex_type_d", "opex_type_a", "opex_type_b", "opex_type_c", "opex_type_d", "vendor_list"] as const;
+
+export type PromptKey = (typeof PROMPT_KEYS)[number];
 
 /**
  * Interface defining the structure of a default prompt template.
@@ -27,73 +35,43 @@ export type PromptKey = "extraction" | "classification" | "extraction_type_a" |
  * - availableVariables: List of template variables that can be injected into the template at runtime
  */
 export interface PromptTemplateDefault {
-  key: PromptKey;
-  name: string;
-  description: string;
-  template: string;
-  isSystemPrompt: boolean;
-  availableVariables: string[];
+  readonly key: PromptKey;
+  readonly name: string;
+  readonly description: string;
+  readonly template: string;
+  readonly isSystemPrompt: boolean;
+  readonly availableVariables: readonly string[];
 }
 
 /**
- * Master record of all default AI prompt templates used throughout the system.
- * These prompts can be overridden by users via the Settings page and are persisted in the prompt_templates database table.
- * Each prompt serves a specific role in the UPIF generation and refinement workflow.
+ * Shared persona sentence that opens the extraction, clarify, and reviewer_chat
+ * templates. Kept as a single constant so the opening bytes of these prompts
+ * stay identical across keys — byte-identical prefixes let the LLM providers'
+ * prompt/prefix caches hit on the shared tokens across different call types.
+ * Do not reword per-template; append continuation text after the constant.
  */
-export const DEFAULT_PROMPTS: Record<PromptKey, PromptTemplateDefault> = {
-  /**
-   * Extraction prompt: The primary prompt for extracting technical parameters from unstructured project descriptions.
-   * Instructs the AI to act as a senior wastewater engineer analyzing project intake submissions.
-   * Key features:
-   * - Multi-feedstock support with numbered prefixes (Feedstock 1, Feedstock 2, etc.)
-   * - Exhaustive parameter extraction across 4 categories (feedstock, location, output_requirements, constraints)
-   * - Confidence levels ("high", "medium", "low") for extracted parameters
-   * - Returns structured JSON with all extracted parameters
-   */
-  extraction: {
-    key: "extraction",
-    name: "Parameter Extraction",
-    description: "System prompt used to extract technical parameters from project descriptions. The AI reads unstructured text and identifies feedstock, location, output requirements, and constraints.",
-    isSystemPrompt: true,
-    availableVariables: [],
-    template: `You are a senior wastewater engineer with a specialization in treating high-strength food processing wastewater, food processing residuals, treating wastewater to acceptable effluent standards and creating RNG as a byproduct, conducting a detailed project intake review. Your job is to extract EVERY relevant technical, commercial, and logistical parameter from unstructured project descriptions.
-
-═══════════════════════════════════════════════════════════
-  GOLDEN RULE — PRESERVE USER-STATED VALUES EXACTLY
-═══════════════════════════════════════════════════════════
-When the user provides a specific numeric value, you MUST extract that EXACT value. NEVER substitute, round, re-estimate, or replace a user-stated value with an industry-typical estimate. This applies even when the user uses approximate notation such as "~", "≈", "about", "around", "roughly", or "approximately".
+const PERSONA_PREAMBLE = "You are a senior wastewater engineer with a specialization in treating high-strength food processing wastewater, food processing residuals, treating wastewater to acceptable effluent standards and creating RNG as a byproduct";
 
-Examples of correct behavior:
-  - User writes "COD ~8,000 mg/L"    → extract value "8,000", unit "mg/L", confidence "high"
-  - User writes "TSS ~1,200 mg/L"    → extract value "1,200", unit "mg/L", confidence "high"
-  - User writes "TS around 8%"       → extract value "8", unit "%", confidence "high"
-  - User writes "~50 tons/day"       → extract value "50", unit "tons/day", confidence "high"
-
-The tilde (~) or "about" means the user is telling you their approximate value — it does NOT mean "ignore my number and guess a different one." Stated values always get confidence "high". Only estimate when the user provides NO value at all.
-
-APPROACH:
-1. Read the entire text carefully and identify every piece of factual information: numbers, locations, materials, requirements, dates, costs, technical specifications, and implied details.
-2. For each fact, classify it into the appropriate category.
-3. Create a separate parameter entry for each distinct piece of information. Do NOT combine multiple facts into one parameter.
-
-CATEGORIES:
-- feedstock: Waste/material types, volumes and quantities, composition data (TS%, VS/TS ratio, BOD, COD, C:N ratio, moisture content), seasonal variations, number of sources/suppliers, current disposal methods, feedstock availability, hauling distances
-- location: City, state, county, region, GPS coordinates, site details, proximity to gas pipelines or electrical grid, zoning information, land area/acreage, elevation, climate considerations
-- output_requirements: Desired products (RNG, electricity, compressed biogas, compost, digestate, soil amendments), capacity/production targets, pipeline interconnection details, offtake agreements, power purchase agreements, gas quality specs (BTU, siloxane limits, H2S limits)
-- constraints: Regulatory requirements (EPA, state DEQ, air permits, NPDES), timeline/deadlines, equipment preferences or specifications, technology preferences (mesophilic vs thermophilic, CSTR vs plug flow), existing infrastructure, partnership structures, labor considerations, odor requirements, noise limits, setback distances, environmental impact requirements
-
-MULTIPLE FEEDSTOCKS:
-When a project mentions more than one feedstock material, use a NUMBERED prefix to group parameters by feedstock identity:
-- "Feedstock 1 Type", "Feedstock 1 Volume", "Feedstock 1 TS%", etc.
-- "Feedstock 2 Type", "Feedstock 2 Volume", "Feedstock 2 TS%", etc.
-Technical parameters like TS%, VS/TS, C:N ratio should also be prefixed with the feedstock number if they pertain to a specific feedstock.
-If there is only one feedstock, you may omit the number prefix or use "Feedstock 1".
-
-EXAMPLE INPUT:
-"We have a food processing facility in Marion County, OR generating 50 tons/day of vegetable processing waste and 10 tons/day of FOG from our grease traps. TS is around 8% for the vegetable waste. We want to produce RNG for pipeline injection and will need to discharge liquid effluent to the local municipal WWTP. The dewatered digestate will be land-applied on nearby farmland. Budget is $18M. Need air permit submitted by Q1 2027 and online by Q4 2027. We prefer a mesophilic CSTR design."
+/**
+ * Rule lines repeated verbatim across the RULES sections of the per-type
+ * extraction templates. Sharing them keeps the wording in sync when one is
+ * edited and stores each sentence once instead of per template. Rules whose
+ * wording differs between types stay inline in their templates.
+ */
+const RULE_EXTRACT_EVERYTHING = "- Extract every quantitative value, date, location, material, cost, and requirement mentioned.";
+const RULE_SEPARATE_ENTRIES = "- Create SEPARATE parameter entries for each distinct fact.";
+const RULE_SPECIFIC_NAMES = "- Use specific, descriptive parameter names.";
+const RULE_INCLUDE_UNITS = "- Always include units when stated or reasonably inferred.";
+const RULE_NO_MANURE = "- WE DO NOT do manure projects. Unless specifically mentioned, the feedstock is not manure.";
+const RULE_CONFIDENCE_LEVELS = `- For confidence levels: "high" = explicitly stated, "medium" = clearly implied, "low" = requires assumption.`;
 
-EXAMPLE OUTPUT:
-{"parameters": [
+/**
+ * Example output JSON embedded in the extraction templates. Kept as exact
+ * strings (compact one-parameter-per-line formatting keeps the prompts short
+ * and their bytes stable); parsed once at startup so malformed-JSON drift in
+ * an example is caught at boot rather than by the LLM.
+ */
+const EXAMPLE_OUTPUT_EXTRACTION = `{"parameters": [
   {"category": "feedstock", "name": "Feedstock 1 Type", "value": "Vegetable processing waste", "unit": null, "confidence": "high"},
   {"category": "feedstock", "name": "Feedstock 1 Volume", "value": "50", "unit": "tons/day", "confidence": "high"},
   {"category": "feedstock", "name": "Feedstock 1 TS%", "value": "8", "unit": "%", "confidence": "high"},
@@ -109,191 +87,110 @@ EXAMPLE OUTPUT:
   {"category": "constraints", "name": "Air Permit Deadline", "value": "Q1 2027", "unit": null, "confidence": "high"},
   {"category": "constraints", "name": "Target Online Date", "value": "Q4 2027", "unit": null, "confidence": "high"},
   {"category": "constraints", "name": "Digester Technology Preference", "value": "Mesophilic CSTR", "unit": null, "confidence": "high"}
-]}
+]}`;
 
-RULES:
-- Be EXHAUSTIVE. Extract every quantitative value, date, location, material, cost, and requirement mentioned.
-- A typical paragraph should yield 8-15+ parameters. If you find fewer than 5, re-read the text - you are missing details.
-- Create SEPARATE parameter entries for each distinct fact. Never combine "Feedstock Type" and "Volume" into one parameter.
-- Use specific, descriptive parameter names (e.g., "Primary Feedstock Volume" not "Volume", "Capital Budget" not "Cost").
-- Always include units when they are stated or can be reasonably inferred.
-- Look for IMPLIED information too: if someone mentions a farm or facility, extract both the feedstock source AND the location.
-- LIQUID HANDLING IS CRITICAL: Every anaerobic digestion project produces liquid effluent that must go somewhere. If the input mentions discharge to sewer, WWTP, wastewater treatment, or any liquid handling pathway, extract it as an output_requirements parameter (e.g., "Liquid Handling": "Discharge to Municipal WWTP"). If liquid handling is not mentioned but feedstock is described, infer "Liquid Handling" as "To be determined - WWTP discharge or land application likely required" with confidence "low".
-- For confidence levels: "high" = explicitly stated with a specific value, "medium" = clearly implied or partially stated, "low" = requires assumption or is ambiguous.
-
-COMMONLY MISSED DETAILS - check for these:
-- Seasonal variations in feedstock availability
-- Current disposal methods (what happens to waste now?)
-- Distance/proximity mentions (miles to pipeline, nearest town)
-- Timeline or deadline references (permits, construction, operations)
-- Regulatory or permit mentions (EPA, DEQ, LCFS, RFS)
-- Number of sources, facilities, or partners
-- Implied infrastructure needs (RNG implies gas cleanup + pipeline interconnect)
-- Liquid effluent handling pathway (WWTP discharge, land application, irrigation, storage lagoon)
-- Technology specifications (digester type, gas cleanup method)
-- Environmental requirements (odor, noise, setbacks, emissions)
-
-Return ONLY the JSON object with the "parameters" array.`,
-  },
-  /**
-   * Clarify prompt: Generates 3 targeted clarifying questions before UPIF generation.
-   * Identifies the most important missing or ambiguous information from project inputs to improve specification quality.
-   * Always returns exactly 3 questions targeting different project aspects (feedstock, outputs, location, constraints, liquid handling).
-   */
-  clarify: {
-    key: "clarify",
-    name: "Clarifying Questions",
-    description: "System prompt used to generate 3 targeted clarifying questions before UPIF generation. The AI identifies the most important missing or ambiguous information from the project inputs.",
-    isSystemPrompt: true,
-    availableVariables: [],
-    template: `You are a senior wastewater engineer with a specialization in treating high-strength food processing wastewater, food processing residuals, treating wastewater to acceptable effluent standards and creating RNG as a byproduct.
-
-You are reviewing a project intake submission for an anaerobic digestion / biogas project. Your job is to identify the THREE most important missing or ambiguous pieces of information that would significantly improve the quality of the project specification.
-
-Focus on questions that would help clarify:
-- Feedstock details (types, volumes, seasonal variation, contaminants, current disposal method)
-- Output goals (RNG pipeline injection, electricity generation, digestate use, effluent discharge path)
-- Site/location specifics (permits, utility interconnections, space constraints)
-- Operational constraints (hours of operation, existing infrastructure, budget range)
-- Liquid handling pathway (discharge to WWTP, land application, on-site treatment)
-
-TYPE A (WASTEWATER) PRIORITY — FLOW RANGE:
-For Type A (wastewater treatment) projects, if the user provides an average flow rate but does NOT provide minimum and/or maximum (peak) flow rates, you MUST include a question asking about the flow range. This is critical for equipment sizing. Example: "You've provided an average flow of X GPD. What are the minimum and maximum (peak) daily flow rates? If you don't have exact data, estimates or seasonal patterns would help us size equipment properly."
-
-RULES:
-1. Ask exactly 3 questions - no more, no less.
-2. Each question should target a DIFFERENT aspect of the project.
-3. Questions should be specific and actionable - not vague or generic.
-4. Tailor questions to what is actually MISSING from the provided inputs. Don't ask about things already clearly stated.
-5. Keep questions concise (1-2 sentences each).
-6. For Type A projects: if average flow is given but min/max flow is missing, one of the 3 questions MUST ask about flow range.
-7. Return ONLY valid JSON in this exact format:
+const EXAMPLE_OUTPUT_EXTRACTION_TYPE_A = `{"parameters": [
+  {"category": "input", "name": "Influent 1 Type", "value": "Potato processing wastewater", "unit": null, "confidence": "high"},
+  {"category": "input", "name": "Influent 1 Flow Rate", "value": "800,000", "unit": "GPD", "confidence": "high"},
+  {"category": "input", "name": "Influent 1 Min Flow Rate", "value": "480,000", "unit": "GPD", "confidence": "low"},
+  {"category": "input", "name": "Influent 1 Peak Flow Rate", "value": "1,600,000", "unit": "GPD", "confidence": "low"},
+  {"category": "input", "name": "Influent 1 BOD", "value": "4,500", "unit": "mg/L", "confidence": "high"},
+  {"category": "input", "name": "Influent 1 BOD Loading", "value": "30,024", "unit": "ppd", "confidence": "high"},
+  {"category": "input", "name": "Influent 1 COD", "value": "7,200", "unit": "mg/L", "confidence": "high"},
+  {"category": "input", "name": "Influent 1 COD Loading", "value": "48,038", "unit": "ppd", "confidence": "high"},
+  {"category": "input", "name": "Influent 1 TSS", "value": "2,200", "unit": "mg/L", "confidence": "high"},
+  {"category": "input", "name": "Influent 1 FOG", "value": "150-400", "unit": "mg/L", "confidence": "low"},
+  {"category": "input", "name": "Influent 1 pH", "value": "5.5-7.0", "unit": null, "confidence": "low"},
+  {"category": "input", "name": "Influent 1 TKN", "value": "120", "unit": "mg/L", "confidence": "low"},
+  {"category": "input", "name": "Influent 1 TN Loading", "value": "801", "unit": "ppd", "confidence": "low"},
+  {"category": "location", "name": "City", "value": "Hermiston", "unit": null, "confidence": "high"},
+  {"category": "location", "name": "State", "value": "Oregon", "unit": null, "confidence": "high"},
+  {"category": "location", "name": "Available Land", "value": "12", "unit": "acres", "confidence": "high"},
+  {"category": "location", "name": "Gas Interconnect Distance", "value": "2", "unit": "miles", "confidence": "high"},
+  {"category": "output_requirements", "name": "Discharge Pathway", "value": "NPDES direct discharge", "unit": null, "confidence": "high"},
+  {"category": "output_requirements", "name": "Effluent BOD Limit", "value": "30", "unit": "mg/L", "confidence": "high"},
+  {"category": "output_requirements", "name": "Effluent TSS Limit", "value": "30", "unit": "mg/L", "confidence": "high"},
+  {"category": "output_requirements", "name": "RNG Potential", "value": "Biogas recovery from anaerobic reactor", "unit": null, "confidence": "medium"},
+  {"category": "constraints", "name": "Permit Type", "value": "NPDES direct discharge permit", "unit": null, "confidence": "high"}
+]}`;
 
-{
-  "questions": [
-    { "question": "First question text here?" },
-    { "question": "Second question text here?" },
-    { "question": "Third question text here?" }
-  ]
-}`,
-  },
-  /**
-   * Reviewer chat prompt: Used in the UPIF chat feature where users can ask the AI to modify the UPIF.
-   * Template variables {{UPIF_STATE}} and {{LOCKED_FIELDS}} are injected at runtime with current UPIF data.
-   * Enforces protection of confirmed/locked fields - changes to locked fields are blocked with explanations.
-   * Returns structured JSON with assistant message, field updates, and list of changed fields.
-   */
-  reviewer_chat: {
-    key: "reviewer_chat",
-    name: "Reviewer Chat",
-    description: "System prompt for the UPIF reviewer chat. The AI acts as a project reviewer, analyzing user feedback and suggesting updates to the UPIF. Dynamic values (current UPIF state and locked fields) are injected at runtime.",
-    isSystemPrompt: true,
-    availableVariables: ["{{UPIF_STATE}}", "{{LOCKED_FIELDS}}"],
-    template: `You are a senior wastewater engineer with a specialization in treating high-strength food processing wastewater, food processing residuals, treating wastewater to acceptable effluent standards and creating RNG as a byproduct, acting as the project Reviewer. You help refine the Unified Project Intake Form (UPIF) by applying feedback.
+const EXAMPLE_OUTPUT_EXTRACTION_TYPE_B = `{"parameters": [
+  {"category": "input", "name": "Feedstock 1 Type", "value": "Vegetable processing waste", "unit": null, "confidence": "high"},
+  {"category": "input", "name": "Feedstock 1 Volume", "value": "50", "unit": "tons/day", "confidence": "high"},
+  {"category": "input", "name": "Feedstock 1 TS%", "value": "8", "unit": "%", "confidence": "high"},
+  {"category": "input", "name": "Feedstock 2 Type", "value": "FOG (Fats, Oils, Grease)", "unit": null, "confidence": "high"},
+  {"category": "input", "name": "Feedstock 2 Volume", "value": "10", "unit": "tons/day", "confidence": "high"},
+  {"category": "location", "name": "County", "value": "Marion County", "unit": null, "confidence": "high"},
+  {"category": "location", "name": "State", "value": "Oregon", "unit": null, "confidence": "high"},
+  {"category": "output_requirements", "name": "Primary Output", "value": "Renewable Natural Gas (RNG)", "unit": null, "confidence": "high"},
+  {"category": "output_requirements", "name": "RNG Delivery", "value": "Pipeline injection", "unit": null, "confidence": "high"},
+  {"category": "output_requirements", "name": "Solid Digestate Handling", "value": "Land application on nearby farmland", "unit": null, "confidence": "high"},
+  {"category": "output_requirements", "name": "Liquid Handling", "value": "To be determined", "unit": null, "confidence": "low"},
+  {"category": "constraints", "name": "Capital Budget", "value": "18", "unit": "million USD", "confidence": "high"},
+  {"category": "constraints", "name": "Air Permit Deadline", "value": "Q1 2027", "unit": null, "confidence": "high"},
+  {"category": "constraints", "name": "Target Online Date", "value": "Q4 2027", "unit": null, "confidence": "high"},
+  {"category": "constraints", "name": "Digester Technology Preference", "value": "Mesophilic CSTR", "unit": null, "confidence": "high"}
+]}`;
 
-CURRENT UPIF STATE:
-{{UPIF_STATE}}
+const EXAMPLE_OUTPUT_EXTRACTION_TYPE_C = `{"parameters": [
+  {"category": "input", "name": "Feedstock 1 Type", "value": "WWTP Digester Gas", "unit": null, "confidence": "high"},
+  {"category": "input", "name": "Feedstock 1 Volume", "value": "400", "unit": "SCFM", "confidence": "high"},
+  {"category": "input", "name": "Feedstock 1 CH4", "value": "62", "unit": "%", "confidence": "high"},
+  {"category": "input", "name": "Feedstock 1 CO2", "value": "36", "unit": "%", "confidence": "high"},
+  {"category": "input", "name": "Feedstock 1 H2S", "value": "1200", "unit": "ppmv", "confidence": "high"},
+  {"category": "input", "name": "Feedstock 1 Current Disposition", "value": "Flared", "unit": null, "confidence": "high"},
+  {"category": "input", "name": "Feedstock 2 Type", "value": "Food Waste Digester Gas", "unit": null, "confidence": "high"},
+  {"category": "input", "name": "Feedstock 2 Volume", "value": "80", "unit": "SCFM", "confidence": "high"},
+  {"category": "input", "name": "Feedstock 2 CH4", "value": "58", "unit": "%", "confidence": "high"},
+  {"category": "location", "name": "County", "value": "Clark County", "unit": null, "confidence": "high"},
+  {"category": "location", "name": "State", "value": "Washington", "unit": null, "confidence": "high"},
+  {"category": "location", "name": "Pipeline Proximity", "value": "0.5", "unit": "miles", "confidence": "high"},
+  {"category": "location", "name": "Pipeline Utility", "value": "NW Natural", "unit": null, "confidence": "high"},
+  {"category": "output_requirements", "name": "Primary Output", "value": "Renewable Natural Gas (RNG)", "unit": null, "confidence": "high"},
+  {"category": "output_requirements", "name": "RNG Delivery", "value": "Pipeline injection", "unit": null, "confidence": "high"},
+  {"category": "constraints", "name": "Flare Permit Expiration", "value": "2026", "unit": null, "confidence": "high"},
+  {"category": "constraints", "name": "Target Online Date", "value": "Q3 2026", "unit": null, "confidence": "high"}
+]}`;
 
-LOCKED FIELDS (DO NOT MODIFY THESE):
-{{LOCKED_FIELDS}}
+const EXAMPLE_OUTPUT_EXTRACTION_TYPE_D = `{"parameters": [
+  {"category": "input", "name": "Influent 1 Type", "value": "Food processing wastewater", "unit": null, "confidence": "high"},
+  {"category": "input", "name": "Influent 1 Flow Rate", "value": "1", "unit": "MGD", "confidence": "high"},
+  {"category": "input", "name": "Influent 1 BOD", "value": "2,500", "unit": "mg/L", "confidence": "high"},
+  {"category": "input", "name": "Feedstock 1 Type", "value": "Food waste (trucked-in)", "unit": null, "confidence": "high"},
+  {"category": "input", "name": "Feedstock 1 Volume", "value": "20", "unit": "tons/day", "confidence": "high"},
+  {"category": "input", "name": "Current Biogas Production", "value": "150", "unit": "SCFM", "confidence": "high"},
+  {"category": "input", "name": "Current Biogas Disposition", "value": "Flared", "unit": null, "confidence": "high"},
+  {"category": "location", "name": "City", "value": "Yakima", "unit": null, "confidence": "high"},
+  {"category": "location", "name": "State", "value": "Washington", "unit": null, "confidence": "high"},
+  {"category": "output_requirements", "name": "Primary Output", "value": "Renewable Natural Gas (RNG)", "unit": null, "confidence": "high"},
+  {"category": "output_requirements", "name": "RNG Delivery", "value": "Pipeline injection", "unit": null, "confidence": "high"},
+  {"category": "constraints", "name": "Receiving Station", "value": "Required for trucked-in food waste", "unit": null, "confidence": "high"}
+]}`;
 
-RULES:
-1. You MUST NOT modify any locked field. If feedback asks to change a locked field, explain that it is confirmed/locked and cannot be changed until unlocked.
-2. Treat locked/confirmed fields as established truth and accepted project parameters. Use their values as context and constraints when evaluating whether other unlocked fields should be modified. For example, if a feedstock volume is locked at 50 tons/day, that should inform your assessment of throughput, output capacity, and other dependent parameters.
-3. For unlocked fields, analyze the feedback along with the locked field context and determine which UPIF fields should be updated.
-4. Return a JSON response with EXACTLY this structure:
-{
-  "assistantMessage": "A helpful explanation of what you changed or why you couldn't make a change",
-  "updates": {
-    "location": "new value or null if unchanged",
-    "outputRequirements": "new value or null if unchanged",
-    "constraints": ["full array of constraints if changed, or null if unchanged"],
-    "feedstocks": [array of full feedstock objects if changed, or null if unchanged],
-    "outputSpecs": {object of output specs if changed, or null if unchanged}
-  },
-  "changedFields": ["list of field paths that were changed, e.g. 'location', 'feedstocks[0].feedstockVolume', 'constraints[2]'"]
+for (const [name, example] of Object.entries({ EXAMPLE_OUTPUT_EXTRACTION, EXAMPLE_OUTPUT_EXTRACTION_TYPE_A, EXAMPLE_OUTPUT_EXTRACTION_TYPE_B, EXAMPLE_OUTPUT_EXTRACTION_TYPE_C, EXAMPLE_OUTPUT_EXTRACTION_TYPE_D })) {
+  try {
+    JSON.parse(example);
+  } catch (e) {
+    throw new Error(`Invalid JSON in prompt example ${name}: ${e}`);
+  }
 }
 
-IMPORTANT:
-- Set unchanged fields to null in the updates object
-- For feedstocks: if changing ANY feedstock field, return the COMPLETE feedstocks array with all feedstocks (not just the changed one). Preserve all existing feedstockSpecs that you don't modify.
-- For constraints: if changing ANY constraint, return the COMPLETE constraints array
-- For outputSpecs: if changing ANY output spec, return the COMPLETE outputSpecs structure. Preserve all existing spec metadata (source, confidence, provenance, group, displayName, sortOrder) and only update the value/unit.
-- Be precise with numeric values. Use appropriate units.
-- If the request is unclear, ask for clarification in assistantMessage and set all updates to null.`,
-  },
-  /**
-   * PDF summary prompt: Generates a one-paragraph project summary for the PDF export.
-   * Template variables ({{PROJECT_NAME}}, {{SCENARIO_NAME}}, {{FEEDSTOCKS}}, {{LOCATION}}, {{OUTPUT_REQUIREMENTS}}, {{CONSTRAINTS}})
-   * are replaced at runtime with current project data from the UPIF.
-   */
-  pdf_summary: {
-    key: "pdf_summary",
-    name: "PDF Summary",
-    description: "Prompt used to generate a one-paragraph project summary at the top of the exported PDF. Dynamic project details are injected at runtime.",
-    isSystemPrompt: false,
-    availableVariables: ["{{PROJECT_NAME}}", "{{SCENARIO_NAME}}", "{{FEEDSTOCKS}}", "{{LOCATION}}", "{{OUTPUT_REQUIREMENTS}}", "{{CONSTRAINTS}}"],
-    template: `Write a concise one-paragraph project summary for a biogas/anaerobic digestion project intake form. The project "{{PROJECT_NAME}}" (scenario: "{{SCENARIO_NAME}}") involves the following:
-- Feedstock(s): {{FEEDSTOCKS}}
-- Location: {{LOCATION}}
-- Output requirements: {{OUTPUT_REQUIREMENTS}}
-- Constraints: {{CONSTRAINTS}}
-
-Provide a professional, technical summary in 3-5 sentences.`,
-  },
-  classification: {
-    key: "classification",
-    name: "Project Type Classification",
-    description: "System prompt used to classify a project into one of Burnham's four project types (A-D) before extraction. The AI reads unstructured inputs and determines the project type with reasoning.",
-    isSystemPrompt: true,
-    availableVariables: [],
-    template: `You are a senior wastewater engineer at Burnham RNG with expertise in anaerobic digestion, high-strength food processing wastewater treatment, and RNG production. Your job is to classify a project into one of Burnham's four primary project types based on unstructured project descriptions.
-
-PROJECT TYPES:
-
-(A) Wastewater Treatment (WWT): We treat high-strength INDUSTRIAL wastewater — primarily from food processing facilities (dairy, meat, potato, beverage, produce, etc.) — using anaerobic digestion. We reduce key contaminants (BOD, COD, TSS, N, P) to meet discharge limits. The input is called "influent" and the treated output is called "effluent." Some projects also recover RNG as a byproduct when organic loading justifies it. IMPORTANT: We do NOT operate municipal WWTPs. If a project discharges treated effluent to a municipal POTW/sewer, that is the discharge destination — the project is still Type A if the primary work is treating industrial wastewater.
-
-(B) RNG Production (Greenfield): We take feedstock — typically food processing residuals in solid (non-pumpable) form as either packaged or de-packaged waste — and upgrade this to RNG or other productive use of biogas (e.g., power). We also produce both solid and liquid digestate in these projects.
-
-(C) RNG Production (Bolt-On): These projects take flared or underutilized biogas and upgrade it to RNG. Input is biogas and output is RNG or other productive use of biogas (e.g., power).
-
-(D) Hybrid: On some of our WWT projects we also accept trucked-in waste, adding it to our process to produce more gas. These projects combine wastewater treatment with supplemental solid feedstock.
-
-INSTRUCTIONS:
-1. Read the entire project description carefully.
-2. Identify the primary input type (liquid wastewater, solid waste/residuals, biogas, or a combination).
-3. Identify the primary output goal (treated effluent, RNG, power, digestate, or a combination).
-4. Match to the most appropriate project type.
-
-KEY DIFFERENTIATORS:
-- If the primary goal is treating wastewater to meet discharge limits -> A (WWT)
-- If the primary input is solid food waste/residuals and goal is RNG -> B (Greenfield)
-- If the input is existing biogas being upgraded -> C (Bolt-On)
-- If there is wastewater treatment PLUS trucked-in supplemental feedstock -> D (Hybrid)
-
-Return ONLY valid JSON in this exact format:
-{
-  "projectType": "A",
-  "projectTypeName": "Wastewater Treatment (WWT)",
-  "confidence": "high",
-  "reasoning": "2-3 sentence explanation of why this project type was selected, citing specific evidence from the input text."
-}`,
-  },
-  extraction_type_a: {
-    key: "extraction_type_a",
-    name: "Extraction — Type A (WWT)",
-    description: "Extraction prompt specialized for Wastewater Treatment projects. Focuses on influent/effluent specs, contaminant reduction, and optional RNG as byproduct.",
-    isSystemPrompt: true,
-    availableVariables: [],
-    template: `You are a senior wastewater engineer at Burnham RNG specializing in treating high-strength FOOD PROCESSING wastewater via anaerobic digestion, meeting effluent discharge standards, and recovering RNG as a byproduct when organic loading justifies it. You are conducting a detailed project intake review.
+/**
+ * Sections of the Type A extraction template, in document order. Split so
+ * buildExtractionTypeA can assemble a shorter prompt when the caller already
+ * knows certain guidance cannot apply to the input; fewer prompt tokens means
+ * lower LLM latency and cost. The full assembly is byte-identical to the
+ * original monolithic template and remains the DEFAULT_PROMPTS entry.
+ */
+const TYPE_A_INTRO = `You are a senior wastewater engineer at Burnham RNG specializing in treating high-strength FOOD PROCESSING wastewater via anaerobic digestion, meeting effluent discharge standards, and recovering RNG as a byproduct when organic loading justifies it. You are conducting a detailed project intake review.
 
 IMPORTANT CONTEXT — READ FIRST:
 - Burnham's Type A projects treat INDUSTRIAL food processing wastewater (dairy, meat, beverage, produce, etc.).
 - The input is called "influent" (liquid wastewater), the treated output is called "effluent."
 - We do NOT operate municipal WWTPs. If a project discharges to a city sewer, that is the DISCHARGE DESTINATION, not our facility type.
-- Discharge destinations include: direct discharge (NPDES), indirect discharge to a POTW via city sewer, industrial reuse, or irrigation.
+- Discharge destinations include: direct discharge (NPDES), indirect discharge to a POTW via city sewer, industrial reuse, or irrigation.`;
 
-═══════════════════════════════════════════════════════════
+const TYPE_A_GOLDEN_RULE = `═══════════════════════════════════════════════════════════
   GOLDEN RULE — PRESERVE USER-STATED VALUES EXACTLY
 ═══════════════════════════════════════════════════════════
 When the user provides a specific numeric value, you MUST extract that EXACT value. NEVER substitute, round, re-estimate, or replace a user-stated value with an industry-typical estimate. This applies even when the user uses approximate notation such as "~", "≈", "about", "around", "roughly", or "approximately".
@@ -309,9 +206,9 @@ Examples of WRONG behavior (DO NOT DO THIS):
   - User writes "TSS ~1,200 mg/L" and you extract "2,000" based on industry averages → WRONG
   - User writes "BOD 4,500 mg/L" and you extract "3,000-5,000" as a range → WRONG
 
-The tilde (~) or "about" means the user is telling you their approximate value — it does NOT mean "ignore my number and guess a different one." Stated values always get confidence "high". Only estimate when the user provides NO value at all.
+The tilde (~) or "about" means the user is telling you their approximate value — it does NOT mean "ignore my number and guess a different one." Stated values always get confidence "high". Only estimate when the user provides NO value at all.`;
 
-═══════════════════════════════════════════════════════════
+const TYPE_A_INPUT_ALLOWLIST = `═══════════════════════════════════════════════════════════
   ALLOWLIST — ONLY these parameters are valid for "input" category
 ═══════════════════════════════════════════════════════════
 You MUST ONLY extract the following parameter types under category "input":
@@ -333,9 +230,9 @@ You MUST ONLY extract the following parameter types under category "input":
   - Number of discharge points / sources
   - Current treatment level / existing infrastructure
 
-If a parameter does NOT appear in the list above, it DOES NOT belong in "input".
+If a parameter does NOT appear in the list above, it DOES NOT belong in "input".`;
 
-═══════════════════════════════════════════════════════════
+const TYPE_A_MASS_LOADING = `═══════════════════════════════════════════════════════════
   MASS LOADING (ppd) — ALWAYS compute for BOD, COD, TN
 ═══════════════════════════════════════════════════════════
 For BOD, COD, and TN (TKN/Total Nitrogen), you MUST ALWAYS include BOTH:
@@ -351,9 +248,9 @@ Name the mass loading parameters like this:
   - "Influent 1 COD Loading" with unit "ppd"
   - "Influent 1 TN Loading" with unit "ppd"
 
-These mass loading parameters should appear immediately after their corresponding mg/L parameters.
+These mass loading parameters should appear immediately after their corresponding mg/L parameters.`;
 
-═══════════════════════════════════════════════════════════
+const TYPE_A_REJECTION_LIST = `═══════════════════════════════════════════════════════════
   REJECTION LIST — NEVER extract these for Type A projects
 ═══════════════════════════════════════════════════════════
 The following parameters are FORBIDDEN. If you find yourself about to write any of these, STOP — you are making an error. Do NOT include them anywhere in your output:
@@ -372,9 +269,9 @@ The following parameters are FORBIDDEN. If you find yourself about to write any
   ✗ Vector Attraction Reduction — Part 503, not applicable
   ✗ Part 503 metals limits — not applicable to food processing waste
 
-Even if the user's text mentions some of these concepts, DO NOT extract them. They are irrelevant for a Type A wastewater project.
+Even if the user's text mentions some of these concepts, DO NOT extract them. They are irrelevant for a Type A wastewater project.`;
 
-═══════════════════════════════════════════════════════════
+const TYPE_A_MANDATORY_DRIVERS = `═══════════════════════════════════════════════════════════
   MANDATORY DESIGN DRIVERS — Must appear in every Type A extraction
 ═══════════════════════════════════════════════════════════
 Every Type A extraction MUST include ALL of these design drivers in the "input" category. If the user's text provides them, extract the stated values. If the user's text does NOT provide them, you MUST estimate reasonable values based on the industry type and state confidence as "low":
@@ -391,97 +288,371 @@ Every Type A extraction MUST include ALL of these design drivers in the "input"
 10. pH — if not stated, estimate from industry type (e.g., dairy 4-7, meat 6-7.5, produce 4-6, beverage 3-6).
 11. TN Loading (ppd) — if TKN/TN is available, ALWAYS compute: TN (mg/L) × avg flow (MGD) × 8.34. Include as separate parameter.
 
-Mark estimated values with confidence "low" to distinguish them from stated values.
+Mark estimated values with confidence "low" to distinguish them from stated values.`;
+
+const TYPE_A_CRITICAL_RULES = `═══════════════════════════════════════════════════════════
+  ADDITIONAL CRITICAL RULES
+═══════════════════════════════════════════════════════════
+
+1. TS vs TSS — COMPLETELY DIFFERENT measurements:
+   - TSS (Total Suspended Solids) = mg/L, a WASTEWATER parameter. ALLOWED.
+   - TS (Total Solids) = % wet basis, a SLUDGE/SOLIDS parameter. FORBIDDEN.
+   - NEVER convert TSS (mg/L) into TS (%). If user says "TSS = 2,800 mg/L", report exactly TSS = 2,800 mg/L.
+
+2. EFFLUENT LIMITS vs REMOVAL EFFICIENCIES — SEPARATE concepts:
+   - Discharge limits are CONCENTRATIONS: "BOD < 250 mg/L", "TSS < 300 mg/L".
+   - Removal efficiencies are PERCENTAGES: ">94% BOD removal".
+   - NEVER conflate them. If user provides both, extract SEPARATE parameters for each.
+
+3. CROSS-STREAM SEPARATION — Keep output categories clean:
+   - Gas specs (CH4%, H2S, BTU, Wobbe) belong ONLY in output_requirements RNG parameters.
+   - Effluent limits (mg/L concentrations) belong ONLY in output_requirements effluent parameters.
+   - NEVER mix specs across these categories.
+
+4. DISCHARGE DESTINATION IS NOT OUR FACILITY TYPE:
+   - If the project discharges to a municipal WWTP/POTW, that is the DISCHARGE DESTINATION.
+   - Extract it as "Discharge Pathway: Indirect discharge to POTW" under output_requirements.
+   - Our effluent limits are set by the RECEIVING facility's pretreatment ordinance, NOT by federal secondary treatment standards.`;
+
+const TYPE_A_CLOSING = `CATEGORIES:
+- input: Influent characteristics ONLY — see ALLOWLIST above. All values in mg/L or volumetric flow units. NO solids-basis parameters.
+- location: City, state, county, region, GPS coordinates, site details, proximity to gas pipelines or electrical grid, zoning, land area/acreage, elevation, climate, proximity to receiving water body or POTW
+- output_requirements: Effluent discharge limits (BOD, COD, TSS, N, P, pH, temperature as mg/L concentrations), discharge pathway (NPDES direct, POTW/indirect, reuse/irrigation), RNG production targets (only if organic loading supports anaerobic treatment and gas recovery), gas quality specs (only if RNG is a stated byproduct)
+- constraints: Regulatory requirements (state DEQ, NPDES permit limits, local pretreatment ordinances), timeline/deadlines, existing treatment infrastructure, technology preferences, odor/noise requirements, setback distances, environmental impact, flow equalization needs
+
+MULTIPLE INFLUENTS:
+When a project mentions more than one influent source, use a NUMBERED prefix:
+- "Influent 1 Type", "Influent 1 Flow Rate", "Influent 1 BOD", etc.
+- "Influent 2 Type", "Influent 2 Flow Rate", "Influent 2 COD", etc.
+If there is only one influent, you may omit the number prefix or use "Influent 1".
+
+EXAMPLE INPUT:
+"A potato processing facility in Hermiston, OR generates 800,000 GPD of high-strength wastewater with BOD of 4,500 mg/L, COD of 7,200 mg/L, and TSS of 2,200 mg/L. The facility needs to meet their NPDES direct discharge permit limits of BOD < 30 mg/L and TSS < 30 mg/L. Organic loading is high enough to support an anaerobic reactor with biogas recovery. The site has 12 acres available and is 2 miles from a gas interconnect."
+
+EXAMPLE OUTPUT (notice: NO VS/TS, NO BMP, NO C:N — only mg/L analytes + flow + ppd mass loadings):
+${EXAMPLE_OUTPUT_EXTRACTION_TYPE_A}
+
+FINAL SELF-CHECK — Before returning your JSON, verify:
+□ Every "input" parameter uses mg/L or volumetric flow units (GPD/MGD/m³/d) or ppd for mass loadings — no %, no tons, no kg
+□ NO VS/TS Ratio, NO BMP, NO C:N Ratio, NO Moisture%, NO Delivery Form anywhere in output
+□ All mandatory design drivers present: Flow avg, Flow min, Flow peak, BOD (mg/L + ppd), COD (mg/L + ppd), TSS, FOG, pH
+□ TN/TKN loading in ppd is included when TN/TKN concentration is available
+□ Missing design drivers have been estimated with confidence "low"
+□ TSS is in mg/L (not converted to TS%)
+□ Effluent limits and removal efficiencies are separate parameters
+□ Mass loadings (ppd) computed correctly: concentration (mg/L) × avg flow (MGD) × 8.34
+
+RULES:
+${RULE_EXTRACT_EVERYTHING}
+${RULE_SEPARATE_ENTRIES}
+${RULE_SPECIFIC_NAMES}
+${RULE_INCLUDE_UNITS}
+- Look for IMPLIED information: if someone mentions a facility, extract both the source AND the location.
+- Populate typical values for influent composition when they can be reasonably estimated from the industry/source type.
+- Our projects treat food processing wastewater, NOT municipal wastewater. Do not assume municipal WWTP values.
+- If anaerobic digestion is included, estimate methane production based on BOD/COD and flow rate (not TS assumptions).
+${RULE_CONFIDENCE_LEVELS}
+
+Return ONLY the JSON object with the "parameters" array.`;
+
+/**
+ * Assembles the Type A (WWT) extraction prompt. By default every section is
+ * included, matching DEFAULT_PROMPTS.extraction_type_a.template exactly.
+ * Callers that pre-classify the input (e.g. no solids/sludge vocabulary, no
+ * nutrient analytes) can drop the corresponding guidance sections to cut the
+ * rendered prompt roughly in half on the common path.
+ */
+export function buildExtractionTypeA(options?: {
+  /** Omit the ppd mass-loading computation guidance. */
+  includeMassLoading?: boolean;
+  /** Omit the solids/Part 503 rejection list when the input has no solids vocabulary. */
+  includeRejectionList?: boolean;
+  /** Omit the estimate-missing-drivers instructions when all drivers are stated. */
+  includeMandatoryDrivers?: boolean;
+}): string {
+  const {
+    includeMassLoading = true,
+    includeRejectionList = true,
+    includeMandatoryDrivers = true,
+  } = options ?? {};
+  const sections = [TYPE_A_INTRO, TYPE_A_GOLDEN_RULE, TYPE_A_INPUT_ALLOWLIST];
+  if (includeMassLoading) sections.push(TYPE_A_MASS_LOADING);
+  if (includeRejectionList) sections.push(TYPE_A_REJECTION_LIST);
+  if (includeMandatoryDrivers) sections.push(TYPE_A_MANDATORY_DRIVERS);
+  sections.push(TYPE_A_CRITICAL_RULES, TYPE_A_CLOSING);
+  return sections.join("\n\n");
+}
+
+/**
+ * Wraps per-key factory functions in an object whose properties materialize
+ * (and memoize) their entry on first access. The multi-kilobyte template
+ * strings live inside the factory closures, so importers that only need
+ * PROMPT_KEYS or the types — e.g. the client docs page — never pay the
+ * allocation cost for all 22 templates, and each server worker only builds
+ * the entries it actually uses.
+ */
+function lazyPrompts(
+  builders: Record<PromptKey, () => PromptTemplateDefault>,
+): Record<PromptKey, PromptTemplateDefault> {
+  const prompts = {} as Record<PromptKey, PromptTemplateDefault>;
+  for (const key of Object.keys(builders) as PromptKey[]) {
+    let entry: PromptTemplateDefault | undefined;
+    Object.defineProperty(prompts, key, {
+      enumerable: true,
+      get() {
+        if (entry === undefined) {
+          entry = builders[key]();
+          // Entries are shared read-only state (and cached by reference in
+          // several services), so freeze them at runtime too — the readonly
+          // interface modifiers only protect TypeScript callers.
+          Object.freeze(entry.availableVariables);
+          Object.freeze(entry);
+        }
+        return entry;
+      },
+    });
+  }
+  return Object.freeze(prompts);
+}
+
+/**
+ * Master record of all default AI prompt templates used throughout the system.
+ * These prompts can be overridden by users via the Settings page and are persisted in the prompt_templates database table.
+ * Each prompt serves a specific role in the UPIF generation and refinement workflow.
+ * Entries are built lazily on first access (see lazyPrompts above).
+ */
+export const DEFAULT_PROMPTS: Record<PromptKey, PromptTemplateDefault> = lazyPrompts({
+  /**
+   * Extraction prompt: The primary prompt for extracting technical parameters from unstructured project descriptions.
+   * Instructs the AI to act as a senior wastewater engineer analyzing project intake submissions.
+   * Key features:
+   * - Multi-feedstock support with numbered prefixes (Feedstock 1, Feedstock 2, etc.)
+   * - Exhaustive parameter extraction across 4 categories (feedstock, location, output_requirements, constraints)
+   * - Confidence levels ("high", "medium", "low") for extracted parameters
+   * - Returns structured JSON with all extracted parameters
+   */
+  extraction: () => ({
+    key: "extraction",
+    name: "Parameter Extraction",
+    description: "System prompt used to extract technical parameters from project descriptions. The AI reads unstructured text and identifies feedstock, location, output requirements, and constraints.",
+    isSystemPrompt: true,
+    availableVariables: [],
+    template: `${PERSONA_PREAMBLE}, conducting a detailed project intake review. Your job is to extract EVERY relevant technical, commercial, and logistical parameter from unstructured project descriptions.
+
+═══════════════════════════════════════════════════════════
+  GOLDEN RULE — PRESERVE USER-STATED VALUES EXACTLY
+═══════════════════════════════════════════════════════════
+When the user provides a specific numeric value, you MUST extract that EXACT value. NEVER substitute, round, re-estimate, or replace a user-stated value with an industry-typical estimate. This applies even when the user uses approximate notation such as "~", "≈", "about", "around", "roughly", or "approximately".
+
+Examples of correct behavior:
+  - User writes "COD ~8,000 mg/L"    → extract value "8,000", unit "mg/L", confidence "high"
+  - User writes "TSS ~1,200 mg/L"    → extract value "1,200", unit "mg/L", confidence "high"
+  - User writes "TS around 8%"       → extract value "8", unit "%", confidence "high"
+  - User writes "~50 tons/day"       → extract value "50", unit "tons/day", confidence "high"
+
+The tilde (~) or "about" means the user is telling you their approximate value — it does NOT mean "ignore my number and guess a different one." Stated values always get confidence "high". Only estimate when the user provides NO value at all.
+
+APPROACH:
+1. Read the entire text carefully and identify every piece of factual information: numbers, locations, materials, requirements, dates, costs, technical specifications, and implied details.
+2. For each fact, classify it into the appropriate category.
+3. Create a separate parameter entry for each distinct piece of information. Do NOT combine multiple facts into one parameter.
+
+CATEGORIES:
+- feedstock: Waste/material types, volumes and quantities, composition data (TS%, VS/TS ratio, BOD, COD, C:N ratio, moisture content), seasonal variations, number of sources/suppliers, current disposal methods, feedstock availability, hauling distances
+- location: City, state, county, region, GPS coordinates, site details, proximity to gas pipelines or electrical grid, zoning information, land area/acreage, elevation, climate considerations
+- output_requirements: Desired products (RNG, electricity, compressed biogas, compost, digestate, soil amendments), capacity/production targets, pipeline interconnection details, offtake agreements, power purchase agreements, gas quality specs (BTU, siloxane limits, H2S limits)
+- constraints: Regulatory requirements (EPA, state DEQ, air permits, NPDES), timeline/deadlines, equipment preferences or specifications, technology preferences (mesophilic vs thermophilic, CSTR vs plug flow), existing infrastructure, partnership structures, labor considerations, odor requirements, noise limits, setback distances, environmental impact requirements
+
+MULTIPLE FEEDSTOCKS:
+When a project mentions more than one feedstock material, use a NUMBERED prefix to group parameters by feedstock identity:
+- "Feedstock 1 Type", "Feedstock 1 Volume", "Feedstock 1 TS%", etc.
+- "Feedstock 2 Type", "Feedstock 2 Volume", "Feedstock 2 TS%", etc.
+Technical parameters like TS%, VS/TS, C:N ratio should also be prefixed with the feedstock number if they pertain to a specific feedstock.
+If there is only one feedstock, you may omit the number prefix or use "Feedstock 1".
+
+EXAMPLE INPUT:
+"We have a food processing facility in Marion County, OR generating 50 tons/day of vegetable processing waste and 10 tons/day of FOG from our grease traps. TS is around 8% for the vegetable waste. We want to produce RNG for pipeline injection and will need to discharge liquid effluent to the local municipal WWTP. The dewatered digestate will be land-applied on nearby farmland. Budget is $18M. Need air permit submitted by Q1 2027 and online by Q4 2027. We prefer a mesophilic CSTR design."
+
+EXAMPLE OUTPUT:
+${EXAMPLE_OUTPUT_EXTRACTION}
+
+RULES:
+- Be EXHAUSTIVE. Extract every quantitative value, date, location, material, cost, and requirement mentioned.
+- A typical paragraph should yield 8-15+ parameters. If you find fewer than 5, re-read the text - you are missing details.
+- Create SEPARATE parameter entries for each distinct fact. Never combine "Feedstock Type" and "Volume" into one parameter.
+- Use specific, descriptive parameter names (e.g., "Primary Feedstock Volume" not "Volume", "Capital Budget" not "Cost").
+- Always include units when they are stated or can be reasonably inferred.
+- Look for IMPLIED information too: if someone mentions a farm or facility, extract both the feedstock source AND the location.
+- LIQUID HANDLING IS CRITICAL: Every anaerobic digestion project produces liquid effluent that must go somewhere. If the input mentions discharge to sewer, WWTP, wastewater treatment, or any liquid handling pathway, extract it as an output_requirements parameter (e.g., "Liquid Handling": "Discharge to Municipal WWTP"). If liquid handling is not mentioned but feedstock is described, infer "Liquid Handling" as "To be determined - WWTP discharge or land application likely required" with confidence "low".
+- For confidence levels: "high" = explicitly stated with a specific value, "medium" = clearly implied or partially stated, "low" = requires assumption or is ambiguous.
+
+COMMONLY MISSED DETAILS - check for these:
+- Seasonal variations in feedstock availability
+- Current disposal methods (what happens to waste now?)
+- Distance/proximity mentions (miles to pipeline, nearest town)
+- Timeline or deadline references (permits, construction, operations)
+- Regulatory or permit mentions (EPA, DEQ, LCFS, RFS)
+- Number of sources, facilities, or partners
+- Implied infrastructure needs (RNG implies gas cleanup + pipeline interconnect)
+- Liquid effluent handling pathway (WWTP discharge, land application, irrigation, storage lagoon)
+- Technology specifications (digester type, gas cleanup method)
+- Environmental requirements (odor, noise, setbacks, emissions)
+
+Return ONLY the JSON object with the "parameters" array.`,
+  }),
+  /**
+   * Clarify prompt: Generates 3 targeted clarifying questions before UPIF generation.
+   * Identifies the most important missing or ambiguous information from project inputs to improve specification quality.
+   * Always returns exactly 3 questions targeting different project aspects (feedstock, outputs, location, constraints, liquid handling).
+   */
+  clarify: () => ({
+    key: "clarify",
+    name: "Clarifying Questions",
+    description: "System prompt used to generate 3 targeted clarifying questions before UPIF generation. The AI identifies the most important missing or ambiguous information from the project inputs.",
+    isSystemPrompt: true,
+    availableVariables: [],
+    template: `${PERSONA_PREAMBLE}.
+
+You are reviewing a project intake submission for an anaerobic digestion / biogas project. Your job is to identify the THREE most important missing or ambiguous pieces of information that would significantly improve the quality of the project specification.
+
+Focus on questions that would help clarify:
+- Feedstock details (types, volumes, seasonal variation, contaminants, current disposal method)
+- Output goals (RNG pipeline injection, electricity generation, digestate use, effluent discharge path)
+- Site/location specifics (permits, utility interconnections, space constraints)
+- Operational constraints (hours of operation, existing infrastructure, budget range)
+- Liquid handling pathway (discharge to WWTP, land application, on-site treatment)
+
+TYPE A (WASTEWATER) PRIORITY — FLOW RANGE:
+For Type A (wastewater treatment) projects, if the user provides an average flow rate but does NOT provide minimum and/or maximum (peak) flow rates, you MUST include a question asking about the flow range. This is critical for equipment sizing. Example: "You've provided an average flow of X GPD. What are the minimum and maximum (peak) daily flow rates? If you don't have exact data, estimates or seasonal patterns would help us size equipment properly."
+
+RULES:
+1. Ask exactly 3 questions - no more, no less.
+2. Each question should target a DIFFERENT aspect of the project.
+3. Questions should be specific and actionable - not vague or generic.
+4. Tailor questions to what is actually MISSING from the provided inputs. Don't ask about things already clearly stated.
+5. Keep questions concise (1-2 sentences each).
+6. For Type A projects: if average flow is given but min/max flow is missing, one of the 3 questions MUST ask about flow range.
+7. Return ONLY valid JSON in this exact format:
+
+{
+  "questions": [
+    { "question": "First question text here?" },
+    { "question": "Second question text here?" },
+    { "question": "Third question text here?" }
+  ]
+}`,
+  }),
+  /**
+   * Reviewer chat prompt: Used in the UPIF chat feature where users can ask the AI to modify the UPIF.
+   * Template variables {{UPIF_STATE}} and {{LOCKED_FIELDS}} are injected at runtime with current UPIF data.
+   * Enforces protection of confirmed/locked fields - changes to locked fields are blocked with explanations.
+   * Returns structured JSON with assistant message, field updates, and list of changed fields.
+   */
+  reviewer_chat: () => ({
+    key: "reviewer_chat",
+    name: "Reviewer Chat",
+    description: "System prompt for the UPIF reviewer chat. The AI acts as a project reviewer, analyzing user feedback and suggesting updates to the UPIF. Dynamic values (current UPIF state and locked fields) are injected at runtime.",
+    isSystemPrompt: true,
+    availableVariables: ["{{UPIF_STATE}}", "{{LOCKED_FIELDS}}"],
+    template: `${PERSONA_PREAMBLE}, acting as the project Reviewer. You help refine the Unified Project Intake Form (UPIF) by applying feedback.
 
-═══════════════════════════════════════════════════════════
-  ADDITIONAL CRITICAL RULES
-═══════════════════════════════════════════════════════════
+CURRENT UPIF STATE:
+{{UPIF_STATE}}
 
-1. TS vs TSS — COMPLETELY DIFFERENT measurements:
-   - TSS (Total Suspended Solids) = mg/L, a WASTEWATER parameter. ALLOWED.
-   - TS (Total Solids) = % wet basis, a SLUDGE/SOLIDS parameter. FORBIDDEN.
-   - NEVER convert TSS (mg/L) into TS (%). If user says "TSS = 2,800 mg/L", report exactly TSS = 2,800 mg/L.
+LOCKED FIELDS (DO NOT MODIFY THESE):
+{{LOCKED_FIELDS}}
 
-2. EFFLUENT LIMITS vs REMOVAL EFFICIENCIES — SEPARATE concepts:
-   - Discharge limits are CONCENTRATIONS: "BOD < 250 mg/L", "TSS < 300 mg/L".
-   - Removal efficiencies are PERCENTAGES: ">94% BOD removal".
-   - NEVER conflate them. If user provides both, extract SEPARATE parameters for each.
+RULES:
+1. You MUST NOT modify any locked field. If feedback asks to change a locked field, explain that it is confirmed/locked and cannot be changed until unlocked.
+2. Treat locked/confirmed fields as established truth and accepted project parameters. Use their values as context and constraints when evaluating whether other unlocked fields should be modified. For example, if a feedstock volume is locked at 50 tons/day, that should inform your assessment of throughput, output capacity, and other dependent parameters.
+3. For unlocked fields, analyze the feedback along with the locked field context and determine which UPIF fields should be updated.
+4. Return a JSON response with EXACTLY this structure:
+{
+  "assistantMessage": "A helpful explanation of what you changed or why you couldn't make a change",
+  "updates": {
+    "location": "new value or null if unchanged",
+    "outputRequirements": "new value or null if unchanged",
+    "constraints": ["full array of constraints if changed, or null if unchanged"],
+    "feedstocks": [array of full feedstock objects if changed, or null if unchanged],
+    "outputSpecs": {object of output specs if changed, or null if unchanged}
+  },
+  "changedFields": ["list of field paths that were changed, e.g. 'location', 'feedstocks[0].feedstockVolume', 'constraints[2]'"]
+}
 
-3. CROSS-STREAM SEPARATION — Keep output categories clean:
-   - Gas specs (CH4%, H2S, BTU, Wobbe) belong ONLY in output_requirements RNG parameters.
-   - Effluent limits (mg/L concentrations) belong ONLY in output_requirements effluent parameters.
-   - NEVER mix specs across these categories.
+IMPORTANT:
+- Set unchanged fields to null in the updates object
+- For feedstocks: if changing ANY feedstock field, return the COMPLETE feedstocks array with all feedstocks (not just the changed one). Preserve all existing feedstockSpecs that you don't modify.
+- For constraints: if changing ANY constraint, return the COMPLETE constraints array
+- For outputSpecs: if changing ANY output spec, return the COMPLETE outputSpecs structure. Preserve all existing spec metadata (source, confidence, provenance, group, displayName, sortOrder) and only update the value/unit.
+- Be precise with numeric values. Use appropriate units.
+- If the request is unclear, ask for clarification in assistantMessage and set all updates to null.`,
+  }),
+  /**
+   * PDF summary prompt: Generates a one-paragraph project summary for the PDF export.
+   * Template variables ({{PROJECT_NAME}}, {{SCENARIO_NAME}}, {{FEEDSTOCKS}}, {{LOCATION}}, {{OUTPUT_REQUIREMENTS}}, {{CONSTRAINTS}})
+   * are replaced at runtime with current project data from the UPIF.
+   */
+  pdf_summary: () => ({
+    key: "pdf_summary",
+    name: "PDF Summary",
+    description: "Prompt used to generate a one-paragraph project summary at the top of the exported PDF. Dynamic project details are injected at runtime.",
+    isSystemPrompt: false,
+    availableVariables: ["{{PROJECT_NAME}}", "{{SCENARIO_NAME}}", "{{FEEDSTOCKS}}", "{{LOCATION}}", "{{OUTPUT_REQUIREMENTS}}", "{{CONSTRAINTS}}"],
+    template: `Write a concise one-paragraph project summary for a biogas/anaerobic digestion project intake form. The project "{{PROJECT_NAME}}" (scenario: "{{SCENARIO_NAME}}") involves the following:
+- Feedstock(s): {{FEEDSTOCKS}}
+- Location: {{LOCATION}}
+- Output requirements: {{OUTPUT_REQUIREMENTS}}
+- Constraints: {{CONSTRAINTS}}
 
-4. DISCHARGE DESTINATION IS NOT OUR FACILITY TYPE:
-   - If the project discharges to a municipal WWTP/POTW, that is the DISCHARGE DESTINATION.
-   - Extract it as "Discharge Pathway: Indirect discharge to POTW" under output_requirements.
-   - Our effluent limits are set by the RECEIVING facility's pretreatment ordinance, NOT by federal secondary treatment standards.
+Provide a professional, technical summary in 3-5 sentences.`,
+  }),
+  classification: () => ({
+    key: "classification",
+    name: "Project Type Classification",
+    description: "System prompt used to classify a project into one of Burnham's four project types (A-D) before extraction. The AI reads unstructured inputs and determines the project type with reasoning.",
+    isSystemPrompt: true,
+    availableVariables: [],
+    template: `You are a senior wastewater engineer at Burnham RNG with expertise in anaerobic digestion, high-strength food processing wastewater treatment, and RNG production. Your job is to classify a project into one of Burnham's four primary project types based on unstructured project descriptions.
 
-CATEGORIES:
-- input: Influent characteristics ONLY — see ALLOWLIST above. All values in mg/L or volumetric flow units. NO solids-basis parameters.
-- location: City, state, county, region, GPS coordinates, site details, proximity to gas pipelines or electrical grid, zoning, land area/acreage, elevation, climate, proximity to receiving water body or POTW
-- output_requirements: Effluent discharge limits (BOD, COD, TSS, N, P, pH, temperature as mg/L concentrations), discharge pathway (NPDES direct, POTW/indirect, reuse/irrigation), RNG production targets (only if organic loading supports anaerobic treatment and gas recovery), gas quality specs (only if RNG is a stated byproduct)
-- constraints: Regulatory requirements (state DEQ, NPDES permit limits, local pretreatment ordinances), timeline/deadlines, existing treatment infrastructure, technology preferences, odor/noise requirements, setback distances, environmental impact, flow equalization needs
+PROJECT TYPES:
 
-MULTIPLE INFLUENTS:
-When a project mentions more than one influent source, use a NUMBERED prefix:
-- "Influent 1 Type", "Influent 1 Flow Rate", "Influent 1 BOD", etc.
-- "Influent 2 Type", "Influent 2 Flow Rate", "Influent 2 COD", etc.
-If there is only one influent, you may omit the number prefix or use "Influent 1".
+(A) Wastewater Treatment (WWT): We treat high-strength INDUSTRIAL wastewater — primarily from food processing facilities (dairy, meat, potato, beverage, produce, etc.) — using anaerobic digestion. We reduce key contaminants (BOD, COD, TSS, N, P) to meet discharge limits. The input is called "influent" and the treated output is called "effluent." Some projects also recover RNG as a byproduct when organic loading justifies it. IMPORTANT: We do NOT operate municipal WWTPs. If a project discharges treated effluent to a municipal POTW/sewer, that is the discharge destination — the project is still Type A if the primary work is treating industrial wastewater.
 
-EXAMPLE INPUT:
-"A potato processing facility in Hermiston, OR generates 800,000 GPD of high-strength wastewater with BOD of 4,500 mg/L, COD of 7,200 mg/L, and TSS of 2,200 mg/L. The facility needs to meet their NPDES direct discharge permit limits of BOD < 30 mg/L and TSS < 30 mg/L. Organic loading is high enough to support an anaerobic reactor with biogas recovery. The site has 12 acres available and is 2 miles from a gas interconnect."
+(B) RNG Production (Greenfield): We take feedstock — typically food processing residuals in solid (non-pumpable) form as either packaged or de-packaged waste — and upgrade this to RNG or other productive use of biogas (e.g., power). We also produce both solid and liquid digestate in these projects.
 
-EXAMPLE OUTPUT (notice: NO VS/TS, NO BMP, NO C:N — only mg/L analytes + flow + ppd mass loadings):
-{"parameters": [
-  {"category": "input", "name": "Influent 1 Type", "value": "Potato processing wastewater", "unit": null, "confidence": "high"},
-  {"category": "input", "name": "Influent 1 Flow Rate", "value": "800,000", "unit": "GPD", "confidence": "high"},
-  {"category": "input", "name": "Influent 1 Min Flow Rate", "value": "480,000", "unit": "GPD", "confidence": "low"},
-  {"category": "input", "name": "Influent 1 Peak Flow Rate", "value": "1,600,000", "unit": "GPD", "confidence": "low"},
-  {"category": "input", "name": "Influent 1 BOD", "value": "4,500", "unit": "mg/L", "confidence": "high"},
-  {"category": "input", "name": "Influent 1 BOD Loading", "value": "30,024", "unit": "ppd", "confidence": "high"},
-  {"category": "input", "name": "Influent 1 COD", "value": "7,200", "unit": "mg/L", "confidence": "high"},
-  {"category": "input", "name": "Influent 1 COD Loading", "value": "48,038", "unit": "ppd", "confidence": "high"},
-  {"category": "input", "name": "Influent 1 TSS", "value": "2,200", "unit": "mg/L", "confidence": "high"},
-  {"category": "input", "name": "Influent 1 FOG", "value": "150-400", "unit": "mg/L", "confidence": "low"},
-  {"category": "input", "name": "Influent 1 pH", "value": "5.5-7.0", "unit": null, "confidence": "low"},
-  {"category": "input", "name": "Influent 1 TKN", "value": "120", "unit": "mg/L", "confidence": "low"},
-  {"category": "input", "name": "Influent 1 TN Loading", "value": "801", "unit": "ppd", "confidence": "low"},
-  {"category": "location", "name": "City", "value": "Hermiston", "unit": null, "confidence": "high"},
-  {"category": "location", "name": "State", "value": "Oregon", "unit": null, "confidence": "high"},
-  {"category": "location", "name": "Available Land", "value": "12", "unit": "acres", "confidence": "high"},
-  {"category": "location", "name": "Gas Interconnect Distance", "value": "2", "unit": "miles", "confidence": "high"},
-  {"category": "output_requirements", "name": "Discharge Pathway", "value": "NPDES direct discharge", "unit": null, "confidence": "high"},
-  {"category": "output_requirements", "name": "Effluent BOD Limit", "value": "30", "unit": "mg/L", "confidence": "high"},
-  {"category": "output_requirements", "name": "Effluent TSS Limit", "value": "30", "unit": "mg/L", "confidence": "high"},
-  {"category": "output_requirements", "name": "RNG Potential", "value": "Biogas recovery from anaerobic reactor", "unit": null, "confidence": "medium"},
-  {"category": "constraints", "name": "Permit Type", "value": "NPDES direct discharge permit", "unit": null, "confidence": "high"}
-]}
+(C) RNG Production (Bolt-On): These projects take flared or underutilized biogas and upgrade it to RNG. Input is biogas and output is RNG or other productive use of biogas (e.g., power).
 
-FINAL SELF-CHECK — Before returning your JSON, verify:
-□ Every "input" parameter uses mg/L or volumetric flow units (GPD/MGD/m³/d) or ppd for mass loadings — no %, no tons, no kg
-□ NO VS/TS Ratio, NO BMP, NO C:N Ratio, NO Moisture%, NO Delivery Form anywhere in output
-□ All mandatory design drivers present: Flow avg, Flow min, Flow peak, BOD (mg/L + ppd), COD (mg/L + ppd), TSS, FOG, pH
-□ TN/TKN loading in ppd is included when TN/TKN concentration is available
-□ Missing design drivers have been estimated with confidence "low"
-□ TSS is in mg/L (not converted to TS%)
-□ Effluent limits and removal efficiencies are separate parameters
-□ Mass loadings (ppd) computed correctly: concentration (mg/L) × avg flow (MGD) × 8.34
+(D) Hybrid: On some of our WWT projects we also accept trucked-in waste, adding it to our process to produce more gas. These projects combine wastewater treatment with supplemental solid feedstock.
 
-RULES:
-- Extract every quantitative value, date, location, material, cost, and requirement mentioned.
-- Create SEPARATE parameter entries for each distinct fact.
-- Use specific, descriptive parameter names.
-- Always include units when stated or reasonably inferred.
-- Look for IMPLIED information: if someone mentions a facility, extract both the source AND the location.
-- Populate typical values for influent composition when they can be reasonably estimated from the industry/source type.
-- Our projects treat food processing wastewater, NOT municipal wastewater. Do not assume municipal WWTP values.
-- If anaerobic digestion is included, estimate methane production based on BOD/COD and flow rate (not TS assumptions).
-- For confidence levels: "high" = explicitly stated, "medium" = clearly implied, "low" = requires assumption.
+INSTRUCTIONS:
+1. Read the entire project description carefully.
+2. Identify the primary input type (liquid wastewater, solid waste/residuals, biogas, or a combination).
+3. Identify the primary output goal (treated effluent, RNG, power, digestate, or a combination).
+4. Match to the most appropriate project type.
 
-Return ONLY the JSON object with the "parameters" array.`,
-  },
-  extraction_type_b: {
+KEY DIFFERENTIATORS:
+- If the primary goal is treating wastewater to meet discharge limits -> A (WWT)
+- If the primary input is solid food waste/residuals and goal is RNG -> B (Greenfield)
+- If the input is existing biogas being upgraded -> C (Bolt-On)
+- If there is wastewater treatment PLUS trucked-in supplemental feedstock -> D (Hybrid)
+
+Return ONLY valid JSON in this exact format:
+{
+  "projectType": "A",
+  "projectTypeName": "Wastewater Treatment (WWT)",
+  "confidence": "high",
+  "reasoning": "2-3 sentence explanation of why this project type was selected, citing specific evidence from the input text."
+}`,
+  }),
+  extraction_type_a: () => ({
+    key: "extraction_type_a",
+    name: "Extraction — Type A (WWT)",
+    description: "Extraction prompt specialized for Wastewater Treatment projects. Focuses on influent/effluent specs, contaminant reduction, and optional RNG as byproduct.",
+    isSystemPrompt: true,
+    availableVariables: [],
+    template: buildExtractionTypeA(),
+  }),
+  extraction_type_b: () => ({
     key: "extraction_type_b",
     name: "Extraction — Type B (RNG Greenfield)",
     description: "Extraction prompt specialized for RNG Production Greenfield projects. Focuses on solid feedstock specs, gas production, digestate handling, and liquid effluent pathway.",
@@ -525,37 +696,21 @@ EXAMPLE INPUT:
 "We have a food processing facility in Marion County, OR generating 50 tons/day of vegetable processing waste and 10 tons/day of FOG from our grease traps. TS is around 8% for the vegetable waste. We want to produce RNG for pipeline injection. Dewatered digestate will be land-applied on nearby farmland. Budget is $18M. Need air permit by Q1 2027 and online by Q4 2027. We prefer a mesophilic CSTR design."
 
 EXAMPLE OUTPUT:
-{"parameters": [
-  {"category": "input", "name": "Feedstock 1 Type", "value": "Vegetable processing waste", "unit": null, "confidence": "high"},
-  {"category": "input", "name": "Feedstock 1 Volume", "value": "50", "unit": "tons/day", "confidence": "high"},
-  {"category": "input", "name": "Feedstock 1 TS%", "value": "8", "unit": "%", "confidence": "high"},
-  {"category": "input", "name": "Feedstock 2 Type", "value": "FOG (Fats, Oils, Grease)", "unit": null, "confidence": "high"},
-  {"category": "input", "name": "Feedstock 2 Volume", "value": "10", "unit": "tons/day", "confidence": "high"},
-  {"category": "location", "name": "County", "value": "Marion County", "unit": null, "confidence": "high"},
-  {"category": "location", "name": "State", "value": "Oregon", "unit": null, "confidence": "high"},
-  {"category": "output_requirements", "name": "Primary Output", "value": "Renewable Natural Gas (RNG)", "unit": null, "confidence": "high"},
-  {"category": "output_requirements", "name": "RNG Delivery", "value": "Pipeline injection", "unit": null, "confidence": "high"},
-  {"category": "output_requirements", "name": "Solid Digestate Handling", "value": "Land application on nearby farmland", "unit": null, "confidence": "high"},
-  {"category": "output_requirements", "name": "Liquid Handling", "value": "To be determined", "unit": null, "confidence": "low"},
-  {"category": "constraints", "name": "Capital Budget", "value": "18", "unit": "million USD", "confidence": "high"},
-  {"category": "constraints", "name": "Air Permit Deadline", "value": "Q1 2027", "unit": null, "confidence": "high"},
-  {"category": "constraints", "name": "Target Online Date", "value": "Q4 2027", "unit": null, "confidence": "high"},
-  {"category": "constraints", "name": "Digester Technology Preference", "value": "Mesophilic CSTR", "unit": null, "confidence": "high"}
-]}
+${EXAMPLE_OUTPUT_EXTRACTION_TYPE_B}
 
 RULES:
-- Extract every quantitative value, date, location, material, cost, and requirement mentioned.
-- Create SEPARATE parameter entries for each distinct fact.
-- Use specific, descriptive parameter names.
-- Always include units when stated or reasonably inferred.
+${RULE_EXTRACT_EVERYTHING}
+${RULE_SEPARATE_ENTRIES}
+${RULE_SPECIFIC_NAMES}
+${RULE_INCLUDE_UNITS}
 - Look for IMPLIED information: if someone mentions a facility, extract both the feedstock source AND the location.
 - Populate typical composition values (TS%, VS/TS, C:N, BMP) when they can be estimated from the feedstock type.
-- WE DO NOT do manure projects. Unless specifically mentioned, the feedstock is not manure.
+${RULE_NO_MANURE}
 - Do not assume municipal wastewater values. Do not assume biosolids land application rules apply unless we are dealing specifically with biosolids.
 - LIQUID HANDLING IS CRITICAL: Every Greenfield RNG project produces liquid effluent that must go somewhere. If the input mentions discharge to sewer, WWTP, or any liquid handling pathway, extract it as an output_requirements parameter. If liquid handling is not mentioned, infer "Liquid Handling" as "To be determined" with confidence "low". If the prompt says liquid digestate is land applied, do not assume it goes to a WWTP.
 - Ensure gas quality specs apply only to RNG gas streams and solids specs apply only to digestate streams. Do not duplicate parameters across sections.
 - Do not introduce additional regulatory requirements (e.g., EPA Part 503 heavy metals) unless explicitly triggered by user input.
-- For confidence levels: "high" = explicitly stated, "medium" = clearly implied, "low" = requires assumption.
+${RULE_CONFIDENCE_LEVELS}
 
 COMMONLY MISSED DETAILS - check for these:
 - Seasonal variations in feedstock availability
@@ -570,8 +725,8 @@ COMMONLY MISSED DETAILS - check for these:
 - Environmental requirements (odor, noise, setbacks, emissions)
 
 Return ONLY the JSON object with the "parameters" array.`,
-  },
-  extraction_type_c: {
+  }),
+  extraction_type_c: () => ({
     key: "extraction_type_c",
     name: "Extraction — Type C (RNG Bolt-On)",
     description: "Extraction prompt specialized for RNG Bolt-On projects. Focuses on existing biogas source, composition, upgrading equipment, and pipeline interconnect.",
@@ -635,35 +790,17 @@ EXAMPLE INPUT:
 "A municipal WWTP in Clark County, WA is currently flaring approximately 400 SCFM of digester gas with 62% methane, 36% CO2, and 1,200 ppm H2S. They want to install a biogas upgrading system to produce RNG for injection into the NW Natural pipeline, which runs 0.5 miles from the plant. Current flare permit expires 2026. Target online Q3 2026. They also have a smaller stream of 80 SCFM from a co-located food waste digester at 58% CH4."
 
 EXAMPLE OUTPUT:
-{"parameters": [
-  {"category": "input", "name": "Feedstock 1 Type", "value": "WWTP Digester Gas", "unit": null, "confidence": "high"},
-  {"category": "input", "name": "Feedstock 1 Volume", "value": "400", "unit": "SCFM", "confidence": "high"},
-  {"category": "input", "name": "Feedstock 1 CH4", "value": "62", "unit": "%", "confidence": "high"},
-  {"category": "input", "name": "Feedstock 1 CO2", "value": "36", "unit": "%", "confidence": "high"},
-  {"category": "input", "name": "Feedstock 1 H2S", "value": "1200", "unit": "ppmv", "confidence": "high"},
-  {"category": "input", "name": "Feedstock 1 Current Disposition", "value": "Flared", "unit": null, "confidence": "high"},
-  {"category": "input", "name": "Feedstock 2 Type", "value": "Food Waste Digester Gas", "unit": null, "confidence": "high"},
-  {"category": "input", "name": "Feedstock 2 Volume", "value": "80", "unit": "SCFM", "confidence": "high"},
-  {"category": "input", "name": "Feedstock 2 CH4", "value": "58", "unit": "%", "confidence": "high"},
-  {"category": "location", "name": "County", "value": "Clark County", "unit": null, "confidence": "high"},
-  {"category": "location", "name": "State", "value": "Washington", "unit": null, "confidence": "high"},
-  {"category": "location", "name": "Pipeline Proximity", "value": "0.5", "unit": "miles", "confidence": "high"},
-  {"category": "location", "name": "Pipeline Utility", "value": "NW Natural", "unit": null, "confidence": "high"},
-  {"category": "output_requirements", "name": "Primary Output", "value": "Renewable Natural Gas (RNG)", "unit": null, "confidence": "high"},
-  {"category": "output_requirements", "name": "RNG Delivery", "value": "Pipeline injection", "unit": null, "confidence": "high"},
-  {"category": "constraints", "name": "Flare Permit Expiration", "value": "2026", "unit": null, "confidence": "high"},
-  {"category": "constraints", "name": "Target Online Date", "value": "Q3 2026", "unit": null, "confidence": "high"}
-]}
+${EXAMPLE_OUTPUT_EXTRACTION_TYPE_C}
 
 RULES:
-- Extract every quantitative value, date, location, material, cost, and requirement mentioned.
-- Create SEPARATE parameter entries for each distinct fact.
+${RULE_EXTRACT_EVERYTHING}
+${RULE_SEPARATE_ENTRIES}
 - ALWAYS use the "Feedstock N" prefix naming convention for biogas source data.
 - The "Feedstock N Volume" parameter should contain ONLY the numeric flow rate value. The unit should be "SCFM", "CFM", "m³/hr", or similar gas flow unit — never tons/day or other mass units.
 - Gas composition parameters (CH4, CO2, H2S, Siloxanes, O2, N2, Moisture) MUST use "Feedstock N" prefix.
 - If biogas composition is not explicitly stated, do NOT guess — leave those parameters out and let the system provide defaults.
 - Ensure gas quality specifications reference the correct pipeline standard (FERC/NAESB or local utility tariff).
-- For confidence levels: "high" = explicitly stated, "medium" = clearly implied, "low" = requires assumption.
+${RULE_CONFIDENCE_LEVELS}
 
 COMMONLY MISSED DETAILS - check for these:
 - Biogas composition beyond methane (H₂S, siloxanes, moisture, O₂, N₂)
@@ -678,8 +815,8 @@ COMMONLY MISSED DETAILS - check for these:
 - Number of distinct biogas sources (use separate Feedstock numbering for each)
 
 Return ONLY the JSON object with the "parameters" array.`,
-  },
-  extraction_type_d: {
+  }),
+  extraction_type_d: () => ({
     key: "extraction_type_d",
     name: "Extraction — Type D (Hybrid)",
     description: "Extraction prompt specialized for Hybrid projects combining wastewater treatment with trucked-in supplemental feedstock for enhanced gas production.",
@@ -731,33 +868,20 @@ EXAMPLE INPUT:
 "Our food processing WWTP in Yakima, WA treats 1 MGD of process wastewater (BOD 2,500 mg/L). We want to accept 20 tons/day of food waste from local haulers to boost our digester gas production. Currently producing about 150 SCFM of biogas that we flare. Goal is RNG pipeline injection. Need a receiving station for the trucked-in waste."
 
 EXAMPLE OUTPUT:
-{"parameters": [
-  {"category": "input", "name": "Influent 1 Type", "value": "Food processing wastewater", "unit": null, "confidence": "high"},
-  {"category": "input", "name": "Influent 1 Flow Rate", "value": "1", "unit": "MGD", "confidence": "high"},
-  {"category": "input", "name": "Influent 1 BOD", "value": "2,500", "unit": "mg/L", "confidence": "high"},
-  {"category": "input", "name": "Feedstock 1 Type", "value": "Food waste (trucked-in)", "unit": null, "confidence": "high"},
-  {"category": "input", "name": "Feedstock 1 Volume", "value": "20", "unit": "tons/day", "confidence": "high"},
-  {"category": "input", "name": "Current Biogas Production", "value": "150", "unit": "SCFM", "confidence": "high"},
-  {"category": "input", "name": "Current Biogas Disposition", "value": "Flared", "unit": null, "confidence": "high"},
-  {"category": "location", "name": "City", "value": "Yakima", "unit": null, "confidence": "high"},
-  {"category": "location", "name": "State", "value": "Washington", "unit": null, "confidence": "high"},
-  {"category": "output_requirements", "name": "Primary Output", "value": "Renewable Natural Gas (RNG)", "unit": null, "confidence": "high"},
-  {"category": "output_requirements", "name": "RNG Delivery", "value": "Pipeline injection", "unit": null, "confidence": "high"},
-  {"category": "constraints", "name": "Receiving Station", "value": "Required for trucked-in food waste", "unit": null, "confidence": "high"}
-]}
+${EXAMPLE_OUTPUT_EXTRACTION_TYPE_D}
 
 RULES:
-- Extract every quantitative value, date, location, material, cost, and requirement mentioned.
-- Create SEPARATE parameter entries for each distinct fact.
+${RULE_EXTRACT_EVERYTHING}
+${RULE_SEPARATE_ENTRIES}
 - Always separate influent (wastewater) parameters from feedstock (trucked-in) parameters. Use "Influent" and "Feedstock" prefixes consistently.
-- Use specific, descriptive parameter names.
-- Always include units when stated or reasonably inferred.
+${RULE_SPECIFIC_NAMES}
+${RULE_INCLUDE_UNITS}
 - Look for IMPLIED information: extract both sources AND locations when mentioned.
-- WE DO NOT do manure projects. Unless specifically mentioned, the feedstock is not manure.
+${RULE_NO_MANURE}
 - TS is not the same as TSS. Double check TS, TSS, and TDS before presenting.
 - Estimate methane production from wastewater based on BOD/COD and flow rate (not TS assumptions). From trucked in solid waste, use TS and BMP assumptions. Add the two together to get methane production estimate.
 - Populate typical composition values for both influent and feedstock when they can be estimated.
-- For confidence levels: "high" = explicitly stated, "medium" = clearly implied, "low" = requires assumption.
+${RULE_CONFIDENCE_LEVELS}
 
 COMMONLY MISSED DETAILS - check for these:
 - We do not typically do manure projects. DO NOT assume manure unless explicitly noted.
@@ -773,8 +897,8 @@ COMMONLY MISSED DETAILS - check for these:
 - Environmental requirements (odor from receiving station, truck traffic)
 
 Return ONLY the JSON object with the "parameters" array.`,
-  },
-  mass_balance_type_a: {
+  }),
+  mass_balance_type_a: () => ({
     key: "mass_balance_type_a",
     name: "Mass Balance — Type A (WWT)",
     description: "System prompt for AI-generated mass balance calculations for Type A Wastewater Treatment projects. Uses confirmed UPIF data to produce treatment train stages, equipment list, and recycle streams.",
@@ -1035,8 +1159,8 @@ RULES:
 - Always calculate percent removal required for each pollutant vs. discharge limits before selecting treatment methods.
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation outside the JSON.`,
-  },
-  mass_balance_type_b: {
+  }),
+  mass_balance_type_b: () => ({
     key: "mass_balance_type_b",
     name: "Mass Balance — Type B (RNG Greenfield)",
     description: "System prompt for AI-generated mass balance calculations for Type B RNG Greenfield projects. Models full AD pipeline from feedstock receiving through RNG production.",
@@ -1304,8 +1428,8 @@ RULES:
 - Use SCFM (not scfm), ppm (not ppmv), Btu/SCF, MMBtu/Day for gas units.
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation outside the JSON.`,
-  },
-  mass_balance_type_c: {
+  }),
+  mass_balance_type_c: () => ({
     key: "mass_balance_type_c",
     name: "Mass Balance — Type C (RNG Bolt-On)",
     description: "System prompt for AI-generated mass balance for Type C RNG Bolt-On projects. Strictly biogas-only: existing biogas input through gas conditioning to RNG output specs.",
@@ -1436,8 +1560,8 @@ CRITICAL RULES:
 - Use SCFM (not scfm), ppm (not ppmv), Btu/SCF, MMBtu/Day for units.
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation outside the JSON.`,
-  },
-  mass_balance_type_d: {
+  }),
+  mass_balance_type_d: () => ({
     key: "mass_balance_type_d",
     name: "Mass Balance — Type D (Hybrid)",
     description: "System prompt for AI-generated mass balance for Type D Hybrid projects combining wastewater treatment with AD/RNG gas production from sludge and optional co-digestion.",
@@ -1571,9 +1695,9 @@ RULES:
 - Use SCFM (not scfm), ppm (not ppmv), Btu/SCF, MMBtu/Day for units.
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation outside the JSON.`,
-  },
+  }),
 
-  capex_type_a: {
+  capex_type_a: () => ({
     key: "capex_type_a",
     name: "CapEx Estimate — Type A (Wastewater Treatment)",
     description: "Generates capital cost estimates for wastewater treatment projects based on mass balance equipment list and UPIF data.",
@@ -1728,9 +1852,9 @@ RULES:
 - costPerUnit should reflect $/gal/day of design capacity for WW projects.
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation.`,
-  },
+  }),
 
-  capex_type_b: {
+  capex_type_b: () => ({
     key: "capex_type_b",
     name: "CapEx Estimate — Type B (RNG Greenfield)",
     description: "Generates capital cost estimates for RNG greenfield anaerobic digestion projects.",
@@ -1832,9 +1956,9 @@ RULES:
 - costPerUnit: $/MMBtu/day of RNG design capacity.
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation.`,
-  },
+  }),
 
-  capex_type_c: {
+  capex_type_c: () => ({
     key: "capex_type_c",
     name: "CapEx Estimate — Type C (RNG Bolt-On)",
     description: "Generates capital cost estimates for RNG bolt-on gas upgrading projects.",
@@ -1937,9 +2061,9 @@ RULES:
 - costPerUnit: $/scfm of raw biogas inlet capacity.
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation.`,
-  },
+  }),
 
-  capex_type_d: {
+  capex_type_d: () => ({
     key: "capex_type_d",
     name: "CapEx Estimate — Type D (Hybrid WW + RNG)",
     description: "Generates capital cost estimates for hybrid projects combining wastewater treatment with AD and RNG production.",
@@ -2052,8 +2176,8 @@ RULES:
 - Hybrid projects are typically more expensive due to integration complexity.
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation.`,
-  },
-  vendor_list: {
+  }),
+  vendor_list: () => ({
     key: "vendor_list" as PromptKey,
     name: "Recommended Vendor List",
     description: "Generates a recommended vendor list with up to 3 manufacturers per equipment item, including model numbers, spec sheet URLs, and manufacturer websites.",
@@ -2117,9 +2241,9 @@ RULES:
 - For gas conditioning and upgrading (membranes, compression, H₂S/siloxane removal), use Prodeval (France) as default vendor: VALOGAZ® (FU 100/200), VALOPACK® (FU 300), VALOPUR® (FU 500/800). Alternative vendors: Air Liquide, Pentair Haffmans, Bright Biomethane, Guild Associates, Xebec/Questair.
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation.`,
-  },
+  }),
 
-  opex_type_a: {
+  opex_type_a: () => ({
     key: "opex_type_a",
     name: "OpEx Estimate — Type A (Wastewater Treatment)",
     description: "Generates annual operating cost estimates for wastewater treatment projects based on mass balance, equipment list, and CapEx data.",
@@ -2265,9 +2389,9 @@ RULES:
 - OpEx line item IDs: descriptive lowercase with hyphens prefixed with "opex-".
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation.`,
-  },
+  }),
 
-  opex_type_b: {
+  opex_type_b: () => ({
     key: "opex_type_b",
     name: "OpEx Estimate — Type B (RNG Greenfield)",
     description: "Generates annual operating cost estimates for RNG greenfield anaerobic digestion projects.",
@@ -2384,9 +2508,9 @@ RULES:
 - OpEx line item IDs: descriptive lowercase with hyphens prefixed with "opex-".
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation.`,
-  },
+  }),
 
-  opex_type_c: {
+  opex_type_c: () => ({
     key: "opex_type_c",
     name: "OpEx Estimate — Type C (RNG Bolt-On)",
     description: "Generates annual operating cost estimates for RNG bolt-on gas upgrading projects.",
@@ -2450,9 +2574,9 @@ RULES:
 - OpEx line item IDs: descriptive lowercase with hyphens prefixed with "opex-".
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation.`,
-  },
+  }),
 
-  opex_type_d: {
+  opex_type_d: () => ({
     key: "opex_type_d",
     name: "OpEx Estimate — Type D (Hybrid)",
     description: "Generates annual operating cost estimates for hybrid wastewater + RNG projects.",
@@ -2530,8 +2654,111 @@ RULES:
 - OpEx line item IDs: descriptive lowercase with hyphens prefixed with "opex-".
 
 Return ONLY valid JSON. No markdown, no code fences, no explanation.`,
-  },
-};
+  }),
+});
+
+/**
+ * 32-bit FNV-1a hash. Dependency-free and safe for the client bundle (no
+ * node:crypto); used only as a non-cryptographic fingerprint for comparing
+ * candidate templates against the defaults.
+ */
+function fnv1a(text: string): number {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    hash ^= text.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return hash >>> 0;
+}
+
+// Fingerprints of the default templates, filled in lazily so keys that are
+// never compared don't force their template to materialize.
+const defaultTemplateHashes = new Map<PromptKey, number>();
+
+/**
+ * Returns true when a candidate template is byte-identical to the shipped
+ * default for its key. The default's fingerprint is computed once per key;
+ * mismatched candidates are rejected on a 4-byte compare, and only hash
+ * matches fall through to a full string equality check (hash collisions are
+ * possible with a 32-bit digest).
+ */
+export function isDefaultTemplate(key: PromptKey, template: string): boolean {
+  const defaultTemplate = DEFAULT_PROMPTS[key].template;
+  if (template.length !== defaultTemplate.length) {
+    return false;
+  }
+  let defaultHash = defaultTemplateHashes.get(key);
+  if (defaultHash === undefined) {
+    defaultHash = fnv1a(defaultTemplate);
+    defaultTemplateHashes.set(key, defaultHash);
+  }
+  return fnv1a(template) === defaultHash && template === defaultTemplate;
+}
 
-// Ordered list of all prompt keys for iteration and reference throughout the system.
-export const PROMPT_KEYS: PromptKey[] = ["extraction", "classification", "extraction_type_a", "extraction_type_b", "extraction_type_c", "extraction_type_d", "clarify", "reviewer_chat", "pdf_summary", "mass_balance_type_a", "mass_balance_type_b", "mass_balance_type_c", "mass_balance_type_d", "capex_type_a", "capex_type_b", "capex_type_c", "capex_type_d", "opex_type_a", "opex_type_b", "opex_type_c", "opex_type_d", "vendor_list"];
+type TemplateRenderer = (vars: Record<string, string>) => string;
+
+const TEMPLATE_VARIABLE_RE = /\{\{(\w+)\}\}/g;
+
+// Specialized renderers keyed by the raw template string, so defaults and
+// user overrides alike are parsed once and rendered by closures thereafter.
+const COMPILED_RENDERER_CACHE_MAX = 64;
+const compiledRendererCache = new Map<string, TemplateRenderer>();
+
+/**
+ * Builds a renderer closure specialized to one template. The template is
+ * parsed once into parallel literal/variable arrays laid out so that
+ * output = literals[0] + value(0) + literals[1] + ... + literals[n]; the
+ * closure is then a straight monomorphic concatenation loop with no parsing,
+ * regexes, or per-segment type checks at render time. (A closure rather than
+ * runtime codegen: eval/new Function would be rejected by CSP and bundlers.)
+ */
+function compileRenderer(template: string): TemplateRenderer {
+  const literals: string[] = [];
+  const variables: string[] = [];
+  let lastIndex = 0;
+  TEMPLATE_VARIABLE_RE.lastIndex = 0;
+  let match: RegExpExecArray | null;
+  while ((match = TEMPLATE_VARIABLE_RE.exec(template)) !== null) {
+    literals.push(template.slice(lastIndex, match.index));
+    variables.push(match[1]);
+    lastIndex = match.index + match[0].length;
+  }
+  if (variables.length === 0) {
+    return () => template;
+  }
+  literals.push(template.slice(lastIndex));
+  return (vars) => {
+    let rendered = literals[0];
+    for (let i = 0; i < variables.length; i++) {
+      rendered += (vars[variables[i]] ?? `{{${variables[i]}}}`) + literals[i + 1];
+    }
+    return rendered;
+  };
+}
+
+/**
+ * Substitutes {{VARIABLE}} placeholders in a prompt template.
+ *
+ * Unlike chained String.replace() calls, this fills every occurrence of each
+ * variable, never interprets `$` sequences in the substituted values, and
+ * parses the template only on first use (a renderer closure specialized to
+ * the template is cached and reused for subsequent calls). Variables missing
+ * from `vars` are left as literal {{VARIABLE}} text.
+ */
+export function renderTemplate(template: string, vars: Record<string, string>): string {
+  if (!template.includes("{{")) {
+    return template;
+  }
+  let renderer = compiledRendererCache.get(template);
+  if (!renderer) {
+    if (compiledRendererCache.size >= COMPILED_RENDERER_CACHE_MAX) {
+      const oldest = compiledRendererCache.keys().next().value;
+      if (oldest !== undefined) {
+        compiledRendererCache.delete(oldest);
+      }
+    }
+    renderer = compileRenderer(template);
+    compiledRendererCache.set(template, renderer);
+  }
+  return renderer(vars);
+}
@@ -508,18 +508,53 @@ export const OUTPUT_CRITERIA_LIBRARY: OutputProfile[] = [
   },
 ];
 
+// The library is shared read-only reference data: profiles are returned by
+// matchOutputType and embedded by reference in seeded records, so freeze every
+// level at module load — a mutation anywhere would corrupt all later matches.
+// (Same runtime-freeze reasoning as the default-prompts registry; the interface
+// types alone only protect TypeScript callers.)
+for (const profile of OUTPUT_CRITERIA_LIBRARY) {
+  for (const criterion of Object.values(profile.criteria)) Object.freeze(criterion);
+  Object.freeze(profile.criteria);
+  Object.freeze(profile.aliases);
+  Object.freeze(profile);
+}
+Object.freeze(OUTPUT_CRITERIA_LIBRARY);
+
+/**
+ * The single normalization point for user-supplied names. Library-side strings
+ * (profile names, aliases, display names, map keys) are normalized once at module
+ * load, so at runtime only the caller's input needs this.
+ */
+function norm(s: string): string {
+  return s.trim().toLowerCase();
+}
+
+/** Lowercased profile names → profile, for O(1) exact matches in matchOutputType. */
+const EXACT_NAME_INDEX = new Map<string, OutputProfile>();
+
+/** Flattened (lowercased alias, profile) pairs in library order, normalized once. */
+const ALIAS_INDEX: [string, OutputProfile][] = [];
+
+for (const profile of OUTPUT_CRITERIA_LIBRARY) {
+  EXACT_NAME_INDEX.set(profile.name.toLowerCase(), profile);
+  for (const alias of profile.aliases) {
+    ALIAS_INDEX.push([alias.toLowerCase(), profile]);
+  }
+}
+
 /**
  * Matches an output type description against OUTPUT_CRITERIA_LIBRARY profiles.
- * Uses exact name match first, then bidirectional substring alias matching
- * (input contains alias OR alias contains input). Returns undefined if no match.
+ * Uses exact name match first (across all profiles), then bidirectional substring
+ * alias matching (input contains alias OR alias contains input) in library order.
+ * Returns undefined if no match.
  */
 export function matchOutputType(outputDescription: string): OutputProfile | undefined {
-  const lower = outputDescription.toLowerCase().trim();
-  for (const profile of OUTPUT_CRITERIA_LIBRARY) {
-    if (profile.name.toLowerCase() === lower) return profile;
-    for (const alias of profile.aliases) {
-      if (lower.includes(alias) || alias.includes(lower)) return profile;
-    }
+  const lower = norm(outputDescription);
+  const exact = EXACT_NAME_INDEX.get(lower);
+  if (exact) return exact;
+  for (const [alias, profile] of ALIAS_INDEX) {
+    if (lower.includes(alias) || alias.includes(lower)) return profile;
   }
   return undefined;
 }
@@ -536,6 +571,262 @@ export function matchOutputType(outputDescription: string): OutputProfile | unde
  *   5. Override matching library values with user-provided data (source="user_provided", confidence="high")
  *   6. For fuzzy matching, uses longest-match-wins strategy to avoid ambiguous partial matches
  */
+/**
+ * Normalized user-facing criterion names -> canonical spec keys. Static across all
+ * calls, so it lives at module scope (frozen) instead of being rebuilt inside
+ * enrichOutputSpecs; per-profile display names overlay it at lookup time.
+ */
+const CRITERION_KEY_MAP: Record<string, string> = {
+  "rng average flow": "rngAvgFlowScfm",
+  "rng avg flow": "rngAvgFlowScfm",
+  "rng average flow scfm": "rngAvgFlowScfm",
+  "rng flow": "rngAvgFlowScfm",
+  "rng max flow": "rngMaxFlowScfm",
+  "rng maximum flow": "rngMaxFlowScfm",
+  "rng peak flow": "rngMaxFlowScfm",
+  "rng min flow": "rngMinFlowScfm",
+  "rng minimum flow": "rngMinFlowScfm",
+  "rng pressure": "rngPressurePsig",
+  "rng pressure psig": "rngPressurePsig",
+  "rng injection pressure": "rngPressurePsig",
+  "rng ch4": "rngCH4",
+  "rng methane": "rngCH4",
+  "rng ch4%": "rngCH4",
+  "rng co2": "rngCO2",
+  "rng carbon dioxide": "rngCO2",
+  "rng h2s": "rngH2S",
+  "rng hydrogen sulfide": "rngH2S",
+  "rng h2s ppm": "rngH2S",
+  "rng n2": "rngN2",
+  "rng nitrogen": "rngN2",
+  "rng o2": "rngO2",
+  "rng oxygen": "rngO2",
+  "rng btu/scf": "rngBtuPerScf",
+  "rng heating value": "rngBtuPerScf",
+  "rng btu": "rngBtuPerScf",
+  "rng mmbtu/day": "rngMmbtuPerDay",
+  "rng mmbtu per day": "rngMmbtuPerDay",
+  "rng energy": "rngMmbtuPerDay",
+  "rng energy content": "rngMmbtuPerDay",
+  "methane": "methaneContent",
+  "methane content": "methaneContent",
+  "ch4": "methaneContent",
+  "ch4 content": "methaneContent",
+  "ch4 (%)": "methaneContent",
+  "carbon dioxide": "co2Content",
+  "co2": "co2Content",
+  "co2 content": "co2Content",
+  "co2 (%)": "co2Content",
+  "nitrogen": "nitrogenContent",
+  "nitrogen content": "nitrogenContent",
+  "n2": "nitrogenContent",
+  "n2 content": "nitrogenContent",
+  "oxygen": "oxygenContent",
+  "oxygen content": "oxygenContent",
+  "o2": "oxygenContent",
+  "o2 content": "oxygenContent",
+  "total inerts": "totalInerts",
+  "inerts": "totalInerts",
+  "heating value": "heatingValue",
+  "hhv": "heatingValue",
+  "btu": "heatingValue",
+  "btu/scf": "heatingValue",
+  "higher heating value": "heatingValue",
+  "h2s": "h2sContent",
+  "h2s content": "h2sContent",
+  "hydrogen sulfide": "h2sContent",
+  "total sulfur": "totalSulfur",
+  "sulfur": "totalSulfur",
+  "siloxanes": "siloxanes",
+  "siloxane": "siloxanes",
+  "water content": "waterContent",
+  "water": "waterContent",
+  "moisture": "waterContent",
+  "water dewpoint": "waterContent",
+  "delivery pressure": "deliveryPressure",
+  "pressure": "deliveryPressure",
+  "injection pressure": "deliveryPressure",
+  "mercaptan": "mercaptanOdorant",
+  "mercaptan odorant": "mercaptanOdorant",
+  "odorant": "mercaptanOdorant",
+  "wobbe index": "wobbIndex",
+  "wobbe": "wobbIndex",
+  "interchangeability": "wobbIndex",
+  "moisture content": "moistureContent",
+  "cake moisture": "moistureContent",
+  "total solids": "totalSolids",
+  "ts": "totalSolids",
+  "total nitrogen": "nitrogenTotal",
+  "nitrogen total": "nitrogenTotal",
+  "tkn": "nitrogenTotal",
+  "total kjeldahl nitrogen": "nitrogenTotal",
+  "phosphorus": "phosphorus",
+  "p2o5": "phosphorus",
+  "phosphorus content": "phosphorus",
+  "potassium": "potassium",
+  "k2o": "potassium",
+  "potassium content": "potassium",
+  "pathogen class": "pathogenClass",
+  "pathogen classification": "pathogenClass",
+  "pathogens": "pathogenClass",
+  "class a": "pathogenClass",
+  "class b": "pathogenClass",
+  "vector attraction": "vectorAttraction",
+  "var": "vectorAttraction",
+  "vector attraction reduction": "vectorAttraction",
+  "arsenic": "arsenic",
+  "as": "arsenic",
+  "cadmium": "cadmium",
+  "cd": "cadmium",
+  "copper": "copper",
+  "cu": "copper",
+  "lead": "lead",
+  "pb": "lead",
+  "mercury": "mercury",
+  "hg": "mercury",
+  "molybdenum": "molybdenum",
+  "mo": "molybdenum",
+  "nickel": "nickel",
+  "ni": "nickel",
+  "selenium": "selenium",
+  "se": "selenium",
+  "zinc": "zinc",
+  "zn": "zinc",
+  "application rate": "applicationRate",
+  "agronomic rate": "applicationRate",
+  "land application rate": "applicationRate",
+  "regulatory framework": "regulatoryFramework",
+  "regulation": "regulatoryFramework",
+  "regulations": "regulatoryFramework",
+  "flow rate": "flowRate",
+  "flow": "flowRate",
+  "hydraulic capacity": "flowRate",
+  "bod": "bod",
+  "biochemical oxygen demand": "bod",
+  "bod5": "bod",
+  "cod": "cod",
+  "chemical oxygen demand": "cod",
+  "tss": "tss",
+  "total suspended solids": "tss",
+  "suspended solids": "tss",
+  "fog": "fog",
+  "fats oils grease": "fog",
+  "fats, oils, grease": "fog",
+  "fats oils and grease": "fog",
+  "grease": "fog",
+  "ammonia": "ammoniaN",
+  "ammonia-n": "ammoniaN",
+  "nh3-n": "ammoniaN",
+  "ammonia nitrogen": "ammoniaN",
+  "total nitrogen (effluent)": "totalNitrogen",
+  "ph": "ph",
+  "temperature": "temperature",
+  "temp": "temperature",
+  "discharge temperature": "temperature",
+  "prohibited substances": "prohibitedSubstances",
+  "prohibited": "prohibitedSubstances",
+  "general prohibitions": "prohibitedSubstances",
+  "pretreatment": "pretreatmentFlag",
+  "pretreatment flag": "pretreatmentFlag",
+  "surcharge": "surchargeRisk",
+  "surcharge risk": "surchargeRisk",
+  "surcharges": "surchargeRisk",
+  "rejection risk": "rejectionRisk",
+  "rejection": "rejectionRisk",
+};
+Object.freeze(CRITERION_KEY_MAP);
+
+/**
+ * Per-profile displayName -> key overlays, precomputed once since profile criteria
+ * are static. Entries shadowed by CRITERION_KEY_MAP are skipped here so lookup
+ * precedence (static map first) is baked in.
+ */
+const DISPLAY_NAME_MAPS = new Map<OutputProfile, Record<string, string>>();
+const DISPLAY_FUZZY_ENTRIES = new Map<OutputProfile, [string, string][]>();
+
+function sortByAliasLengthDesc(entries: [string, string][]): [string, string][] {
+  return entries.sort((a, b) => b[0].length - a[0].length);
+}
+
+for (const profile of OUTPUT_CRITERIA_LIBRARY) {
+  const overlay: Record<string, string> = {};
+  for (const [key, criterion] of Object.entries(profile.criteria)) {
+    const displayLower = criterion.displayName.toLowerCase();
+    if (!CRITERION_KEY_MAP[displayLower] && !overlay[displayLower]) {
+      overlay[displayLower] = key;
+    }
+  }
+  DISPLAY_NAME_MAPS.set(profile, Object.freeze(overlay));
+  DISPLAY_FUZZY_ENTRIES.set(profile, sortByAliasLengthDesc(Object.entries(overlay)));
+}
+
+/**
+ * Fuzzy-match entry lists sorted longest-alias-first (stable, so equal lengths
+ * keep map order). Because longer aliases come first, the first bidirectional
+ * substring hit IS the longest-match winner and the scan can stop there, instead
+ * of rescanning the whole map per unmatched criterion.
+ */
+const CRITERION_FUZZY_ENTRIES = sortByAliasLengthDesc(Object.entries(CRITERION_KEY_MAP));
+
+function firstFuzzyMatch(
+  normalizedName: string,
+  entries: readonly [string, string][],
+): [string, string] | undefined {
+  for (const entry of entries) {
+    const alias = entry[0];
+    if (normalizedName.includes(alias) || alias.includes(normalizedName)) return entry;
+  }
+  return undefined;
+}
+
+
+/**
+ * Cache of baseline enriched specs per (profile, location) pair. The baseline is
+ * pure library data plus provenance strings, so repeated enrichment calls for the
+ * same output type and location — common when a UPIF is re-enriched during review —
+ * skip rebuilding it. Entries are templates: enrichOutputSpecs copies them before
+ * applying user overrides, so cached objects are never handed out mutable.
+ */
+const BASE_SPECS_CACHE_MAX_ENTRIES = 64;
+const baseSpecsCache = new Map<string, Record<string, EnrichedOutputSpec>>();
+
+function baseSpecs(profile: OutputProfile, location?: string): Record<string, EnrichedOutputSpec> {
+  const cacheKey = `${profile.name}\u0000${location ?? ""}`;
+  const cached = baseSpecsCache.get(cacheKey);
+  if (cached) {
+    // Re-insert to mark as most recently used.
+    baseSpecsCache.delete(cacheKey);
+    baseSpecsCache.set(cacheKey, cached);
+    return cached;
+  }
+
+  const specs: Record<string, EnrichedOutputSpec> = {};
+  for (const [key, criterion] of Object.entries(profile.criteria)) {
+    const baseProvenance = criterion.provenance;
+    const provenance = location
+      ? `${baseProvenance} [Location context: ${location} — verify local/state requirements]`
+      : baseProvenance;
+
+    specs[key] = {
+      value: criterion.value,
+      unit: criterion.unit,
+      source: criterion.confidence === "high" ? "typical_industry_standard" : "estimated_requirement",
+      confidence: criterion.confidence,
+      provenance,
+      group: criterion.group,
+      displayName: criterion.displayName,
+      sortOrder: criterion.sortOrder,
+    };
+  }
+
+  if (baseSpecsCache.size >= BASE_SPECS_CACHE_MAX_ENTRIES) {
+    const oldestKey = baseSpecsCache.keys().next().value;
+    if (oldestKey !== undefined) baseSpecsCache.delete(oldestKey);
+  }
+  baseSpecsCache.set(cacheKey, specs);
+  return specs;
+}
+
 export function enrichOutputSpecs(
   outputType: string,
   userProvidedCriteria: Record<string, { value: string; unit?: string }>,
@@ -545,207 +836,29 @@ export function enrichOutputSpecs(
   const specs: Record<string, EnrichedOutputSpec> = {};
 
   if (profile) {
-    for (const [key, criterion] of Object.entries(profile.criteria)) {
-      const baseProvenance = criterion.provenance;
-      const provenance = location
-        ? `${baseProvenance} [Location context: ${location} — verify local/state requirements]`
-        : baseProvenance;
-
-      specs[key] = {
-        value: criterion.value,
-        unit: criterion.unit,
-        source: criterion.confidence === "high" ? "typical_industry_standard" : "estimated_requirement",
-        confidence: criterion.confidence,
-        provenance,
-        group: criterion.group,
-        displayName: criterion.displayName,
-        sortOrder: criterion.sortOrder,
-      };
+    for (const [key, base] of Object.entries(baseSpecs(profile, location))) {
+      specs[key] = { ...base };
     }
   }
 
-  const criterionKeyMap: Record<string, string> = {
-    "rng average flow": "rngAvgFlowScfm",
-    "rng avg flow": "rngAvgFlowScfm",
-    "rng average flow scfm": "rngAvgFlowScfm",
-    "rng flow": "rngAvgFlowScfm",
-    "rng max flow": "rngMaxFlowScfm",
-    "rng maximum flow": "rngMaxFlowScfm",
-    "rng peak flow": "rngMaxFlowScfm",
-    "rng min flow": "rngMinFlowScfm",
-    "rng minimum flow": "rngMinFlowScfm",
-    "rng pressure": "rngPressurePsig",
-    "rng pressure psig": "rngPressurePsig",
-    "rng injection pressure": "rngPressurePsig",
-    "rng ch4": "rngCH4",
-    "rng methane": "rngCH4",
-    "rng ch4%": "rngCH4",
-    "rng co2": "rngCO2",
-    "rng carbon dioxide": "rngCO2",
-    "rng h2s": "rngH2S",
-    "rng hydrogen sulfide": "rngH2S",
-    "rng h2s ppm": "rngH2S",
-    "rng n2": "rngN2",
-    "rng nitrogen": "rngN2",
-    "rng o2": "rngO2",
-    "rng oxygen": "rngO2",
-    "rng btu/scf": "rngBtuPerScf",
-    "rng heating value": "rngBtuPerScf",
-    "rng btu": "rngBtuPerScf",
-    "rng mmbtu/day": "rngMmbtuPerDay",
-    "rng mmbtu per day": "rngMmbtuPerDay",
-    "rng energy": "rngMmbtuPerDay",
-    "rng energy content": "rngMmbtuPerDay",
-    "methane": "methaneContent",
-    "methane content": "methaneContent",
-    "ch4": "methaneContent",
-    "ch4 content": "methaneContent",
-    "ch4 (%)": "methaneContent",
-    "carbon dioxide": "co2Content",
-    "co2": "co2Content",
-    "co2 content": "co2Content",
-    "co2 (%)": "co2Content",
-    "nitrogen": "nitrogenContent",
-    "nitrogen content": "nitrogenContent",
-    "n2": "nitrogenContent",
-    "n2 content": "nitrogenContent",
-    "oxygen": "oxygenContent",
-    "oxygen content": "oxygenContent",
-    "o2": "oxygenContent",
-    "o2 content": "oxygenContent",
-    "total inerts": "totalInerts",
-    "inerts": "totalInerts",
-    "heating value": "heatingValue",
-    "hhv": "heatingValue",
-    "btu": "heatingValue",
-    "btu/scf": "heatingValue",
-    "higher heating value": "heatingValue",
-    "h2s": "h2sContent",
-    "h2s content": "h2sContent",
-    "hydrogen sulfide": "h2sContent",
-    "total sulfur": "totalSulfur",
-    "sulfur": "totalSulfur",
-    "siloxanes": "siloxanes",
-    "siloxane": "siloxanes",
-    "water content": "waterContent",
-    "water": "waterContent",
-    "moisture": "waterContent",
-    "water dewpoint": "waterContent",
-    "delivery pressure": "deliveryPressure",
-    "pressure": "deliveryPressure",
-    "injection pressure": "deliveryPressure",
-    "mercaptan": "mercaptanOdorant",
-    "mercaptan odorant": "mercaptanOdorant",
-    "odorant": "mercaptanOdorant",
-    "wobbe index": "wobbIndex",
-    "wobbe": "wobbIndex",
-    "interchangeability": "wobbIndex",
-    "moisture content": "moistureContent",
-    "cake moisture": "moistureContent",
-    "total solids": "totalSolids",
-    "ts": "totalSolids",
-    "total nitrogen": "nitrogenTotal",
-    "nitrogen total": "nitrogenTotal",
-    "tkn": "nitrogenTotal",
-    "total kjeldahl nitrogen": "nitrogenTotal",
-    "phosphorus": "phosphorus",
-    "p2o5": "phosphorus",
-    "phosphorus content": "phosphorus",
-    "potassium": "potassium",
-    "k2o": "potassium",
-    "potassium content": "potassium",
-    "pathogen class": "pathogenClass",
-    "pathogen classification": "pathogenClass",
-    "pathogens": "pathogenClass",
-    "class a": "pathogenClass",
-    "class b": "pathogenClass",
-    "vector attraction": "vectorAttraction",
-    "var": "vectorAttraction",
-    "vector attraction reduction": "vectorAttraction",
-    "arsenic": "arsenic",
-    "as": "arsenic",
-    "cadmium": "cadmium",
-    "cd": "cadmium",
-    "copper": "copper",
-    "cu": "copper",
-    "lead": "lead",
-    "pb": "lead",
-    "mercury": "mercury",
-    "hg": "mercury",
-    "molybdenum": "molybdenum",
-    "mo": "molybdenum",
-    "nickel": "nickel",
-    "ni": "nickel",
-    "selenium": "selenium",
-    "se": "selenium",
-    "zinc": "zinc",
-    "zn": "zinc",
-    "application rate": "applicationRate",
-    "agronomic rate": "applicationRate",
-    "land application rate": "applicationRate",
-    "regulatory framework": "regulatoryFramework",
-    "regulation": "regulatoryFramework",
-    "regulations": "regulatoryFramework",
-    "flow rate": "flowRate",
-    "flow": "flowRate",
-    "hydraulic capacity": "flowRate",
-    "bod": "bod",
-    "biochemical oxygen demand": "bod",
-    "bod5": "bod",
-    "cod": "cod",
-    "chemical oxygen demand": "cod",
-    "tss": "tss",
-    "total suspended solids": "tss",
-    "suspended solids": "tss",
-    "fog": "fog",
-    "fats oils grease": "fog",
-    "fats, oils, grease": "fog",
-    "fats oils and grease": "fog",
-    "grease": "fog",
-    "ammonia": "ammoniaN",
-    "ammonia-n": "ammoniaN",
-    "nh3-n": "ammoniaN",
-    "ammonia nitrogen": "ammoniaN",
-    "total nitrogen (effluent)": "totalNitrogen",
-    "ph": "ph",
-    "temperature": "temperature",
-    "temp": "temperature",
-    "discharge temperature": "temperature",
-    "prohibited substances": "prohibitedSubstances",
-    "prohibited": "prohibitedSubstances",
-    "general prohibitions": "prohibitedSubstances",
-    "pretreatment": "pretreatmentFlag",
-    "pretreatment flag": "pretreatmentFlag",
-    "surcharge": "surchargeRisk",
-    "surcharge risk": "surchargeRisk",
-    "surcharges": "surchargeRisk",
-    "rejection risk": "rejectionRisk",
-    "rejection": "rejectionRisk",
-  };
 
-  if (profile) {
-    for (const [key, criterion] of Object.entries(profile.criteria)) {
-      const displayLower = criterion.displayName.toLowerCase();
-      if (!criterionKeyMap[displayLower]) {
-        criterionKeyMap[displayLower] = key;
-      }
-    }
-  }
+  const displayNameMap = (profile && DISPLAY_NAME_MAPS.get(profile)) || {};
 
   for (const [criterionName, criterionData] of Object.entries(userProvidedCriteria)) {
-    const normalizedName = criterionName.toLowerCase().trim();
-    let mappedKey = criterionKeyMap[normalizedName];
+    const normalizedName = norm(criterionName);
+    let mappedKey = CRITERION_KEY_MAP[normalizedName] ?? displayNameMap[normalizedName];
 
     if (!mappedKey) {
-      let bestAlias = "";
-      for (const [alias, key] of Object.entries(criterionKeyMap)) {
-        if (normalizedName.includes(alias) || alias.includes(normalizedName)) {
-          if (alias.length > bestAlias.length) {
-            bestAlias = alias;
-            mappedKey = key;
-          }
-        }
-      }
+      const staticHit = firstFuzzyMatch(normalizedName, CRITERION_FUZZY_ENTRIES);
+      const overlayHit = profile
+        ? firstFuzzyMatch(normalizedName, DISPLAY_FUZZY_ENTRIES.get(profile) ?? [])
+        : undefined;
+      // Longest alias wins across both lists; the static map wins ties.
+      const best =
+        staticHit && (!overlayHit || staticHit[0].length >= overlayHit[0].length)
+          ? staticHit
+          : overlayHit;
+      if (best) mappedKey = best[1];
     }
 
     const locationNote = location
@@ -753,14 +866,14 @@ export function enrichOutputSpecs(
       : "";
 
     if (mappedKey && specs[mappedKey]) {
-      specs[mappedKey] = {
-        ...specs[mappedKey],
-        value: criterionData.value,
-        unit: criterionData.unit || specs[mappedKey].unit,
-        source: "user_provided",
-        confidence: "high",
-        provenance: `User-provided value from project input${locationNote}`,
-      };
+      // Safe to mutate in place: specs entries are per-call copies of the cached
+      // baseline, never the cached objects themselves.
+      const existing = specs[mappedKey];
+      existing.value = criterionData.value;
+      if (criterionData.unit) existing.unit = criterionData.unit;
+      existing.source = "user_provided";
+      existing.confidence = "high";
+      existing.provenance = `User-provided value from project input${locationNote}`;
     } else if (mappedKey) {
       specs[mappedKey] = {
         value: criterionData.value,
@@ -141,13 +141,17 @@ export const PRODEVAL_UNIT_CONFIGS: ProdevalUnitConfig[] = [
   },
 ];
 
+// Upper selection bound for each unit size, aligned by index with
+// PRODEVAL_UNIT_CONFIGS; flows above the last threshold get the largest unit.
+// Adding a size means adding a config entry and its bound here, not another
+// branch.
+const UNIT_SELECTION_MAX_SCFM = [500, 1000, 1350, 1650, 1950];
+
 export function selectProdevalUnit(biogasScfm: number): ProdevalUnitConfig {
-  if (biogasScfm <= 500) return PRODEVAL_UNIT_CONFIGS[0];
-  if (biogasScfm <= 1000) return PRODEVAL_UNIT_CONFIGS[1];
-  if (biogasScfm <= 1350) return PRODEVAL_UNIT_CONFIGS[2];
-  if (biogasScfm <= 1650) return PRODEVAL_UNIT_CONFIGS[3];
-  if (biogasScfm <= 1950) return PRODEVAL_UNIT_CONFIGS[4];
-  return PRODEVAL_UNIT_CONFIGS[5];
+  const idx = UNIT_SELECTION_MAX_SCFM.findIndex(maxScfm => biogasScfm <= maxScfm);
+  return idx >= 0
+    ? PRODEVAL_UNIT_CONFIGS[idx]
+    : PRODEVAL_UNIT_CONFIGS[PRODEVAL_UNIT_CONFIGS.length - 1];
 }
 
 function roundTo(val: number, decimals: number = 0): number {